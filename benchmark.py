@@ -0,0 +1,741 @@
+"""Performance benchmarks for the trading bot's analysis code."""
+import argparse
+import itertools
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import ccxt
+import joblib
+
+import numpy as np
+import pandas as pd
+
+from utils.api_client import BitgetClient
+from utils import metrics
+from utils.backtester import Backtester, PortfolioBacktester
+from utils.candle_cache import CandleBuffer
+from utils.metadata_cache import MetadataCache
+from utils.monte_carlo import MonteCarloSimulator
+from utils.optimizer import ParameterOptimizer
+from utils.performance_tracker import PerformanceTracker
+from utils.rate_limiter import RequestScheduler
+from utils.resilience import RequestPolicy
+from utils.strategy import TradingStrategy
+from utils.streaming import MarketStream, ReplayServer
+from utils.trade_journal import TradeJournal
+
+
+def synthetic_ohlcv(bars, seed=0, timeframe='5min'):
+    """
+    Generate a random-walk OHLCV DataFrame shaped like BitgetClient.fetch_ohlcv output.
+
+    Args:
+        bars (int): Number of candles
+        seed (int): Random seed
+        timeframe (str): Candle spacing as a pandas frequency string
+
+    Returns:
+        pandas.DataFrame: DataFrame containing OHLCV data
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, bars)))
+    open_ = np.concatenate([close[:1], close[:-1]])
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.002, bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.002, bars)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=bars, freq=timeframe),
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': rng.lognormal(3, 0.5, bars)
+    })
+
+
+def _timed(func, *args, **kwargs):
+    """
+    Run a function once and return (result, elapsed seconds).
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _loop_support_resistance(df, window):
+    """
+    Reference per-bar pivot loop that _add_support_resistance used to run.
+    """
+    df['support'] = np.nan
+    df['resistance'] = np.nan
+    for i in range(window, len(df) - window):
+        if all(df['low'].iloc[i] <= df['low'].iloc[i-window:i]) and \
+           all(df['low'].iloc[i] <= df['low'].iloc[i+1:i+window+1]):
+            df.loc[df.index[i], 'support'] = df['low'].iloc[i]
+        if all(df['high'].iloc[i] >= df['high'].iloc[i-window:i]) and \
+           all(df['high'].iloc[i] >= df['high'].iloc[i+1:i+window+1]):
+            df.loc[df.index[i], 'resistance'] = df['high'].iloc[i]
+
+
+def benchmark_support_resistance(bars=5000, windows=(10, 25, 50, 100, 200)):
+    """
+    Compare rolling-window pivots against the per-bar loop as the window grows.
+
+    Args:
+        bars (int): Number of candles
+        windows (tuple): Pivot window sizes to time
+    """
+    strategy = TradingStrategy()
+    df = synthetic_ohlcv(bars)
+
+    print(f"Support/resistance pivots on {bars} candles")
+    print(f"{'window':>8} {'loop (s)':>10} {'rolling (s)':>12} {'speedup':>9}")
+    for window in windows:
+        loop_df, rolling_df = df.copy(), df.copy()
+        _, loop_time = _timed(_loop_support_resistance, loop_df, window)
+        _, rolling_time = _timed(strategy._add_support_resistance, rolling_df, window)
+
+        pd.testing.assert_frame_equal(loop_df, rolling_df)
+        print(f"{window:>8} {loop_time:>10.3f} {rolling_time:>12.4f} {loop_time / rolling_time:>8.0f}x")
+
+
+def benchmark_scheduler(rate=200, market_threads=8, market_requests=100, orders=20):
+    """
+    Measure how long orders wait for the shared IP budget under a market data flood.
+
+    Args:
+        rate (float): IP budget in requests per second (burst of a tenth of a second)
+        market_threads (int): Threads issuing market data requests
+        market_requests (int): Requests per market data thread
+        orders (int): Orders placed while the flood is running
+    """
+    scheduler = RequestScheduler(
+        buckets={'ip': (rate, rate / 10)},
+        endpoints={
+            'fetch_ohlcv': (('ip',), 1, 2),
+            'create_order': (('ip',), 1, 0),
+            'default': (('ip',), 1, 2)
+        }
+    )
+    order_waits = []
+
+    def flood():
+        for _ in range(market_requests):
+            scheduler.acquire('fetch_ohlcv')
+
+    def place_orders():
+        for _ in range(orders):
+            time.sleep(market_threads * market_requests / rate / orders / 2)
+            order_waits.append(scheduler.acquire('create_order'))
+
+    threads = [threading.Thread(target=flood) for _ in range(market_threads)]
+    threads.append(threading.Thread(target=place_orders))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    stats = scheduler.stats()
+    total = market_threads * market_requests + orders
+    print(f"Request scheduler: {total} requests against a {rate}/s budget")
+    print(f"{'throughput':>12} {total / elapsed:>8.1f} req/s")
+    print(f"{'market wait':>12} {stats['fetch_ohlcv']['avg_wait'] * 1000:>8.1f} ms avg")
+    print(f"{'order wait':>12} {np.mean(order_waits) * 1000:>8.1f} ms avg, {max(order_waits) * 1000:.1f} ms max")
+
+
+def benchmark_optimizer(bars=20000, max_workers=None):
+    """
+    Time a grid search serially and on growing worker pools.
+
+    Args:
+        bars (int): Number of candles
+        max_workers (int, optional): Largest pool to time (default: CPU count)
+    """
+    df = synthetic_ohlcv(bars)
+    optimizer = ParameterOptimizer(df, BitgetClient.find_liquidity_levels(df.iloc[:1000]))
+    grid = {
+        'sr_window': [5, 10],
+        'breakout_threshold': [0.0, 0.005],
+        'reward_multiple': [1.5, 2.0, 3.0],
+        'max_signal_age': [3600, 10800]
+    }
+    combinations = int(np.prod([len(values) for values in grid.values()]))
+    max_workers = max_workers or os.cpu_count()
+
+    print(f"Grid search: {combinations} backtests on {bars} candles ({os.cpu_count()} CPUs)")
+    print(f"{'workers':>8} {'time (s)':>10} {'speedup':>9} {'efficiency':>11}")
+    serial, serial_time = _timed(optimizer.grid_search, grid, max_workers=0)
+    print(f"{'serial':>8} {serial_time:>10.2f} {1:>8.2f}x {1:>10.0%}")
+    workers = 1
+    while workers <= max_workers:
+        result, elapsed = _timed(optimizer.grid_search, grid, max_workers=workers)
+        pd.testing.assert_frame_equal(serial, result)
+        speedup = serial_time / elapsed
+        print(f"{workers:>8} {elapsed:>10.2f} {speedup:>8.2f}x {speedup / workers:>10.0%}")
+        workers = workers * 2 if workers * 2 <= max_workers or workers == max_workers else max_workers
+
+
+def benchmark_monte_carlo(paths=100000, trades=300):
+    """
+    Time Monte Carlo resampling of a synthetic trade list.
+
+    Args:
+        paths (int): Number of simulated paths
+        trades (int): Number of trades per path
+    """
+    rng = np.random.default_rng(0)
+    # 40% winners at +4%, 60% losers at -2% of the balance
+    returns = np.where(rng.random(trades) < 0.4, 0.04, -0.02)
+    balance = 10000 * np.concatenate([[1.0], np.cumprod(1 + returns)[:-1]])
+    trade_list = [{'profit': p, 'commission': 0.0} for p in (balance * returns).tolist()]
+    simulator = MonteCarloSimulator(trade_list, 10000)
+
+    print(f"Monte Carlo: {paths} paths of {trades} trades")
+    print(f"{'method':>10} {'time (s)':>10} {'median DD':>10} {'ruin':>8}")
+    for method in ('bootstrap', 'permute'):
+        result, elapsed = _timed(simulator.simulate, paths, method, seed=0)
+        print(f"{method:>10} {elapsed:>10.2f} {np.median(result['max_drawdown']):>10.1%} "
+              f"{result['risk_of_ruin']:>8.2%}")
+
+
+def benchmark_portfolio(symbols=20, bars=35040):
+    """
+    Time a shared-capital portfolio backtest (default: 20 symbols, one year of 15m candles).
+
+    Args:
+        symbols (int): Number of symbols
+        bars (int): Candles per symbol
+    """
+    frames = {f"SYM{i}/USDT": synthetic_ohlcv(bars, seed=i, timeframe='15min') for i in range(symbols)}
+    levels = {symbol: BitgetClient.find_liquidity_levels(df.iloc[:500]) for symbol, df in frames.items()}
+    backtester = PortfolioBacktester()
+    backtester.strategy.risk_percentage = 0.2
+
+    result, elapsed = _timed(backtester.run_backtest, frames, levels)
+    print(f"Portfolio backtest: {symbols} symbols x {bars} candles, "
+          f"max {backtester.strategy.max_open_trades} open trades")
+    print(f"{'time (s)':>10} {'trades':>8} {'return':>9}")
+    print(f"{elapsed:>10.2f} {len(result['trades']):>8} {result['profit_loss_percent']:>8.1f}%")
+
+
+def benchmark_intrabar_fills(days=180):
+    """
+    Compare backtest throughput with close, intrabar and lower-timeframe fills.
+
+    Args:
+        days (int): Days of 1m candles, backtested as 15m bars
+    """
+    minutes = synthetic_ohlcv(days * 24 * 60, timeframe='1min')
+    bars = minutes.set_index('timestamp').resample('15min').agg(
+        {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}).reset_index()
+    levels = BitgetClient.find_liquidity_levels(bars.iloc[:3000], top=200)
+    backtester = Backtester()
+    analysis_df = backtester.strategy.calculate_indicators(bars)
+
+    print(f"Exit fills: {len(bars)} 15m bars, {len(minutes)} 1m candles")
+    print(f"{'fills':>18} {'time (s)':>10} {'trades':>8}")
+    for label, kwargs in (('close', {}),
+                          ('intrabar', {'fills': 'intrabar'}),
+                          ('intrabar + 1m', {'fills': 'intrabar', 'lower_df': minutes})):
+        result, elapsed = _timed(backtester.run_backtest, bars, levels, analysis_df=analysis_df, **kwargs)
+        print(f"{label:>18} {elapsed:>10.3f} {len(result['trades']):>8}")
+
+
+def benchmark_records(days=365):
+    """
+    Compare the memory of array-backed backtest records with the list-of-dicts form.
+
+    Args:
+        days (int): Days of 1m candles to backtest
+    """
+    df = synthetic_ohlcv(days * 24 * 60, timeframe='1min')
+    levels = BitgetClient.find_liquidity_levels(df.iloc[:3000], top=200)
+    backtester = Backtester(strategy=TradingStrategy(risk_percentage=0.2))
+    result, elapsed = _timed(backtester.run_backtest, df, levels)
+
+    print(f"Backtest records: {len(df)} 1m candles in {elapsed:.2f}s")
+    print(f"{'records':>14} {'rows':>8} {'arrays (MB)':>12} {'dicts (MB)':>11} {'ratio':>7}")
+    for label, records in (('trades', result['trades']), ('equity curve', result['equity_curve'])):
+        tracemalloc.start()
+        as_dicts = records.to_list()
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{label:>14} {len(as_dicts):>8} {records.nbytes / 1e6:>12.2f} {dict_bytes / 1e6:>11.2f} "
+              f"{dict_bytes / records.nbytes:>6.1f}x")
+
+
+def _loop_drawdown_sharpe(equity_values):
+    """
+    Max drawdown and Sharpe ratio computed the way the metrics used to be, with Python loops.
+    """
+    peak = equity_values[0]
+    max_drawdown = 0
+    for equity in equity_values:
+        if equity > peak:
+            peak = equity
+        drawdown = (peak - equity) / peak
+        max_drawdown = max(max_drawdown, drawdown)
+
+    returns = [(equity_values[i] - equity_values[i-1]) / equity_values[i-1] for i in range(1, len(equity_values))]
+    std_return = np.std(returns)
+    sharpe_ratio = (np.mean(returns) / std_return) * np.sqrt(252) if std_return > 0 else 0
+    return max_drawdown, sharpe_ratio
+
+
+def benchmark_metrics(points=1_000_000):
+    """
+    Compare the vectorized equity metrics with the previous Python loops.
+
+    Args:
+        points (int): Length of the equity curve
+    """
+    rng = np.random.default_rng(0)
+    equity = 10000 * np.cumprod(1 + rng.normal(0.00001, 0.001, points))
+
+    (loop_drawdown, loop_sharpe), loop_time = _timed(_loop_drawdown_sharpe, equity.tolist())
+
+    def vectorized():
+        returns = metrics.period_returns(equity)
+        return metrics.max_drawdown(equity), metrics.sharpe_ratio(returns, 252)
+
+    (drawdown, sharpe), vector_time = _timed(vectorized)
+    print(f"Drawdown and Sharpe: {points} equity points")
+    print(f"{'method':>12} {'time (s)':>10} {'max dd':>10} {'sharpe':>8}")
+    print(f"{'loops':>12} {loop_time:>10.3f} {loop_drawdown:>10.6f} {loop_sharpe:>8.4f}")
+    print(f"{'vectorized':>12} {vector_time:>10.3f} {drawdown:>10.6f} {sharpe:>8.4f}")
+    print(f"Speedup: {loop_time / vector_time:.0f}x")
+
+
+def benchmark_trade_journal(histories=(1000, 10000, 50000), writes=5):
+    """
+    Compare the cost of persisting one more trade: full joblib snapshot vs journal append.
+
+    Args:
+        histories (tuple): Trades already recorded
+        writes (int): Trades written per measurement
+    """
+    start = datetime(2024, 1, 1)
+
+    def trade(k):
+        return {'entry_date': start + timedelta(hours=k), 'exit_date': start + timedelta(hours=k + 1),
+                'entry_price': 100.0, 'exit_price': 101.0, 'type': 'long', 'size': 1.0,
+                'profit': 1.0, 'commission': 0.1}
+
+    print(f"Persisting a trade ({writes} writes per size)")
+    print(f"{'history':>10} {'joblib (ms)':>12} {'journal (ms)':>13} {'load (s)':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for history in histories:
+            trades = [trade(k) for k in range(history)]
+            equity_curve = [{'date': t['exit_date'], 'equity': 10000.0 + k} for k, t in enumerate(trades)]
+            snapshot_file = os.path.join(directory, f'{history}.joblib')
+            journal = TradeJournal(os.path.join(directory, f'{history}.sqlite'))
+            journal.replace(trades, equity_curve, {'current_balance': 10000.0})
+
+            snapshot_start = time.perf_counter()
+            for k in range(history, history + writes):
+                trades.append(trade(k))
+                joblib.dump({'trades': trades, 'equity_curve': equity_curve}, snapshot_file)
+            snapshot_time = (time.perf_counter() - snapshot_start) / writes
+
+            journal_start = time.perf_counter()
+            for k in range(history, history + writes):
+                journal.append(trade(k), {'date': trade(k)['exit_date'], 'equity': 10000.0 + k},
+                               {'current_balance': 10000.0 + k})
+            journal_time = (time.perf_counter() - journal_start) / writes
+
+            _, load_time = _timed(journal.load)
+            journal.close()
+            print(f"{history:>10} {snapshot_time * 1000:>12.2f} {journal_time * 1000:>13.3f} {load_time:>9.3f}")
+
+
+def benchmark_tracker_metrics(histories=(1000, 10000, 100000), updates=100):
+    """
+    Compare updating the tracker's metrics after a trade: running totals vs full recompute.
+
+    Args:
+        histories (tuple): Trades already recorded
+        updates (int): Updates timed per size
+    """
+    rng = np.random.default_rng(0)
+    start = datetime(2024, 1, 1)
+    print(f"Tracker metrics update ({updates} updates per size)")
+    print(f"{'history':>10} {'full (ms)':>10} {'running (us)':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        for history in histories:
+            tracker = PerformanceTracker(os.path.join(directory, f'{history}.sqlite'))
+            tracker.initial_balance = tracker.current_balance = 10000.0
+            tracker.equity_curve = [{'date': start, 'equity': 10000.0}]
+            for k, profit in enumerate(rng.normal(1, 10, history)):
+                tracker.trades.append({'entry_date': start + timedelta(hours=k), 'profit': float(profit),
+                                       'exit_date': start + timedelta(hours=k + 1), 'commission': 0.1})
+                tracker.current_balance += float(profit) - 0.1
+                tracker.equity_curve.append({'date': start + timedelta(hours=k + 1), 'equity': tracker.current_balance})
+            tracker.update_metrics()
+
+            _, full_time = _timed(lambda: [tracker._full_metrics() for _ in range(updates)])
+
+            running = tracker._running
+            hour = 3600 * 10**9
+            origin = pd.Timestamp(start).value
+            running_start = time.perf_counter()
+            for k in range(history, history + updates):
+                running.add_trade(1.0, origin + k * hour, origin + (k + 1) * hour)
+                running.add_equity(tracker.current_balance, origin + (k + 1) * hour)
+                tracker._metrics(running.trade_statistics(), running.equity_statistics(), running.exposure(),
+                                 running.average_holding_time())
+            running_time = time.perf_counter() - running_start
+            tracker.journal.close()
+            print(f"{history:>10} {full_time / updates * 1000:>10.2f} {running_time / updates * 1e6:>13.1f}")
+
+
+def benchmark_checkpoint(days=365, every=100000):
+    """
+    Measure checkpointing overhead and the cost of resuming an interrupted backtest.
+
+    Args:
+        days (int): Days of 1m candles to backtest
+        every (int): Bars between checkpoints
+    """
+    df = synthetic_ohlcv(days * 24 * 60, timeframe='1min')
+    levels = BitgetClient.find_liquidity_levels(df.iloc[:3000], top=200)
+    backtester = Backtester(strategy=TradingStrategy(risk_percentage=0.2))
+    analysis_df = backtester.strategy.calculate_indicators(df)
+
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint_file = os.path.join(directory, 'backtest.ckpt')
+        plain, plain_time = _timed(backtester.run_backtest, df, levels, analysis_df=analysis_df)
+        _, checkpointed_time = _timed(backtester.run_backtest, df, levels, analysis_df=analysis_df,
+                                      checkpoint_file=checkpoint_file, checkpoint_every=every)
+
+        def interrupt(partial):
+            if partial['bar'] + every >= len(df):
+                raise KeyboardInterrupt
+        try:
+            backtester.run_backtest(df, levels, analysis_df=analysis_df, checkpoint_file=checkpoint_file,
+                                    checkpoint_every=every, on_checkpoint=interrupt)
+        except KeyboardInterrupt:
+            pass
+        resumed, resume_time = _timed(backtester.resume_backtest, df, checkpoint_file, levels,
+                                      analysis_df=analysis_df, checkpoint_every=every)
+
+    print(f"Checkpointed backtest: {len(df)} 1m candles, checkpoint every {every} bars")
+    print(f"{'run':>24} {'time (s)':>10}")
+    print(f"{'plain':>24} {plain_time:>10.2f}")
+    print(f"{'checkpointed':>24} {checkpointed_time:>10.2f}")
+    print(f"{'resume from last':>24} {resume_time:>10.2f}")
+    print(f"Resumed result matches: {resumed['trades'] == plain['trades'] and resumed['final_balance'] == plain['final_balance']}")
+
+
+def benchmark_streaming(candles=2000, symbols=4, interval=0.005):
+    """
+    Measure update throughput and push latency of the WebSocket stream against a local replay server.
+
+    Args:
+        candles (int): 1m candles replayed per symbol after the snapshot
+        symbols (int): Symbols streamed at once
+        interval (float): Seconds between replayed candles
+    """
+    markets = {(f'SYM{i}/USDT', '1m'): synthetic_ohlcv(candles + 100, seed=i, timeframe='1min')
+               for i in range(symbols)}
+    latencies = []
+    done = threading.Event()
+
+    def on_update(event):
+        latencies.append(time.time() * 1000 - event['ts'])
+        if len(latencies) == len(markets) * (candles * 2 + 100):
+            done.set()
+
+    with ReplayServer(markets, interval=interval) as server, MarketStream(server.url) as stream:
+        start = time.perf_counter()
+        for symbol, timeframe in markets:
+            stream.subscribe_candles(symbol, timeframe, on_update)
+        done.wait(candles * interval * 4 + 30)
+        elapsed = time.perf_counter() - start
+        buffered = min(len(stream.buffer(*market)) for market in markets)
+
+    updates = len(latencies)
+    print(f"Market stream: {symbols} symbols x {candles} replayed 1m candles, one every {interval * 1000:.0f} ms")
+    print(f"{'updates':>12} {updates:>8} ({updates / elapsed:.0f}/s, {buffered} candles buffered per symbol)")
+    print(f"{'latency':>12} {np.median(latencies):>8.1f} ms median, {np.percentile(latencies, 99):.1f} ms p99")
+
+
+def benchmark_candle_cache(ticks=5000, limit=500, ticks_per_candle=10):
+    """
+    Compare rebuilding a DataFrame per live update with the ring-buffer candle cache.
+
+    Args:
+        ticks (int): Candle updates applied (each revises or opens the last candle)
+        limit (int): Candles in the window handed to consumers
+        ticks_per_candle (int): Updates per candle before the next one opens
+    """
+    df = synthetic_ohlcv(limit + ticks // ticks_per_candle + 1, timeframe='1min')
+    rows = df.assign(timestamp=df['timestamp'].astype('int64') // 10**6).to_numpy().tolist()
+    updates = [rows[limit + i // ticks_per_candle] for i in range(ticks)]
+
+    def rebuild():
+        window = list(rows[:limit])
+        for candle in updates:
+            if candle[0] == window[-1][0]:
+                window[-1] = candle
+            else:
+                window = window[1:] + [candle]
+            BitgetClient._ohlcv_to_frame(window)
+
+    def cached(frames):
+        buffer = CandleBuffer(limit)
+        buffer.merge(rows[:limit])
+        for candle in updates:
+            if buffer.update(candle) is not None or frames == 'every update':
+                buffer.to_frame(limit)
+            else:
+                buffer.arrays(limit)
+
+    print(f"Candle cache: {ticks} live updates to a {limit}-candle window, {ticks_per_candle} per candle")
+    print(f"{'consumer gets':>36} {'per update (us)':>16}")
+    for name, func, args in (('DataFrame rebuilt (no cache)', rebuild, ()),
+                             ('DataFrame from ring buffer', cached, ('every update',)),
+                             ('views; DataFrame per closed candle', cached, ('closed',))):
+        _, elapsed = _timed(func, *args)
+        print(f"{name:>36} {elapsed / ticks * 1e6:>16.1f}")
+
+
+class MockBitget(ccxt.bitget):
+    """
+    Local stand-in for Bitget's spot trading endpoints with a fixed round-trip latency.
+
+    Only ccxt's raw HTTP request is replaced, so its request building and
+    response parsing run as they would against the exchange. Orders larger
+    than ``balance`` are rejected the way Bitget reports it.
+    """
+
+    def __init__(self, symbols, latency=0.05, balance=1000.0):
+        super().__init__({'apiKey': 'mock', 'secret': 'mock', 'password': 'mock', 'enableRateLimit': False})
+        self.mock_symbols = symbols
+        self.latency = latency
+        self.balance = balance
+        self.requests = 0
+        self._order_ids = itertools.count(1)
+
+    def _respond(self, data):
+        self.requests += 1
+        time.sleep(self.latency)
+        return {'code': '00000', 'msg': 'success', 'requestTime': self.milliseconds(), 'data': data}
+
+    def fetch_markets(self, params={}):
+        return [self.safe_market_structure({
+            'id': symbol.replace('/', ''), 'symbol': symbol, 'base': symbol.split('/')[0], 'quote': 'USDT',
+            'baseId': symbol.split('/')[0], 'quoteId': 'USDT', 'type': 'spot', 'spot': True, 'active': True,
+            'precision': {'amount': 0.0001, 'price': 0.01}
+        }) for symbol in self.mock_symbols]
+
+    def fetch_currencies(self, params={}):
+        return {}
+
+    def _placed(self, request):
+        if float(request['size']) > self.balance:
+            return None
+        return {'orderId': str(next(self._order_ids)), 'clientOid': request.get('clientOid')}
+
+    def request(self, path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+        if path == 'v2/spot/trade/place-order':
+            placed = self._placed(params)
+            if placed is None:
+                self._respond(None)
+                raise ccxt.InsufficientFunds('Insufficient balance')
+            return self._respond(placed)
+        if path == 'v2/spot/trade/batch-orders':
+            success, failure = [], []
+            for request in params['orderList']:
+                placed = self._placed(request)
+                if placed is None:
+                    failure.append({'orderId': '', 'clientOid': request.get('clientOid'),
+                                    'errorMsg': 'Insufficient balance', 'errorCode': '43012'})
+                else:
+                    success.append(placed)
+            return self._respond({'successList': success, 'failureList': failure})
+        if path == 'v2/spot/trade/cancel-order':
+            return self._respond({'orderId': params['orderId'], 'clientOid': None})
+        if path == 'v2/spot/trade/batch-cancel-order':
+            return self._respond({'successList': [{'orderId': order['orderId'], 'clientOid': None}
+                                                  for order in params['orderList']], 'failureList': []})
+        raise ccxt.NotSupported(f"MockBitget does not serve {path}")
+
+
+class FaultyBitget(MockBitget):
+    """
+    MockBitget that also serves tickers and injects faults into every request.
+
+    Each request takes ``latency`` seconds, ``slow_factor`` times that with
+    probability ``slow_rate`` (a latency tail), and fails with a request
+    timeout with probability ``error_rate``. Setting ``down`` makes every
+    request fail as if the exchange were unreachable.
+    """
+
+    def __init__(self, symbols, latency=0.02, error_rate=0.1, slow_rate=0.05, slow_factor=10, seed=0):
+        super().__init__(symbols, latency)
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_factor = slow_factor
+        self.down = False
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def request(self, path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+        with self._random_lock:
+            slow, failed = self._random.random() < self.slow_rate, self._random.random() < self.error_rate
+        self.requests += 1
+        time.sleep(self.latency * (self.slow_factor if slow else 1))
+        if self.down:
+            raise ccxt.ExchangeNotAvailable('bitget is unreachable')
+        if failed:
+            raise ccxt.RequestTimeout('bitget request timed out')
+        if path == 'v2/spot/market/tickers':
+            return {'code': '00000', 'msg': 'success', 'requestTime': self.milliseconds(), 'data': [{
+                'symbol': params['symbol'], 'lastPr': '100.0', 'bidPr': '99.9', 'askPr': '100.1',
+                'ts': str(self.milliseconds())
+            }]}
+        self.requests -= 1
+        self.latency, latency = 0, self.latency
+        try:
+            return super().request(path, api, method, params, headers, body, config)
+        finally:
+            self.latency = latency
+
+
+def benchmark_resilience(requests=400, latency=0.02, error_rate=0.1, slow_rate=0.05):
+    """
+    Measure failed reads and tail latency under injected faults, and fail-fast time during an outage.
+
+    Args:
+        requests (int): Ticker reads per configuration
+        latency (float): Normal round-trip time in seconds
+        error_rate (float): Share of requests that time out
+        slow_rate (float): Share of requests that take ten times longer
+    """
+    # Budgets far above the request rate, so only the injected faults matter
+    scheduler_buckets = {name: (10000, 10000) for name in ('ip', 'market', 'trade', 'account')}
+    policies = {
+        'no retries': RequestPolicy(max_retries=0, failure_threshold=10**9),
+        'retries': RequestPolicy(backoff_base=latency, seed=0),
+        'retries + hedging': RequestPolicy(backoff_base=latency, hedge=True, hedge_quantile=0.9, seed=0),
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        metadata_cache = MetadataCache(os.path.join(directory, 'metadata.sqlite'))
+
+        def client_with(policy):
+            client = BitgetClient(scheduler=RequestScheduler(buckets=scheduler_buckets), metadata_cache=metadata_cache,
+                                  request_policy=policy)
+            client.exchange = FaultyBitget(['BTC/USDT'], latency, error_rate=0, slow_rate=0)
+            client.load_markets()
+            # Warm up without faults so hedging knows the normal latency
+            for _ in range(50):
+                client.get_ticker('BTC/USDT')
+            client.exchange.error_rate, client.exchange.slow_rate = error_rate, slow_rate
+            client.exchange.requests = 0
+            return client
+
+        print(f"Request resilience: {requests} ticker reads, {latency * 1000:.0f} ms round-trip, "
+              f"{error_rate:.0%} timeouts, {slow_rate:.0%} ten times slower")
+        print(f"{'policy':>20} {'failed':>7} {'mean (ms)':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} "
+              f"{'requests sent':>14}")
+        for name, policy in policies.items():
+            client = client_with(policy)
+            latencies, failed = [], 0
+            for _ in range(requests):
+                ticker, elapsed = _timed(client.get_ticker, 'BTC/USDT')
+                latencies.append(elapsed)
+                failed += not ticker
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+            print(f"{name:>20} {failed:>7} {np.mean(latencies) * 1000:>10.1f} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} "
+                  f"{client.exchange.requests:>14}")
+
+        print(f"Outage: {requests // 8} reads while the exchange is unreachable")
+        print(f"{'policy':>20} {'total (s)':>10} {'requests sent':>14}")
+        for name, policy in (('retries, no breaker', RequestPolicy(backoff_base=latency, failure_threshold=10**9)),
+                             ('retries + breaker', RequestPolicy(backoff_base=latency))):
+            client = client_with(policy)
+            client.exchange.down = True
+            _, elapsed = _timed(lambda: [client.get_ticker('BTC/USDT') for _ in range(requests // 8)])
+            print(f"{name:>20} {elapsed:>10.2f} {client.exchange.requests:>14}")
+            print(f"{'':>20} circuit: {policy.stats()['fetch_ticker']['circuit']}, "
+                  f"short-circuited: {policy.stats()['fetch_ticker']['short_circuited']}")
+
+
+def benchmark_orders(symbols=5, latency=0.05):
+    """
+    Compare placing and cancelling bracket orders one by one, pipelined and batched against a mock exchange.
+
+    Args:
+        symbols (int): Symbols to place entry, stop loss and take profit orders for
+        latency (float): Simulated round-trip time in seconds
+    """
+    names = [f'SYM{i}/USDT' for i in range(symbols)]
+    orders = [{'symbol': symbol, 'type': 'limit', 'side': side, 'amount': 1.0, 'price': price}
+              for symbol in names for side, price in (('buy', 100.0), ('sell', 95.0), ('sell', 110.0))]
+
+    with tempfile.TemporaryDirectory() as directory:
+        metadata_cache = MetadataCache(os.path.join(directory, 'metadata.sqlite'))
+        print(f"Order submission: {len(orders)} bracket orders on {symbols} symbols, {latency * 1000:.0f} ms round-trip")
+        print(f"{'method':>22} {'place (ms)':>11} {'cancel (ms)':>12} {'requests':>9}")
+        for method in ('sequential', 'pipelined', 'batched'):
+            client = BitgetClient(scheduler=RequestScheduler(), metadata_cache=metadata_cache)
+            client.exchange = exchange = MockBitget(names, latency)
+            client.load_markets()
+            if method == 'pipelined':
+                exchange.has = dict(exchange.has, createOrders=False, cancelOrders=False)
+
+            if method == 'sequential':
+                placed, place_time = _timed(lambda: [client.create_order(o['symbol'], o['type'], o['side'], o['amount'],
+                                                                         o['price']) for o in orders])
+                # Time cancellations against a full trade budget too
+                client.scheduler = RequestScheduler()
+                _, cancel_time = _timed(lambda: [client.cancel_order(p['id'], p['symbol']) for p in placed])
+            else:
+                placed, place_time = _timed(client.create_orders, orders)
+                client.scheduler = RequestScheduler()
+                _, cancel_time = _timed(client.cancel_orders, placed)
+            print(f"{method:>22} {place_time * 1000:>11.0f} {cancel_time * 1000:>12.0f} {exchange.requests:>9}")
+
+
+BENCHMARKS = {
+    'support_resistance': benchmark_support_resistance,
+    'scheduler': benchmark_scheduler,
+    'optimizer': benchmark_optimizer,
+    'monte_carlo': benchmark_monte_carlo,
+    'portfolio': benchmark_portfolio,
+    'intrabar_fills': benchmark_intrabar_fills,
+    'records': benchmark_records,
+    'metrics': benchmark_metrics,
+    'trade_journal': benchmark_trade_journal,
+    'tracker_metrics': benchmark_tracker_metrics,
+    'checkpoint': benchmark_checkpoint,
+    'streaming': benchmark_streaming,
+    'candle_cache': benchmark_candle_cache,
+    'orders': benchmark_orders,
+    'resilience': benchmark_resilience,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run performance benchmarks')
+    parser.add_argument('names', nargs='*',
+                        help=f"Benchmarks to run (default: all): {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def synthetic_ohlcv(bars, seed=0, freq='5min'):
+    """
+    Random-walk OHLCV DataFrame shaped like BitgetClient.fetch_ohlcv output.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, bars)))
+    open_ = np.concatenate([close[:1], close[:-1]])
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=bars, freq=freq),
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.002, bars))),
+        'low': np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.002, bars))),
+        'close': close,
+        'volume': rng.lognormal(3, 0.5, bars)
+    })
+
+
+@pytest.fixture
+def make_ohlcv():
+    return synthetic_ohlcv
+
+
+class FakeExchange:
+    """
+    Stand-in for the ccxt exchange: tests add the endpoints they need as methods.
+    """
+    
+    def __init__(self):
+        self.has = {}
+        self.markets = {}
+        self.currencies = {}
+        self.calls = []
+        
+    def load_markets(self, reload=False):
+        self.calls.append(('load_markets',))
+        return self.markets
+    
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.currencies = currencies or {}
+
+
+@pytest.fixture
+def make_client(tmp_path):
+    from utils.api_client import BitgetClient
+    from utils.metadata_cache import MetadataCache
+    from utils.rate_limiter import RequestScheduler
+    from utils.resilience import RequestPolicy
+    
+    def make_client(exchange):
+        # Private scheduler, policy and metadata so tests neither share state nor wait
+        client = BitgetClient(scheduler=RequestScheduler(), request_policy=RequestPolicy(backoff_base=0),
+                              metadata_cache=MetadataCache(str(tmp_path / 'metadata.sqlite')))
+        client._exchange = exchange
+        return client
+    return make_client
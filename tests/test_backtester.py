@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The strategy computes indicators with pandas_ta
+pytest.importorskip('pandas_ta')
+
+from utils.api_client import BitgetClient
+from utils.backtester import Backtester, _intrabar_exit, _lower_timeframe_map
+
+
+@pytest.fixture
+def market(make_ohlcv):
+    df = make_ohlcv(3000, seed=5)
+    return df, BitgetClient.find_liquidity_levels(df.iloc[:500])
+
+
+def test_intrabar_exit_fills():
+    # Long with stop 95 and target 110
+    assert _intrabar_exit(1, 95, 110, 100, 105, 96) == (None, None)
+    assert _intrabar_exit(1, 95, 110, 100, 105, 94) == (95, 'stop_loss')
+    assert _intrabar_exit(1, 95, 110, 100, 111, 96) == (110, 'take_profit')
+    # Gaps through a level fill at the open
+    assert _intrabar_exit(1, 95, 110, 93, 99, 92) == (93, 'stop_loss')
+    assert _intrabar_exit(-1, 105, 90, 88, 89, 87) == (88, 'take_profit')
+    # Both touched: the stop is assumed first without lower-timeframe candles
+    assert _intrabar_exit(1, 95, 110, 100, 111, 94) == (95, 'stop_loss')
+    
+    bar_times = pd.DatetimeIndex(pd.date_range('2024-01-01', periods=2, freq='1h'))
+    lower_df = pd.DataFrame({'timestamp': pd.date_range('2024-01-01', periods=8, freq='15min'),
+                             'high': [101, 111, 104, 103, 101, 101, 101, 101],
+                             'low': [99, 100, 96, 94, 99, 99, 99, 99]})
+    lower = _lower_timeframe_map(bar_times, lower_df)
+    # The second 15m candle reaches the target before any touches the stop
+    assert _intrabar_exit(1, 95, 110, 100, 111, 94, lower, 0) == (110, 'take_profit')
+    assert _intrabar_exit(-1, 110, 95, 100, 111, 94, lower, 0) == (110, 'stop_loss')
+
+
+def test_intrabar_fills_stay_inside_the_exit_bar(market):
+    df, levels = market
+    result = Backtester().run_backtest(df, levels, fills='intrabar')
+    exits = [trade for trade in result['trades'] if trade['result'] in ('stop_loss', 'take_profit')]
+    assert exits
+    bars = df.set_index('timestamp').loc[[trade['exit_date'] for trade in exits]]
+    prices = np.array([trade['exit_price'] for trade in exits])
+    assert np.all((bars['low'].to_numpy() <= prices) & (prices <= bars['high'].to_numpy()))
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_after(checkpoints):
+    seen = []
+    
+    def on_checkpoint(partial):
+        seen.append(partial['bar'])
+        if len(seen) == checkpoints:
+            raise Interrupted
+    return on_checkpoint
+
+
+def test_resumed_backtest_equals_an_uninterrupted_run(market, tmp_path):
+    df, levels = market
+    backtester = Backtester()
+    full = backtester.run_backtest(df, levels, fills='intrabar')
+    checkpoint_file = str(tmp_path / 'run.ckpt')
+    with pytest.raises(Interrupted):
+        backtester.run_backtest(df, levels, fills='intrabar', checkpoint_file=checkpoint_file, checkpoint_every=500,
+                                on_checkpoint=interrupt_after(3))
+        
+    # A checkpoint only resumes the run it was written for
+    with pytest.raises(ValueError):
+        backtester.resume_backtest(df, checkpoint_file, levels, fills='close')
+    with pytest.raises(ValueError):
+        backtester.resume_backtest(df, checkpoint_file, levels, fills='intrabar', lower_df=df)
+        
+    resumed = backtester.resume_backtest(df, checkpoint_file, levels, fills='intrabar')
+    assert resumed['trades'] == full['trades']
+    assert resumed['equity_curve'] == full['equity_curve']
+    assert resumed['metrics'] == full['metrics']
+    assert resumed['final_balance'] == full['final_balance']
+    assert not os.path.exists(checkpoint_file)
+
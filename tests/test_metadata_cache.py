@@ -0,0 +1,92 @@
+import multiprocessing
+import time
+
+import pytest
+
+from conftest import FakeExchange
+from utils.metadata_cache import MetadataCache
+
+
+def counting_fetch(log_file, value='markets'):
+    def fetch():
+        with open(log_file, 'a') as f:
+            f.write('fetch\n')
+        time.sleep(0.2)
+        return value
+    return fetch
+
+
+def fetch_count(log_file):
+    try:
+        with open(log_file) as f:
+            return len(f.readlines())
+    except FileNotFoundError:
+        return 0
+
+
+def read_markets(path, log_file):
+    MetadataCache(path).get('bitget:markets', counting_fetch(log_file), ttl=60)
+
+
+def test_entries_are_fetched_once_per_ttl(tmp_path):
+    path, log_file = str(tmp_path / 'metadata.sqlite'), str(tmp_path / 'fetches.log')
+    cache = MetadataCache(path)
+    value, fetched_at = cache.get('bitget:markets', counting_fetch(log_file), ttl=60)
+    assert value == 'markets'
+    assert cache.get('bitget:markets', counting_fetch(log_file), ttl=60) == (value, fetched_at)
+    
+    # Another cache on the same file reads the stored value
+    assert MetadataCache(path).get('bitget:markets', counting_fetch(log_file), ttl=60) == (value, fetched_at)
+    assert fetch_count(log_file) == 1
+    
+    assert cache.get('bitget:markets', counting_fetch(log_file, 'new'), ttl=60, refresh=True)[0] == 'new'
+    assert cache.get('bitget:markets', counting_fetch(log_file, 'newer'), ttl=0)[0] == 'newer'
+    assert fetch_count(log_file) == 3
+
+
+def test_processes_share_one_fetch(tmp_path):
+    path, log_file = str(tmp_path / 'metadata.sqlite'), str(tmp_path / 'fetches.log')
+    MetadataCache(path)
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=read_markets, args=(path, log_file)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+        assert process.exitcode == 0
+    assert fetch_count(log_file) == 1
+
+
+def test_failed_refresh_falls_back_to_the_expired_value(tmp_path):
+    cache = MetadataCache(str(tmp_path / 'metadata.sqlite'))
+    
+    def failing_fetch():
+        raise ConnectionError('exchange down')
+    with pytest.raises(ConnectionError):
+        cache.get('bitget:markets', failing_fetch, ttl=60)
+        
+    value, fetched_at = cache.get('bitget:markets', lambda: 'markets', ttl=60)
+    assert cache.get('bitget:markets', failing_fetch, ttl=0) == (value, fetched_at)
+    
+    cache.invalidate('bitget:markets')
+    with pytest.raises(ConnectionError):
+        cache.get('bitget:markets', failing_fetch, ttl=60)
+
+
+def test_clients_load_markets_from_the_cache(make_client):
+    exchange = FakeExchange()
+    
+    def load_markets(reload=False):
+        exchange.calls.append(('load_markets',))
+        exchange.markets = {'BTC/USDT': {'symbol': 'BTC/USDT'}}
+        exchange.currencies = {'BTC': {}, 'USDT': {}}
+        return exchange.markets
+    exchange.load_markets = load_markets
+    
+    assert list(make_client(exchange).load_markets()) == ['BTC/USDT']
+    # A fresh client (and exchange) sharing the cache file makes no request
+    other = FakeExchange()
+    assert list(make_client(other).load_markets()) == ['BTC/USDT']
+    assert other.currencies == {'BTC': {}, 'USDT': {}}
+    assert exchange.calls == [('load_markets',)]
+    assert other.calls == []
@@ -0,0 +1,41 @@
+import numpy as np
+
+from utils.monte_carlo import MonteCarloSimulator
+
+
+def random_trades(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{'profit': float(profit), 'commission': 0.5} for profit in rng.normal(5, 120, count)]
+
+
+def reference_path(returns, initial_balance):
+    balance = peak = initial_balance
+    drawdown = 0.0
+    for trade_return in returns:
+        balance *= 1 + trade_return
+        peak = max(peak, balance)
+        drawdown = max(drawdown, 1 - balance / peak)
+    return balance, drawdown
+
+
+def test_paths_match_a_trade_by_trade_loop_whatever_the_chunking():
+    simulator = MonteCarloSimulator(random_trades(200), 10000)
+    whole = simulator.simulate(paths=300, seed=3)
+    # Chunks of 7 paths draw the same random stream
+    chunked = simulator.simulate(paths=300, seed=3, max_cells=7 * 200)
+    np.testing.assert_array_equal(whole['final_balance'], chunked['final_balance'])
+    np.testing.assert_array_equal(whole['max_drawdown'], chunked['max_drawdown'])
+    
+    idx = np.random.default_rng(3).integers(0, 200, size=(300, 200))
+    for path in (0, 150, 299):
+        balance, drawdown = reference_path(simulator.returns[idx[path]], 10000)
+        assert np.isclose(whole['final_balance'][path], balance)
+        assert np.isclose(whole['max_drawdown'][path], drawdown)
+
+
+def test_permuted_paths_keep_the_backtest_final_balance():
+    trades = random_trades(100)
+    final = 10000 + sum(trade['profit'] - trade['commission'] for trade in trades)
+    result = MonteCarloSimulator(trades, 10000).simulate(paths=50, method='permute', seed=1, max_cells=1000)
+    np.testing.assert_allclose(result['final_balance'], final)
+    assert 0 <= result['risk_of_ruin'] <= 1
@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+# The optimizer's strategy computes indicators with pandas_ta
+pytest.importorskip('pandas_ta')
+
+from utils.api_client import BitgetClient
+from utils.backtester import Backtester
+from utils.optimizer import ParameterOptimizer
+from utils.strategy import TradingStrategy
+
+GRID = {'sr_window': [5, 10], 'reward_multiple': [1.5, 3]}
+
+
+@pytest.fixture
+def optimizer(make_ohlcv):
+    df = make_ohlcv(3000, seed=11)
+    return ParameterOptimizer(df, BitgetClient.find_liquidity_levels(df.iloc[:500]))
+
+
+def test_grid_search_pool_results_equal_serial(optimizer):
+    serial = optimizer.grid_search(GRID, max_workers=0)
+    pooled = optimizer.grid_search(GRID, max_workers=2)
+    assert len(serial) == 4
+    assert (serial['total_trades'] > 0).any()
+    pd.testing.assert_frame_equal(serial, pooled)
+
+
+def test_walk_forward_stitches_folds_like_a_chained_run(optimizer):
+    result = optimizer.walk_forward(GRID, in_sample=1000, out_of_sample=500, max_workers=0)
+    folds = result['folds']
+    df = optimizer.df
+    assert len(folds) == 4
+    # Out-of-sample periods tile the history after the first in-sample window
+    starts = df.index[df['timestamp'].isin(folds['out_of_sample_start'])]
+    ends = df.index[df['timestamp'].isin(folds['out_of_sample_end'])]
+    assert list(starts[1:]) == list(ends[:-1] + 1)
+    assert starts[0] == 50 + 1000 and ends[-1] == len(df) - 1
+    
+    balance = optimizer.starting_balance
+    for _, fold in folds.iterrows():
+        strategy = TradingStrategy(risk_percentage=2.0, sr_window=int(fold['sr_window']),
+                                   reward_multiple=float(fold['reward_multiple']))
+        start = df.index[df['timestamp'] == fold['out_of_sample_start']][0]
+        end = df.index[df['timestamp'] == fold['out_of_sample_end']][0] + 1
+        analysis_df = strategy.calculate_indicators(df)
+        run = Backtester(balance, strategy=strategy).run_backtest(
+            df.iloc[start - 50:end], optimizer.liquidity_levels, analysis_df=analysis_df.iloc[start - 50:end])
+        balance = run['final_balance']
+    assert result['final_balance'] == pytest.approx(balance, rel=1e-12)
+    
+    pooled = optimizer.walk_forward(GRID, in_sample=1000, out_of_sample=500, max_workers=2)
+    assert pooled['final_balance'] == result['final_balance']
+    pd.testing.assert_frame_equal(pooled['folds'], folds)
+
+
+def test_resumed_grid_search_only_runs_the_remaining_backtests(optimizer, tmp_path, monkeypatch):
+    import utils.optimizer as optimizer_module
+    
+    expected = optimizer.grid_search(GRID, max_workers=0)
+    backtest_window = optimizer_module._backtest_window
+    calls = []
+    
+    def interrupted_window(task):
+        calls.append(task)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return backtest_window(task)
+    monkeypatch.setattr(optimizer_module, '_backtest_window', interrupted_window)
+    
+    checkpoint_file = str(tmp_path / 'grid.ckpt')
+    with pytest.raises(KeyboardInterrupt):
+        optimizer.grid_search(GRID, max_workers=0, checkpoint_file=checkpoint_file)
+    calls.clear()
+    resumed = optimizer.grid_search(GRID, max_workers=0, checkpoint_file=checkpoint_file)
+    assert len(calls) == 2
+    pd.testing.assert_frame_equal(resumed, expected)
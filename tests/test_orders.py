@@ -0,0 +1,84 @@
+import ccxt
+import pytest
+
+from conftest import FakeExchange
+
+
+class OrderExchange(FakeExchange):
+    """
+    Batch-capable exchange that rejects orders with an amount of 0.
+    """
+    
+    def __init__(self, batched=True):
+        super().__init__()
+        self.has = {'createOrders': batched, 'cancelOrders': batched}
+        self.requests = []
+        
+    def create_order(self, symbol, type, side, amount, price=None, params={}):
+        self.requests.append(('create_order', symbol))
+        if not amount:
+            raise ccxt.InvalidOrder('amount must be positive')
+        return {'id': f'{symbol}-{side}-{amount}', 'symbol': symbol, 'clientOrderId': params['clientOrderId']}
+    
+    def create_orders(self, orders, params={}):
+        self.requests.append(('create_orders', orders[0]['symbol']))
+        # ccxt validates every order up front and refuses the whole batch
+        if any(not order['amount'] for order in orders):
+            raise ccxt.InvalidOrder('amount must be positive')
+        results = []
+        for order in reversed(orders):
+            client_id = order['params']['clientOrderId']
+            if order['price'] == 'rejected':
+                results.append({'clientOrderId': client_id, 'info': {'errorMsg': 'price out of range',
+                                                                      'errorCode': '40808'}})
+            elif order['price'] != 'dropped':
+                results.append({'id': f"{order['symbol']}-{order['side']}-{order['amount']}",
+                                'clientOrderId': client_id, 'info': {}})
+        return results
+    
+    def cancel_order(self, id, symbol=None, params={}):
+        self.requests.append(('cancel_order', symbol))
+        return {'id': id}
+    
+    def cancel_orders(self, ids, symbol=None, params={}):
+        self.requests.append(('cancel_orders', symbol))
+        return [{'id': id} for id in ids if id != 'unknown']
+
+
+def order(symbol, side, amount, price=None):
+    return {'symbol': symbol, 'type': 'limit', 'side': side, 'amount': amount, 'price': price}
+
+
+def test_orders_are_batched_per_symbol_and_matched_back(make_client):
+    exchange = OrderExchange()
+    results = make_client(exchange).create_orders([
+        order('BTC/USDT', 'buy', 1), order('ETH/USDT', 'buy', 2), order('BTC/USDT', 'sell', 3, 'rejected'),
+        order('BTC/USDT', 'sell', 4, 'dropped'), order('BTC/USDT', 'sell', 5),
+    ])
+    assert [result.get('id') for result in results] == [
+        'BTC/USDT-buy-1', 'ETH/USDT-buy-2', None, None, 'BTC/USDT-sell-5'
+    ]
+    assert results[2] == {'error': 'price out of range', 'code': '40808'}
+    assert results[3] == {'error': 'Order was not placed'}
+    assert sorted(exchange.requests) == [('create_order', 'ETH/USDT'), ('create_orders', 'BTC/USDT')]
+
+
+@pytest.mark.parametrize('batched', [True, False])
+def test_refused_batch_falls_back_per_order(make_client, batched):
+    exchange = OrderExchange(batched)
+    results = make_client(exchange).create_orders([
+        order('BTC/USDT', 'buy', 1), order('BTC/USDT', 'sell', 0), order('BTC/USDT', 'sell', 3),
+    ])
+    assert results[0]['id'] == 'BTC/USDT-buy-1'
+    assert results[1] == {'error': 'amount must be positive'}
+    assert results[2]['id'] == 'BTC/USDT-sell-3'
+    assert exchange.requests.count(('create_order', 'BTC/USDT')) == 3
+
+
+def test_cancel_orders_reports_orders_left_open(make_client):
+    exchange = OrderExchange()
+    results = make_client(exchange).cancel_orders([
+        ('1', 'BTC/USDT'), {'id': 'unknown', 'symbol': 'BTC/USDT'}, ('2', 'ETH/USDT'), ('3', 'BTC/USDT'),
+    ])
+    assert results == [{'id': '1'}, {'error': 'Order was not cancelled'}, {'id': '2'}, {'id': '3'}]
+    assert sorted(exchange.requests) == [('cancel_order', 'ETH/USDT'), ('cancel_orders', 'BTC/USDT')]
@@ -0,0 +1,67 @@
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from utils.performance_tracker import PerformanceTracker
+
+
+def random_trades(count, seed=0):
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1)
+    trades = []
+    for i in range(count):
+        # Entries jitter around the trade order, so some trades opened before the previous one
+        entry = start + timedelta(hours=4 * i + int(rng.integers(-12, 12)))
+        exit_ = entry + timedelta(hours=int(rng.integers(1, 48)))
+        entry_price = float(rng.uniform(90, 110))
+        exit_price = entry_price * (1 + float(rng.normal(0, 0.02)))
+        size = float(rng.uniform(0.1, 2))
+        trades.append({
+            'entry_date': entry,
+            'exit_date': exit_,
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'type': 'long',
+            'size': size,
+            'profit': (exit_price - entry_price) * size,
+            'commission': (entry_price + exit_price) * size * 0.001
+        })
+    return trades
+
+
+def test_running_metrics_match_full_recompute_and_survive_reload(tmp_path):
+    data_file = str(tmp_path / 'performance_data.sqlite')
+    tracker = PerformanceTracker(data_file, verify_metrics=True)
+    tracker.initialize_tracker(10000)
+    trades = random_trades(300)
+    assert any(later['entry_date'] < earlier['entry_date'] for earlier, later in zip(trades, trades[1:]))
+    
+    for trade in trades:
+        # verify_metrics raises if the running metrics drift from a full recompute
+        assert tracker.record_trade(trade)
+    assert tracker.get_metrics()['total_trades'] == 300
+    
+    reloaded = PerformanceTracker(data_file, verify_metrics=True)
+    assert reloaded.trades == tracker.trades
+    assert reloaded.equity_curve == tracker.equity_curve
+    assert reloaded.current_balance == tracker.current_balance
+    assert reloaded.get_metrics() == tracker.get_metrics()
+    
+    # The reloaded running totals keep matching a full recompute
+    assert reloaded.record_trade(random_trades(1, seed=1)[0])
+
+
+def test_save_data_rewrites_and_compacts_the_journal(tmp_path):
+    data_file = str(tmp_path / 'performance_data.sqlite')
+    tracker = PerformanceTracker(data_file)
+    tracker.initialize_tracker(10000)
+    for trade in random_trades(200, seed=1):
+        tracker.record_trade(trade)
+    assert os.path.getsize(data_file + '-wal') > 0
+    
+    # Drop the losing trades and rewrite the journal
+    tracker.trades = [trade for trade in tracker.trades if trade['profit'] > 0]
+    assert tracker.save_data()
+    assert os.path.getsize(data_file + '-wal') == 0
+    assert PerformanceTracker(data_file).trades == tracker.trades
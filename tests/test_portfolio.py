@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+# The strategy computes indicators with pandas_ta
+pytest.importorskip('pandas_ta')
+
+from utils.api_client import BitgetClient
+from utils.backtester import PortfolioBacktester
+from utils.strategy import TradingStrategy
+
+
+def reference_portfolio(frames, levels, strategy, warmup=50, balance=10000, commission_rate=0.001):
+    """
+    Plain per-bar loop over a dict of signals per symbol and timestamp.
+    """
+    signals = {}
+    for symbol, df in frames.items():
+        analysis_df = strategy.calculate_indicators(df.copy())
+        symbol_signals = strategy.precompute_signals(analysis_df, levels[symbol])
+        symbol_signals['direction'][:warmup] = 0
+        signals[symbol] = {
+            timestamp: row for timestamp, *row in zip(
+                pd.DatetimeIndex(analysis_df['timestamp']), analysis_df['close'], symbol_signals['direction'],
+                symbol_signals['stop_loss'], symbol_signals['take_profit'])
+        }
+        
+    positions, trades = {}, []
+    for timestamp in sorted(set().union(*signals.values())):
+        for symbol in list(positions):
+            if timestamp not in signals[symbol]:
+                continue
+            close, position = signals[symbol][timestamp][0], positions[symbol]
+            side = position['side']
+            if side * (close - position['stop_loss']) <= 0:
+                exit_price = position['stop_loss']
+            elif side * (close - position['take_profit']) >= 0:
+                exit_price = position['take_profit']
+            else:
+                continue
+            profit = side * position['size'] * (exit_price - position['entry_price'])
+            balance += profit - position['size'] * exit_price * commission_rate
+            trades.append((symbol, position['entry_date'], timestamp, profit))
+            del positions[symbol]
+        for symbol in frames:
+            if symbol in positions or timestamp not in signals[symbol] or len(positions) >= strategy.max_open_trades:
+                continue
+            close, direction, stop_loss, take_profit = signals[symbol][timestamp]
+            if direction == 0:
+                continue
+            size = balance * (strategy.risk_percentage / 100) / abs(close - stop_loss)
+            notional = sum(p['size'] * p['entry_price'] for p in positions.values())
+            if notional + size * close * (1 + commission_rate) > balance:
+                continue
+            balance -= size * close * commission_rate
+            positions[symbol] = {'side': direction, 'size': size, 'entry_price': close, 'stop_loss': stop_loss,
+                                 'take_profit': take_profit, 'entry_date': timestamp}
+    return trades
+
+
+def test_portfolio_matches_a_per_bar_reference(make_ohlcv):
+    frames = {f'S{i}/USDT': make_ohlcv(2000, seed=20 + i) for i in range(4)}
+    # A symbol listed later than the others
+    frames['S3/USDT'] = frames['S3/USDT'].iloc[600:].reset_index(drop=True)
+    levels = {symbol: BitgetClient.find_liquidity_levels(df.iloc[:300]) for symbol, df in frames.items()}
+    strategy = TradingStrategy(risk_percentage=0.5)
+    
+    result = PortfolioBacktester(strategy=strategy).run_backtest(frames, levels)
+    closed = [trade for trade in result['trades'] if trade['result'] != 'end_of_period']
+    expected = reference_portfolio(frames, levels, strategy)
+    assert len(expected) > 20
+    actual = sorted((t['symbol'], t['entry_date'], t['exit_date'], t['profit']) for t in closed)
+    assert [trade[:3] for trade in actual] == [trade[:3] for trade in sorted(expected)]
+    assert [trade[3] for trade in actual] == pytest.approx([trade[3] for trade in sorted(expected)], rel=1e-9)
+    
+    # Never more positions open at once than the strategy allows
+    events = sorted([(t['entry_date'], 1) for t in result['trades']] + [(t['exit_date'], -1) for t in result['trades']])
+    open_positions = peak = 0
+    for _, change in events:
+        open_positions += change
+        peak = max(peak, open_positions)
+    assert peak <= strategy.max_open_trades
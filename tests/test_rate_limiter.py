@@ -0,0 +1,63 @@
+import threading
+import time
+
+from utils.rate_limiter import RequestScheduler
+
+
+def start_waiting(scheduler, endpoint, count):
+    threads = [threading.Thread(target=scheduler.acquire, args=(endpoint,), daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    # Let them queue up
+    time.sleep(0.05)
+    return threads
+
+
+def test_market_data_flows_while_orders_wait_on_the_trade_budget():
+    scheduler = RequestScheduler(buckets={'ip': (100, 100), 'market': (20, 20), 'trade': (1, 1), 'account': (1, 1)})
+    scheduler.acquire('create_order')
+    scheduler.acquire('fetch_balance')
+    # The trade and account budgets are spent, so these wait for seconds
+    start_waiting(scheduler, 'create_order', 30)
+    start_waiting(scheduler, 'fetch_balance', 1)
+    
+    start = time.perf_counter()
+    for _ in range(10):
+        scheduler.acquire('fetch_ohlcv')
+    assert time.perf_counter() - start < 0.2
+
+
+def test_waiting_orders_go_before_later_market_data():
+    scheduler = RequestScheduler(buckets={'ip': (20, 1), 'market': (100, 100), 'trade': (100, 100),
+                                          'account': (100, 100)})
+    scheduler.acquire('fetch_ticker')
+    order = []
+    
+    def acquire(endpoint):
+        scheduler.acquire(endpoint)
+        order.append(endpoint)
+        
+    market = [threading.Thread(target=acquire, args=('fetch_ticker',)) for _ in range(3)]
+    for thread in market:
+        thread.start()
+    time.sleep(0.01)
+    orders = threading.Thread(target=acquire, args=('create_order',))
+    orders.start()
+    for thread in market + [orders]:
+        thread.join(5)
+    # The order queued last but outranks the market data still waiting on the shared ip budget
+    assert order.index('create_order') == 0
+
+
+def test_try_acquire_leaves_reserved_budget_alone():
+    scheduler = RequestScheduler(buckets={'ip': (100, 100), 'market': (1, 2), 'trade': (1, 1), 'account': (1, 1)})
+    assert scheduler.try_acquire('fetch_ticker')
+    assert scheduler.try_acquire('fetch_ticker')
+    assert not scheduler.try_acquire('fetch_ticker')
+    
+    scheduler.acquire('create_order')
+    start_waiting(scheduler, 'create_order', 1)
+    # The waiting order gets the next trade token first, while market data has budget to spare
+    time.sleep(1.05)
+    assert not scheduler.try_acquire('cancel_order')
+    assert scheduler.try_acquire('fetch_ticker')
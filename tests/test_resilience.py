@@ -0,0 +1,115 @@
+import time
+
+import ccxt
+import pytest
+
+from utils.rate_limiter import RequestScheduler
+from utils.resilience import CircuitOpenError, RequestPolicy
+
+
+def failing(error, times):
+    calls = []
+    
+    def func():
+        calls.append(1)
+        if len(calls) <= times:
+            raise error
+        return 'ok'
+    return func, calls
+
+
+@pytest.fixture
+def policy():
+    delays = []
+    policy = RequestPolicy(seed=1, sleep=delays.append)
+    policy.delays = delays
+    return policy
+
+
+def test_transient_read_failures_are_retried_with_backoff(policy):
+    func, calls = failing(ccxt.RequestTimeout('timed out'), 2)
+    assert policy.call('fetch_ticker', func) == 'ok'
+    assert len(calls) == 3
+    assert 0 <= policy.delays[0] <= 0.25 and 0 <= policy.delays[1] <= 0.5
+    
+    func, calls = failing(ccxt.RequestTimeout('timed out'), 5)
+    with pytest.raises(ccxt.RequestTimeout):
+        policy.call('fetch_ticker', func)
+    assert len(calls) == policy.max_retries + 1
+
+
+def test_orders_are_only_resent_when_the_exchange_refused_them(policy):
+    # A timed out order may have been placed
+    func, calls = failing(ccxt.RequestTimeout('timed out'), 1)
+    with pytest.raises(ccxt.RequestTimeout):
+        policy.call('create_order', func)
+    assert len(calls) == 1
+    
+    func, calls = failing(ccxt.RateLimitExceeded('slow down'), 1)
+    assert policy.call('create_order', func) == 'ok'
+    assert len(calls) == 2
+
+
+def test_permanent_errors_are_not_retried(policy):
+    func, calls = failing(ccxt.BadSymbol('no such market'), 1)
+    with pytest.raises(ccxt.BadSymbol):
+        policy.call('fetch_ticker', func)
+    assert len(calls) == 1
+    assert policy.stats()['fetch_ticker']['circuit'] == 'closed'
+
+
+def test_circuit_opens_fails_fast_and_recovers():
+    now = [0.0]
+    policy = RequestPolicy(max_retries=0, failure_threshold=3, reset_timeout=10, clock=lambda: now[0],
+                           sleep=lambda delay: None)
+    func, calls = failing(ccxt.ExchangeNotAvailable('down'), 100)
+    for _ in range(3):
+        with pytest.raises(ccxt.ExchangeNotAvailable):
+            policy.call('fetch_time', func)
+    assert policy.stats()['fetch_time']['circuit'] == 'open'
+    with pytest.raises(CircuitOpenError):
+        policy.call('fetch_time', func)
+    assert len(calls) == 3
+    # Other endpoints keep their own circuits
+    assert policy.call('fetch_ticker', lambda: 'ok') == 'ok'
+    
+    # After the reset timeout a single trial goes through; its failure reopens the circuit
+    now[0] = 11
+    with pytest.raises(ccxt.ExchangeNotAvailable):
+        policy.call('fetch_time', func)
+    assert len(calls) == 4
+    assert policy.stats()['fetch_time']['circuit'] == 'open'
+    with pytest.raises(CircuitOpenError):
+        policy.call('fetch_time', func)
+        
+    now[0] = 22
+    assert policy.call('fetch_time', lambda: 'ok') == 'ok'
+    assert policy.stats()['fetch_time']['circuit'] == 'closed'
+
+
+def test_hedged_read_returns_the_first_answer():
+    policy = RequestPolicy(hedge=True, hedge_delay=0.01)
+    calls = []
+    
+    def slow_first():
+        calls.append(1)
+        attempt = len(calls)
+        time.sleep(1.0 if attempt == 1 else 0.01)
+        return attempt
+    start = time.perf_counter()
+    assert policy.call('fetch_ohlcv', slow_first) == 2
+    assert time.perf_counter() - start < 0.5
+    assert policy.stats()['fetch_ohlcv']['hedge_wins'] == 1
+    
+    # Orders are never hedged
+    calls.clear()
+    assert policy.call('create_order', slow_first) == 1
+
+
+def test_hedges_only_spend_spare_rate_limit_budget():
+    policy = RequestPolicy(hedge=True, hedge_delay=0.01)
+    # One market data request per bucket, refilling too slowly for a hedge
+    scheduler = RequestScheduler(buckets={'ip': (0.001, 1), 'market': (0.001, 1),
+                                          'trade': (1, 1), 'account': (1, 1)})
+    assert policy.call('fetch_ticker', lambda: time.sleep(0.05) or 'ok', scheduler=scheduler) == 'ok'
+    assert policy.stats()['fetch_ticker']['hedges_skipped'] == 1
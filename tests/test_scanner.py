@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+# The scanner's strategy computes indicators with pandas_ta
+pytest.importorskip('pandas_ta')
+
+import utils.scanner as scanner_module
+from utils.scanner import MarketScanner
+
+
+class CandleClient:
+    def __init__(self, candles):
+        self.candles = candles
+        
+    def fetch_ohlcv(self, symbol, timeframe='1h', limit=100):
+        return self.candles.get(symbol, pd.DataFrame())
+
+
+def test_failed_markets_are_reported_without_aborting_the_scan(make_ohlcv, monkeypatch):
+    analyze_market = scanner_module.analyze_market
+    
+    def analyze(symbol, timeframe, df, look_back=100):
+        if symbol == 'ETH/USDT':
+            raise KeyError('close')
+        return analyze_market(symbol, timeframe, df, look_back)
+    monkeypatch.setattr(scanner_module, 'analyze_market', analyze)
+    
+    client = CandleClient({'BTC/USDT': make_ohlcv(200, seed=1), 'ETH/USDT': make_ohlcv(200, seed=2)})
+    result = MarketScanner(client, analysis_workers=0).scan(['BTC/USDT', 'ETH/USDT', 'SOL/USDT'])
+    assert list(result['symbol']) == ['BTC/USDT']
+    assert sorted(result.attrs['failed']) == ['ETH/USDT 1h', 'SOL/USDT 1h']
+    assert result.attrs['markets'] == 3
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+# utils.strategy computes indicators with pandas_ta
+pytest.importorskip('pandas_ta')
+
+from utils.api_client import BitgetClient
+from utils.strategy import TradingStrategy
+
+
+# The default pivot window never lets closes break a pivot before its retest,
+# so a short one covers break and retest patterns
+@pytest.mark.parametrize('sr_window', [10, 2])
+def test_precompute_signals_matches_per_bar_signals(sr_window, make_ohlcv):
+    strategy = TradingStrategy(sr_window=sr_window)
+    df = make_ohlcv(1500, seed=7)
+    levels = BitgetClient.find_liquidity_levels(df.iloc[:500])
+    analysis_df = strategy.calculate_indicators(df.copy())
+    signals = strategy.precompute_signals(analysis_df, levels)
+    
+    found = set()
+    for bar in range(29, len(df)):
+        # The trailing 30 candles generate_trade_signal sees, with pivots confirmed inside
+        # them only and the full series' ATR, as precompute_signals documents
+        window = analysis_df.iloc[bar - 29:bar + 1].copy()
+        strategy._add_support_resistance(window, strategy.sr_window)
+        date = df['timestamp'].iloc[bar]
+        known = [level for level in levels if level['timestamp'] < date]
+        signal = strategy.generate_trade_signal(window, known, precomputed=True)
+        
+        if signal is None:
+            assert signals['direction'][bar] == 0, bar
+            continue
+        found.add(signal['type'])
+        assert signals['direction'][bar] == (1 if signal['signal'] == 'buy' else -1), bar
+        assert df['timestamp'].iloc[signals['pattern_idx'][bar]] == signal['date'], bar
+        assert np.isclose(signals['stop_loss'][bar], signal['stop_loss']), bar
+        assert np.isclose(signals['take_profit'][bar], signal['take_profit']), bar
+    assert found
+    if sr_window == 2:
+        assert {'resistance_break_retest', 'support_break_retest'} & found
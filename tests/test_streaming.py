@@ -0,0 +1,90 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import FakeExchange
+from utils.streaming import MarketStream, ReplayServer
+
+
+@pytest.fixture
+def candles():
+    close = np.linspace(100, 130, 120)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=len(close), freq='1h'),
+        'open': close - 0.5,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': np.arange(len(close)) + 1.0,
+    })
+
+
+def wait_until_finished(stream, candles, timeout=10.0):
+    # The replay sends every candle's opening tick before the finished candle
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        streamed = stream.candles('BTC/USDT', '1h')
+        if len(streamed) and streamed['volume'].iloc[-1] == candles['volume'].iloc[-1]:
+            return streamed
+        time.sleep(0.01)
+    raise AssertionError('replay did not finish')
+
+
+@pytest.fixture
+def server(candles):
+    server = ReplayServer({('BTC/USDT', '1h'): candles}, interval=0.001, snapshot=10).start()
+    yield server
+    server.stop()
+
+
+def test_replayed_candles_match_the_recording(server, candles):
+    with MarketStream(server.url) as stream:
+        stream.subscribe_candles('BTC/USDT', '1h')
+        stream.subscribe_ticker('BTC/USDT')
+        streamed = wait_until_finished(stream, candles)
+        assert stream.wait_for('BTC/USDT')
+        assert stream.live
+        pd.testing.assert_frame_equal(streamed.reset_index(drop=True), candles, check_dtype=False)
+        assert stream.ticker('BTC/USDT')['symbol'] == 'BTC/USDT'
+        assert stream.stats()['errors'] == 0
+    assert not stream.live
+
+
+def test_unhandled_messages_are_counted_and_skipped(server, candles):
+    stream = MarketStream(server.url)
+    buffer = stream.subscribe_candles('BTC/USDT', '1h')
+    update = buffer.update
+    failures = [1]
+    
+    def flaky_update(candle):
+        if failures[0]:
+            failures[0] -= 1
+            raise ValueError('malformed kline')
+        return update(candle)
+    buffer.update = flaky_update
+    
+    with stream:
+        # Unknown channels are rejected by the server and counted too
+        stream.subscribe_candles('ETH/USDT', '1h')
+        # The malformed snapshot is dropped whole; the updates after it still arrive
+        streamed = wait_until_finished(stream, candles)
+        stats = stream.stats()
+        assert stream.live
+        assert stats['errors'] == 2
+        assert stats['reconnects'] == 0
+    pd.testing.assert_frame_equal(streamed.reset_index(drop=True), candles.iloc[10:].reset_index(drop=True),
+                                  check_dtype=False)
+
+
+def test_client_falls_back_to_rest_when_the_stream_is_down(server, make_client):
+    exchange = FakeExchange()
+    exchange.fetch_ticker = lambda symbol, params={}: {'symbol': symbol, 'last': 1.0}
+    client = make_client(exchange)
+    client.stream = MarketStream(server.url)
+    client.stream.subscribe_ticker('BTC/USDT')
+    with client.stream:
+        assert client.stream.wait_for('BTC/USDT')
+        assert client.get_ticker('BTC/USDT') is client.stream.ticker('BTC/USDT')
+    assert client.get_ticker('BTC/USDT') == {'symbol': 'BTC/USDT', 'last': 1.0}
@@ -1,39 +1,106 @@
 import os
 import ccxt
 import pandas as pd
+import threading
 import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import numpy as np
+from utils.candle_cache import CandleBuffer, CandleCache
+from utils.metadata_cache import MetadataCache
+from utils.rate_limiter import get_scheduler
+from utils.resilience import get_request_policy
+from utils.streaming import MarketStream
 
 class BitgetClient:
     """
     Client for interacting with the Bitget exchange API.
+    
+    Construction makes no requests: the ccxt exchange is created on first use
+    and market metadata is loaded from a disk cache shared between processes,
+    refreshed from the exchange at most once per MARKETS_TTL.
     """
-    def __init__(self):
+    # Maximum candles per request on Bitget's historical candles endpoint
+    OHLCV_PAGE_LIMIT = 200
+    # Seconds market metadata (symbols, precision, limits) is reused before refetching
+    MARKETS_TTL = 6 * 60 * 60
+    # Maximum orders per request on Bitget's batch place/cancel endpoints (one symbol per batch)
+    BATCH_ORDER_LIMIT = 50
+    
+    def __init__(self, candle_store=None, scheduler=None, candle_cache=None, metadata_cache=None,
+                 request_policy=None):
         """
         Initialize the Bitget client with API credentials from environment variables.
+        
+        No connection is made until the first request; call connect() to check
+        the connection up front.
+        
+        Args:
+            candle_store (CandleStore, optional): Local candle store that fetch_ohlcv
+                syncs incrementally instead of re-downloading every window
+            scheduler (RequestScheduler, optional): Rate limiter for exchange requests;
+                defaults to the process-wide scheduler shared by all clients
+            candle_cache (CandleCache, optional): In-memory ring buffers fetched
+                candles are kept in; defaults to one of 500 candles per market
+            metadata_cache (MetadataCache, optional): Disk cache for market metadata;
+                defaults to exchange_metadata.sqlite, opened on first use
+            request_policy (RequestPolicy, optional): Retry, hedging and circuit breaker
+                policy for exchange requests; defaults to the process-wide policy
         """
         self.api_key = os.getenv('BITGET_API_KEY', '')
         self.api_secret = os.getenv('BITGET_API_SECRET', '')
         self.api_password = os.getenv('BITGET_API_PASSWORD', '')
+        self.candle_store = candle_store
+        self.scheduler = scheduler if scheduler is not None else get_scheduler()
+        self.candle_cache = candle_cache if candle_cache is not None else CandleCache()
+        
+        self.metadata_cache = metadata_cache
+        self.request_policy = request_policy if request_policy is not None else get_request_policy()
         
-        # Initialize connection
-        self.exchange = None
-        self.connect()
+        # Live WebSocket feed, see start_stream()
+        self.stream = None
+        
+        # Created on first use, see the exchange property and load_markets()
+        self._exchange = None
+        self._markets_fetched_at = None
+        self._lock = threading.RLock()
+    
+    @property
+    def exchange(self):
+        """
+        The ccxt exchange instance, created on first access.
+        """
+        if self._exchange is None:
+            with self._lock:
+                if self._exchange is None:
+                    self._exchange = self._create_exchange()
+        return self._exchange
+    
+    @exchange.setter
+    def exchange(self, exchange):
+        self._exchange = exchange
+        self._markets_fetched_at = None
+    
+    def _create_exchange(self):
+        return ccxt.bitget({
+            'apiKey': self.api_key,
+            'secret': self.api_secret,
+            'password': self.api_password,
+            # Requests are paced by the shared scheduler instead of ccxt's per-instance delay
+            'enableRateLimit': False
+        })
         
     def connect(self):
         """
-        Establish connection with Bitget API.
+        Establish connection with Bitget API and check that it works.
+        
+        Requests connect lazily, so this is only needed to fail fast.
         """
         try:
-            self.exchange = ccxt.bitget({
-                'apiKey': self.api_key,
-                'secret': self.api_secret,
-                'password': self.api_password,
-                'enableRateLimit': True
-            })
-            self.check_connection()
-            return True
+            self.exchange = self._create_exchange()
+            return self.check_connection()
         except Exception as e:
             print(f"Error connecting to Bitget: {str(e)}")
             return False
@@ -43,12 +110,67 @@ class BitgetClient:
         Check if the connection to the exchange is working.
         """
         try:
-            self.exchange.fetch_time()
+            self._request('fetch_time')
             return True
         except Exception as e:
             print(f"Connection check failed: {str(e)}")
             return False
     
+    def _request(self, endpoint, *args, **kwargs):
+        """
+        Call an exchange method once the scheduler admits it.
+        
+        Transient failures are retried (and slow market data reads hedged) by
+        the request policy; errors still raised after that reach the caller.
+        
+        Args:
+            endpoint (str): ccxt method name, e.g. 'fetch_ohlcv'
+            
+        Returns:
+            The exchange method's result
+        """
+        # ccxt loads markets itself before most calls; serve them from the cache instead
+        if endpoint not in ('fetch_time', 'load_markets'):
+            self.load_markets()
+        return self.request_policy.call(endpoint, getattr(self.exchange, endpoint), args, kwargs, self.scheduler)
+    
+    def load_markets(self, reload=False):
+        """
+        Load market metadata (symbols, precision, limits) into the exchange.
+        
+        Markets come from the metadata cache and are fetched from the exchange
+        only when the cached copy is older than MARKETS_TTL (or ``reload`` is set).
+        
+        Args:
+            reload (bool): Refetch from the exchange even if the cache is fresh
+            
+        Returns:
+            dict: Market metadata keyed by symbol
+        """
+        exchange = self.exchange
+        fetched_at = self._markets_fetched_at
+        if not reload and fetched_at is not None and time.time() - fetched_at < self.MARKETS_TTL:
+            return exchange.markets
+            
+        with self._lock:
+            if not reload and self._markets_fetched_at != fetched_at:
+                # Loaded by another thread meanwhile
+                return exchange.markets
+            if self.metadata_cache is None:
+                self.metadata_cache = MetadataCache()
+            metadata, self._markets_fetched_at = self.metadata_cache.get(
+                'bitget:markets', self._fetch_markets, self.MARKETS_TTL, refresh=reload
+            )
+            exchange.set_markets(metadata['markets'], metadata['currencies'])
+            return exchange.markets
+    
+    def _fetch_markets(self):
+        """
+        Fetch market and currency metadata from the exchange.
+        """
+        self._request('load_markets', True)
+        return {'markets': self.exchange.markets, 'currencies': self.exchange.currencies}
+    
     def get_markets(self):
         """
         Get available trading markets/pairs.
@@ -57,16 +179,40 @@ class BitgetClient:
             list: List of available trading pairs
         """
         try:
-            self.exchange.load_markets()
-            return list(self.exchange.markets.keys())
+            return list(self.load_markets().keys())
         except Exception as e:
             print(f"Error fetching markets: {str(e)}")
             return []
     
+    def get_market(self, symbol):
+        """
+        Get metadata for one market.
+        
+        Args:
+            symbol (str): Trading pair symbol
+            
+        Returns:
+            dict: Market information, including 'precision' and 'limits'
+        """
+        try:
+            return self.load_markets()[symbol]
+        except Exception as e:
+            print(f"Error fetching market {symbol}: {str(e)}")
+            return {}
+    
     def fetch_ohlcv(self, symbol, timeframe='1h', limit=500):
         """
         Fetch candlestick data for a specific trading pair.
         
+        Fetched candles are merged into the client's candle cache and the
+        window is built from it, so re-fetching an unchanged window returns the
+        same DataFrame without rebuilding it (copy it before modifying it). While a
+        live stream covers the symbol and timeframe, the window is served from the
+        cache without a request once it holds ``limit`` candles. With a candle store
+        configured, only candles missing from the store (and the newest stored
+        one, which may still be forming) are requested from the exchange and the
+        window is read back from disk.
+        
         Args:
             symbol (str): Trading pair symbol
             timeframe (str): Timeframe for candlesticks (e.g., '1m', '5m', '1h', '1d')
@@ -76,14 +222,197 @@ class BitgetClient:
             pandas.DataFrame: DataFrame containing OHLCV data
         """
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            return df
+            return self._candles(symbol, timeframe, limit).to_frame(limit)
         except Exception as e:
             print(f"Error fetching OHLCV data for {symbol}: {str(e)}")
             return pd.DataFrame()
     
+    def fetch_ohlcv_arrays(self, symbol, timeframe='1h', limit=500):
+        """
+        Fetch candlestick data as zero-copy NumPy views instead of a DataFrame.
+        
+        Refreshes the window like fetch_ohlcv, then hands out read-only views of
+        the candle cache's columns. The views follow later updates to the cache;
+        copy them to keep a snapshot.
+        
+        Args:
+            symbol (str): Trading pair symbol
+            timeframe (str): Timeframe for candlesticks (e.g., '1m', '5m', '1h', '1d')
+            limit (int): Number of candles to fetch
+            
+        Returns:
+            dict: 'timestamp' (int64 ms), 'open', 'high', 'low', 'close' and 'volume' arrays
+        """
+        try:
+            return self._candles(symbol, timeframe, limit).arrays(limit)
+        except Exception as e:
+            print(f"Error fetching OHLCV data for {symbol}: {str(e)}")
+            return {}
+    
+    def _candles(self, symbol, timeframe, limit):
+        """
+        Bring the cached candles for a market up to date and return their buffer.
+        """
+        if limit > self.candle_cache.capacity:
+            # Longer than the cache keeps: use a one-off buffer
+            buffer = CandleBuffer(limit)
+        else:
+            buffer = self.candle_cache.buffer(symbol, timeframe)
+            streaming = (self.stream is not None and self.stream.live
+                         and self.stream.buffer(symbol, timeframe) is not None)
+            if streaming and len(buffer) >= limit:
+                return buffer
+                
+        if self.candle_store is not None:
+            ohlcv = self._sync_ohlcv(symbol, timeframe, limit)
+        else:
+            ohlcv = self._request('fetch_ohlcv', symbol, timeframe, limit=limit)
+        buffer.merge(ohlcv)
+        return buffer
+    
+    def _sync_ohlcv(self, symbol, timeframe, limit):
+        """
+        Bring the candle store up to date for the last ``limit`` candles and read them back.
+        
+        Stored candles are checked against the full window, so gaps (e.g. from
+        downtime, or an older range fetched earlier) are backfilled from the
+        first missing candle, and the window is read back by time.
+        
+        Args:
+            symbol (str): Trading pair symbol
+            timeframe (str): Timeframe for candlesticks
+            limit (int): Number of candles needed
+            
+        Returns:
+            list: Rows of [timestamp_ms, open, high, low, close, volume]
+        """
+        duration = self.exchange.parse_timeframe(timeframe) * 1000
+        now = self.exchange.milliseconds()
+        window_start = (now // duration - limit + 1) * duration
+        
+        stored = [row[0] for row in self.candle_store.read(symbol, timeframe, since=window_start)]
+        missing = next((window_start + i * duration for i, timestamp in enumerate(stored)
+                        if timestamp != window_start + i * duration), window_start + len(stored) * duration)
+        # Backfill from the first missing candle; re-fetch the newest stored one too,
+        # it may have still been forming
+        since = min(missing, stored[-1]) if stored else window_start
+            
+        for page in self._fetch_ohlcv_pages(symbol, timeframe, since, now):
+            self.candle_store.write(symbol, timeframe, page)
+            
+        return self.candle_store.read(symbol, timeframe, since=window_start, limit=limit)
+    
+    def _fetch_ohlcv_pages(self, symbol, timeframe, since, until):
+        """
+        Page through exchange candles from ``since`` to ``until``, one request per page.
+        
+        Args:
+            symbol (str): Trading pair symbol
+            timeframe (str): Timeframe for candlesticks
+            since (int): Timestamp in ms of the first candle
+            until (int): Timestamp in ms of the last candle
+            
+        Yields:
+            list: Pages of [timestamp_ms, open, high, low, close, volume] rows
+        """
+        duration = self.exchange.parse_timeframe(timeframe) * 1000
+        cursor = since
+        while cursor <= until:
+            page = self._request('fetch_ohlcv', symbol, timeframe, since=cursor, limit=self.OHLCV_PAGE_LIMIT)
+            page = [candle for candle in page if cursor <= candle[0] <= until]
+            if not page:
+                break
+            yield page
+            cursor = page[-1][0] + duration
+    
+    def fetch_ohlcv_range(self, symbol, timeframe, since, until=None, max_workers=4):
+        """
+        Fetch candlestick data for an arbitrary date range, streamed in chunks.
+        
+        The range is split into page-sized windows that are requested concurrently
+        (the shared request scheduler paces them) and yielded in time order with
+        overlapping candles removed. With a candle store configured, closed windows
+        already on disk are read locally and fetched windows are saved. Use
+        ``pd.concat(client.fetch_ohlcv_range(...))`` to get a single DataFrame.
+        
+        Args:
+            symbol (str): Trading pair symbol
+            timeframe (str): Timeframe for candlesticks (e.g., '1m', '5m', '1h', '1d')
+            since (datetime, str or int): Start of the range (datetime or ms timestamp, UTC)
+            until (datetime, str or int, optional): End of the range, defaults to now
+            max_workers (int): Maximum number of requests in flight
+            
+        Yields:
+            pandas.DataFrame: Consecutive chunks of OHLCV data
+            
+        Raises:
+            Exception: The error of the first window that could not be fetched; the
+                chunks before it have already been yielded, so the range is never
+                silently truncated
+        """
+        duration = self.exchange.parse_timeframe(timeframe) * 1000
+        now = self.exchange.milliseconds()
+        start = -(-_to_milliseconds(since) // duration) * duration
+        end = min(_to_milliseconds(until) if until is not None else now, now)
+        page_span = self.OHLCV_PAGE_LIMIT * duration
+        windows = ((w, min(w + page_span - duration, end)) for w in range(start, end + 1, page_span))
+        
+        last_timestamp = None
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            try:
+                for window in windows:
+                    pending.append(executor.submit(self._fetch_ohlcv_window, symbol, timeframe, *window, now))
+                    # Keep a bounded number of windows ahead of the one being yielded
+                    if len(pending) < 2 * max_workers:
+                        continue
+                    chunk, last_timestamp = _dedupe(pending.popleft().result(), last_timestamp)
+                    if chunk:
+                        yield self._ohlcv_to_frame(chunk)
+                while pending:
+                    chunk, last_timestamp = _dedupe(pending.popleft().result(), last_timestamp)
+                    if chunk:
+                        yield self._ohlcv_to_frame(chunk)
+            finally:
+                # Don't fetch windows nobody will read after an error or an early stop
+                for future in pending:
+                    future.cancel()
+    
+    def _fetch_ohlcv_window(self, symbol, timeframe, window_start, window_end, now):
+        """
+        Fetch one page-sized window of candles, preferring the candle store.
+        
+        Args:
+            symbol (str): Trading pair symbol
+            timeframe (str): Timeframe for candlesticks
+            window_start (int): Timestamp in ms of the first candle
+            window_end (int): Timestamp in ms of the last candle
+            now (int): Current exchange time in ms
+            
+        Returns:
+            list: Rows of [timestamp_ms, open, high, low, close, volume]
+        """
+        duration = self.exchange.parse_timeframe(timeframe) * 1000
+        if self.candle_store is not None and window_end + duration <= now:
+            stored = self.candle_store.read(symbol, timeframe, since=window_start, until=window_end)
+            if len(stored) == (window_end - window_start) // duration + 1:
+                return stored
+                
+        page = self._request('fetch_ohlcv', symbol, timeframe, since=window_start, limit=self.OHLCV_PAGE_LIMIT)
+        page = [candle for candle in page if window_start <= candle[0] <= window_end]
+        if self.candle_store is not None:
+            self.candle_store.write(symbol, timeframe, page)
+        return page
+    
+    @staticmethod
+    def _ohlcv_to_frame(ohlcv):
+        """
+        Convert ccxt OHLCV rows to a DataFrame with datetime timestamps.
+        """
+        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+    
     def get_balance(self):
         """
         Get account balance.
@@ -92,7 +421,7 @@ class BitgetClient:
             dict: Account balance information
         """
         try:
-            return self.exchange.fetch_balance()
+            return self._request('fetch_balance')
         except Exception as e:
             print(f"Error fetching balance: {str(e)}")
             return {}
@@ -101,6 +430,9 @@ class BitgetClient:
         """
         Get current ticker information for a symbol.
         
+        While streaming the symbol's ticker, the latest pushed ticker is returned
+        without a request; when the stream is down, the ticker is fetched instead.
+        
         Args:
             symbol (str): Trading pair symbol
             
@@ -108,11 +440,52 @@ class BitgetClient:
             dict: Ticker information
         """
         try:
-            return self.exchange.fetch_ticker(symbol)
+            ticker = self.stream.ticker(symbol) if self.stream is not None and self.stream.live else None
+            if ticker is not None:
+                return ticker
+            return self._request('fetch_ticker', symbol)
         except Exception as e:
             print(f"Error fetching ticker for {symbol}: {str(e)}")
             return {}
     
+    def start_stream(self, symbols, timeframes=('1h',), tickers=True, url=None, inst_type='SPOT'):
+        """
+        Stream candles (and tickers) over WebSocket instead of polling REST.
+        
+        Streamed candles update the client's candle cache in place, and
+        fetch_ohlcv and get_ticker serve streamed data for the subscribed symbols
+        from then on. Subscribe to further channels, or register callbacks for
+        every update, through ``client.stream``.
+        
+        Args:
+            symbols (list): Trading pair symbols
+            timeframes (tuple): Candle timeframes to stream for each symbol
+            tickers (bool): Whether to stream tickers as well
+            url (str, optional): WebSocket endpoint, e.g. a ReplayServer's url;
+                defaults to Bitget's public endpoint
+            inst_type (str): Bitget instrument type ('SPOT', 'USDT-FUTURES', ...)
+            
+        Returns:
+            MarketStream: The running stream
+        """
+        if self.stream is None:
+            kwargs = {'url': url} if url is not None else {}
+            self.stream = MarketStream(inst_type=inst_type, cache=self.candle_cache, **kwargs)
+        for symbol in symbols:
+            for timeframe in timeframes:
+                self.stream.subscribe_candles(symbol, timeframe)
+            if tickers:
+                self.stream.subscribe_ticker(symbol)
+        return self.stream.start()
+    
+    def stop_stream(self):
+        """
+        Close the WebSocket stream; fetch_ohlcv and get_ticker go back to REST.
+        """
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+    
     def create_order(self, symbol, order_type, side, amount, price=None, params={}):
         """
         Create a trading order.
@@ -129,7 +502,7 @@ class BitgetClient:
             dict: Order information
         """
         try:
-            return self.exchange.create_order(symbol, order_type, side, amount, price, params)
+            return self._request('create_order', symbol, order_type, side, amount, price, params)
         except Exception as e:
             print(f"Error creating order: {str(e)}")
             return {}
@@ -146,11 +519,150 @@ class BitgetClient:
             dict: Cancellation result
         """
         try:
-            return self.exchange.cancel_order(order_id, symbol)
+            return self._request('cancel_order', order_id, symbol)
         except Exception as e:
             print(f"Error cancelling order: {str(e)}")
             return {}
     
+    def create_orders(self, orders, max_workers=8):
+        """
+        Place several orders at once.
+        
+        Orders are grouped by symbol and sent through the exchange's batch
+        endpoint, up to BATCH_ORDER_LIMIT per request; where batching is not
+        available (or a symbol has a single order) they are sent one by one.
+        Either way the requests go out concurrently, paced by the request
+        scheduler, so e.g. entry, stop loss and take profit for several symbols
+        take about one round-trip instead of one per order.
+        
+        Args:
+            orders (list): Order dicts with 'symbol', 'type', 'side', 'amount' and
+                optionally 'price' and 'params' (the create_order arguments)
+            max_workers (int): Maximum number of requests in flight
+            
+        Returns:
+            list: One result per order, in the order given: the order information,
+                or a dict with an 'error' message if that order failed
+        """
+        orders = [dict(order, params=dict(order.get('params') or {})) for order in orders]
+        for order in orders:
+            # Batch responses are matched back to their orders by client order id
+            if 'clientOrderId' not in order['params'] and 'clientOid' not in order['params']:
+                order['params']['clientOrderId'] = uuid.uuid4().hex
+                
+        batched = self.exchange.has.get('createOrders') is True
+        requests = []
+        for indices in _group_by_symbol(orders, self.BATCH_ORDER_LIMIT if batched else 1):
+            if len(indices) > 1:
+                requests.append((indices, self._create_order_batch, [orders[i] for i in indices]))
+            else:
+                requests.append((indices, self._create_single_order, orders[indices[0]]))
+        return self._run_order_requests(requests, len(orders), max_workers)
+    
+    def _create_order_batch(self, orders):
+        """
+        Place orders for one symbol in a single batch request, matched back by client order id.
+        
+        If the batch is refused as a whole (e.g. one order fails ccxt's own
+        validation, so nothing was placed), the orders are placed one by one.
+        """
+        try:
+            results = self._request('create_orders', [
+                {key: order.get(key) for key in ('symbol', 'type', 'side', 'amount', 'price', 'params')}
+                for order in orders
+            ])
+        except (ccxt.InvalidOrder, ccxt.BadRequest):
+            placed = []
+            for order in orders:
+                try:
+                    placed.extend(self._create_single_order(order))
+                except Exception as e:
+                    placed.append({'error': str(e)})
+            return placed
+            
+        by_client_id = {result.get('clientOrderId'): result for result in results}
+        placed = []
+        for order in orders:
+            client_id = order['params'].get('clientOrderId', order['params'].get('clientOid'))
+            result = by_client_id.get(client_id)
+            if result is None:
+                placed.append({'error': 'Order was not placed'})
+            elif (result.get('info') or {}).get('errorMsg'):
+                placed.append({'error': result['info']['errorMsg'], 'code': result['info'].get('errorCode')})
+            else:
+                placed.append(result)
+        return placed
+    
+    def _create_single_order(self, order):
+        return [self._request('create_order', order['symbol'], order['type'], order['side'], order['amount'],
+                              order.get('price'), order['params'])]
+    
+    def cancel_orders(self, orders, max_workers=8):
+        """
+        Cancel several orders at once.
+        
+        Works like create_orders: one batch request per symbol where the
+        exchange supports it, otherwise one request per order, all in flight
+        concurrently under the request scheduler.
+        
+        Args:
+            orders (list): (order_id, symbol) pairs, or order dicts with 'id' and
+                'symbol' (e.g. from get_open_orders)
+            max_workers (int): Maximum number of requests in flight
+            
+        Returns:
+            list: One result per order, in the order given: the cancellation result,
+                or a dict with an 'error' message if that order was not cancelled
+        """
+        orders = [{'id': order['id'], 'symbol': order['symbol']} if isinstance(order, dict)
+                  else {'id': order[0], 'symbol': order[1]} for order in orders]
+        batched = self.exchange.has.get('cancelOrders') is True
+        requests = []
+        for indices in _group_by_symbol(orders, self.BATCH_ORDER_LIMIT if batched else 1):
+            if len(indices) > 1:
+                requests.append((indices, self._cancel_order_batch, [orders[i] for i in indices]))
+            else:
+                requests.append((indices, self._cancel_single_order, orders[indices[0]]))
+        return self._run_order_requests(requests, len(orders), max_workers)
+    
+    def _cancel_order_batch(self, orders):
+        """
+        Cancel orders for one symbol in a single batch request, matched back by order id.
+        """
+        results = self._request('cancel_orders', [order['id'] for order in orders], orders[0]['symbol'])
+        # Only successful cancellations are returned
+        by_id = {str(result.get('id')): result for result in results}
+        return [by_id.get(str(order['id']), {'error': 'Order was not cancelled'}) for order in orders]
+    
+    def _cancel_single_order(self, order):
+        return [self._request('cancel_order', order['id'], order['symbol'])]
+    
+    def _run_order_requests(self, requests, count, max_workers):
+        """
+        Run order requests concurrently and collect their results by order position.
+        
+        Args:
+            requests (list): (order indices, function, argument) tuples; each function
+                returns one result per index
+            count (int): Total number of orders
+            max_workers (int): Maximum number of requests in flight
+            
+        Returns:
+            list: Results in order position
+        """
+        results = [None] * count
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(func, argument): indices for indices, func, argument in requests}
+            for future, indices in futures.items():
+                try:
+                    outcomes = future.result()
+                except Exception as e:
+                    print(f"Error in order request: {str(e)}")
+                    outcomes = [{'error': str(e)} for _ in indices]
+                for index, outcome in zip(indices, outcomes):
+                    results[index] = outcome
+        return results
+    
     def get_open_orders(self, symbol=None):
         """
         Get open orders.
@@ -162,7 +674,7 @@ class BitgetClient:
             list: List of open orders
         """
         try:
-            return self.exchange.fetch_open_orders(symbol)
+            return self._request('fetch_open_orders', symbol)
         except Exception as e:
             print(f"Error fetching open orders: {str(e)}")
             return []
@@ -181,8 +693,28 @@ class BitgetClient:
         """
         try:
             df = self.fetch_ohlcv(symbol, timeframe, limit=look_back)
+            return self.find_liquidity_levels(df)
+        except Exception as e:
+            print(f"Error calculating liquidity levels: {str(e)}")
+            return []
+    
+    @staticmethod
+    def find_liquidity_levels(df, top=10):
+        """
+        Identify high liquidity levels in already-fetched OHLCV data.
+        
+        Args:
+            df (pandas.DataFrame): DataFrame with OHLCV data
+            top (int): Number of strongest levels to return
+            
+        Returns:
+            list: List of identified liquidity levels
+        """
+        try:
             if df.empty:
                 return []
+                
+            df = df.copy()
             
             # Identify areas with high volume
             df['volume_sma'] = df['volume'].rolling(window=10).mean()
@@ -202,7 +734,44 @@ class BitgetClient:
             # Sort by strength
             liquidity_levels = sorted(liquidity_levels, key=lambda x: x['strength'], reverse=True)
             
-            return liquidity_levels[:10]  # Return top 10 levels
+            return liquidity_levels[:top]  # Return the strongest levels
         except Exception as e:
             print(f"Error calculating liquidity levels: {str(e)}")
             return []
+
+
+def _to_milliseconds(value):
+    """
+    Convert a datetime, date string or millisecond timestamp to epoch milliseconds (UTC).
+    """
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    return timestamp.value // 10**6
+
+
+def _group_by_symbol(orders, size):
+    """
+    Split order positions into groups of at most ``size`` that share a symbol.
+    """
+    groups = {}
+    for index, order in enumerate(orders):
+        groups.setdefault(order['symbol'], []).append(index)
+    return [indices[i:i + size] for indices in groups.values() for i in range(0, len(indices), size)]
+
+
+def _dedupe(candles, last_timestamp):
+    """
+    Sort candles and drop any at or before the last timestamp already yielded.
+    
+    Returns:
+        tuple: (unique candles, new last timestamp)
+    """
+    unique = []
+    for candle in sorted(candles, key=lambda c: c[0]):
+        if last_timestamp is None or candle[0] > last_timestamp:
+            unique.append(candle)
+            last_timestamp = candle[0]
+    return unique, last_timestamp
@@ -2,32 +2,58 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import matplotlib.pyplot as plt
+from utils.metrics import performance_metrics
+from utils.records import EquityCurve, TradeLog
 from utils.strategy import TradingStrategy
 import joblib
+import os
 
 class Backtester:
     """
     Backtester for evaluating trading strategies on historical data.
     """
-    def __init__(self, starting_balance=10000, commission_rate=0.001):
+    def __init__(self, starting_balance=10000, commission_rate=0.001, strategy=None):
         """
         Initialize backtester with account parameters.
         
         Args:
             starting_balance (float): Initial account balance
             commission_rate (float): Trading commission rate
+            strategy (TradingStrategy, optional): Strategy to test; its risk_percentage
+                sizes every trade (default: 2% of the balance)
         """
         self.starting_balance = starting_balance
         self.commission_rate = commission_rate
-        self.strategy = TradingStrategy()
+        self.strategy = strategy if strategy is not None else TradingStrategy(risk_percentage=2.0)
         
-    def run_backtest(self, df, liquidity_levels=None):
+    def run_backtest(self, df, liquidity_levels=None, engine='event', analysis_df=None, warmup=50,
+                     fills='close', lower_df=None, checkpoint_file=None, checkpoint_every=50000,
+                     on_checkpoint=None):
         """
         Run a backtest on the provided historical data.
         
         Args:
             df (pandas.DataFrame): DataFrame with OHLCV data
             liquidity_levels (list, optional): List of liquidity levels
+            engine (str): 'event' computes indicators and signals once and walks
+                precomputed arrays; 'legacy' re-runs the strategy on a 30-candle
+                slice at every bar
+            analysis_df (pandas.DataFrame, optional): Output of calculate_indicators for
+                df, reused by the event engine when backtesting many parameter sets
+            warmup (int): Leading bars that only feed the indicators; trading and the
+                equity curve start after them
+            fills (str): Event engine exit fills: 'close' checks stops and targets
+                against the close; 'intrabar' fills them when the bar's high/low
+                touches them (at the open on a gap)
+            lower_df (pandas.DataFrame, optional): Lower-timeframe OHLCV data covering df,
+                used in 'intrabar' mode to tell which level a bar touched first
+            checkpoint_file (str, optional): Event engine only: file the engine state is
+                written to every ``checkpoint_every`` bars, so resume_backtest can pick
+                the run up after an interruption; removed once the run completes
+            checkpoint_every (int): Bars between checkpoints
+            on_checkpoint (callable, optional): Event engine only: called at every
+                checkpoint with the partial results ('bar', 'date', 'balance',
+                'trades' and 'equity_curve' so far)
             
         Returns:
             dict: Backtest results and performance metrics
@@ -39,6 +65,12 @@ class Backtester:
         if liquidity_levels is None:
             liquidity_levels = []
         
+        if engine == 'event':
+            return self._run_event_backtest(df, liquidity_levels, analysis_df, warmup, fills, lower_df,
+                                            checkpoint_file, checkpoint_every, on_checkpoint)
+        if checkpoint_file is not None or on_checkpoint is not None:
+            raise ValueError("Checkpoints are only supported by the 'event' engine")
+        
         # Make a copy of the data to avoid modifying the original
         backtest_df = df.copy()
         
@@ -54,7 +86,7 @@ class Backtester:
         equity_curve = []
         
         # Run through the historical data
-        for i in range(50, len(analysis_df)):  # Start after indicators have enough data
+        for i in range(warmup, len(analysis_df)):  # Start after indicators have enough data
             # Current data point
             current_data = analysis_df.iloc[:i+1]
             current_price = current_data['close'].iloc[-1]
@@ -172,7 +204,7 @@ class Backtester:
                 
                 if signal:
                     # Calculate position size (risk management)
-                    position_size = balance * 0.02 / abs(current_price - signal['stop_loss'])
+                    position_size = balance * (self.strategy.risk_percentage / 100) / abs(current_price - signal['stop_loss'])
                     
                     # Check if we have enough balance
                     if position_size * current_price * (1 + self.commission_rate) <= balance:
@@ -249,89 +281,238 @@ class Backtester:
             'equity_curve': equity_curve
         }
     
-    def calculate_performance_metrics(self, trades, initial_balance, final_balance, equity_curve):
+    def resume_backtest(self, df, checkpoint_file, liquidity_levels=None, analysis_df=None, warmup=50,
+                        fills='close', lower_df=None, checkpoint_every=50000, on_checkpoint=None):
         """
-        Calculate performance metrics from backtest results.
+        Continue an event-engine backtest from its last checkpoint.
+        
+        Indicators and signals are recomputed (they are deterministic), then the
+        bar loop restarts at the checkpoint's cursor with its balance, open
+        position, trades and equity. Without a checkpoint file this starts a
+        fresh checkpointed run, so restart scripts can always call it.
         
         Args:
-            trades (list): List of trade records
-            initial_balance (float): Initial account balance
-            final_balance (float): Final account balance
-            equity_curve (list): List of equity values over time
+            df (pandas.DataFrame): The same OHLCV data the checkpointed run used
+            checkpoint_file (str): Checkpoint written by run_backtest
+            liquidity_levels (list, optional): The same liquidity levels
+            analysis_df, warmup, fills, lower_df: As for run_backtest; warmup and
+                fills must match the checkpointed run
+            checkpoint_every (int): Bars between further checkpoints
+            on_checkpoint (callable, optional): As for run_backtest
             
         Returns:
-            dict: Performance metrics
+            dict: Backtest results and performance metrics
+            
+        Raises:
+            ValueError: If the checkpoint was written for different data or settings
         """
-        if not trades:
-            return {
-                'total_trades': 0,
-                'win_rate': 0,
-                'profit_factor': 0,
-                'average_profit': 0,
-                'average_loss': 0,
-                'max_drawdown': 0,
-                'sharpe_ratio': 0
-            }
-        
-        # Calculate basic metrics
-        total_trades = len(trades)
-        winning_trades = [t for t in trades if t['profit'] > 0]
-        losing_trades = [t for t in trades if t['profit'] <= 0]
-        
-        win_count = len(winning_trades)
-        loss_count = len(losing_trades)
-        
-        win_rate = win_count / total_trades if total_trades > 0 else 0
-        
-        # Calculate profit metrics
-        total_profit = sum(t['profit'] for t in winning_trades) if winning_trades else 0
-        total_loss = sum(t['profit'] for t in losing_trades) if losing_trades else 0
-        
-        profit_factor = abs(total_profit / total_loss) if total_loss != 0 else float('inf')
-        
-        average_profit = total_profit / win_count if win_count > 0 else 0
-        average_loss = total_loss / loss_count if loss_count > 0 else 0
-        
-        # Calculate drawdown
-        if equity_curve:
-            equity_values = [e['equity'] for e in equity_curve]
-            peak = equity_values[0]
-            max_drawdown = 0
+        if df.empty:
+            return {'error': 'No data provided for backtesting'}
             
-            for equity in equity_values:
-                if equity > peak:
-                    peak = equity
-                drawdown = (peak - equity) / peak
-                max_drawdown = max(max_drawdown, drawdown)
-        else:
-            max_drawdown = 0
-        
-        # Calculate Sharpe ratio (assuming risk-free rate = 0)
-        if len(equity_curve) > 1:
-            # Convert equity curve to returns
-            equity_values = [e['equity'] for e in equity_curve]
-            returns = [(equity_values[i] - equity_values[i-1]) / equity_values[i-1] for i in range(1, len(equity_values))]
+        state = joblib.load(checkpoint_file) if os.path.exists(checkpoint_file) else None
+        return self._run_event_backtest(df, liquidity_levels or [], analysis_df, warmup, fills, lower_df,
+                                        checkpoint_file, checkpoint_every, on_checkpoint, state)
+    
+    def _run_event_backtest(self, df, liquidity_levels, analysis_df=None, warmup=50, fills='close', lower_df=None,
+                            checkpoint_file=None, checkpoint_every=50000, on_checkpoint=None, state=None):
+        """
+        Event-driven backtest: one indicator pass, one signal pass, one walk over the bars.
+        
+        Position handling is identical to the legacy loop (exits checked on close,
+        risk_percentage balance sizing, re-entry allowed on the bar a position closes)
+        unless intrabar fills are requested.
+        
+        Args:
+            df (pandas.DataFrame): DataFrame with OHLCV data
+            liquidity_levels (list): List of liquidity levels
+            analysis_df (pandas.DataFrame, optional): Precomputed calculate_indicators output
+            warmup (int): Leading bars skipped before trading starts
+            fills (str): 'close' or 'intrabar' exit fills
+            lower_df (pandas.DataFrame, optional): Lower-timeframe OHLCV data for 'intrabar'
+            checkpoint_file (str, optional): File to checkpoint the engine state to
+            checkpoint_every (int): Bars between checkpoints
+            on_checkpoint (callable, optional): Receives partial results at each checkpoint
+            state (dict, optional): Checkpoint to continue from
             
-            mean_return = np.mean(returns)
-            std_return = np.std(returns)
+        Returns:
+            dict: Backtest results and performance metrics
+        """
+        # Indicators keep df's rows, so prices and dates can be read before computing them
+        frame = df if analysis_df is None else analysis_df
+        close = frame['close'].to_numpy(dtype=float)
+        dates = pd.DatetimeIndex(frame.index if isinstance(frame.index, pd.DatetimeIndex) else frame['timestamp'])
+        dates_ns = dates.asi8
+        
+        checkpointing = checkpoint_file is not None or on_checkpoint is not None
+        signals = None
+        if checkpointing or state is not None:
+            # Identifies the data and settings a checkpoint belongs to, including the
+            # lower-timeframe candles that decide intrabar fills
+            lower_data = None if lower_df is None else (
+                _frame_times(lower_df).asi8, lower_df['high'].to_numpy(dtype=float),
+                lower_df['low'].to_numpy(dtype=float))
+            config = joblib.hash((close, dates_ns, liquidity_levels, warmup, fills, lower_data,
+                                  self.starting_balance, self.commission_rate, vars(self.strategy)))
+            signals_file = f"{checkpoint_file}.signals" if checkpoint_file is not None else None
+            if state is not None and signals_file is not None and os.path.exists(signals_file):
+                saved = joblib.load(signals_file)
+                # A resumed run skips recomputing indicators and signals
+                signals = saved['signals'] if saved['config'] == config else None
+        if signals is None:
+            if analysis_df is None:
+                analysis_df = self.strategy.calculate_indicators(df.copy())
+            signals = self.strategy.precompute_signals(analysis_df, liquidity_levels)
+            if checkpoint_file is not None:
+                _write_checkpoint(signals_file, {'config': config, 'signals': signals})
+                
+        direction = signals['direction']
+        stop_loss = signals['stop_loss']
+        take_profit = signals['take_profit']
+        
+        if fills not in ('close', 'intrabar'):
+            raise ValueError(f"Unknown fill mode: {fills}")
+        intrabar = fills == 'intrabar'
+        if intrabar:
+            open_ = frame['open'].to_numpy(dtype=float)
+            high = frame['high'].to_numpy(dtype=float)
+            low = frame['low'].to_numpy(dtype=float)
+            lower = _lower_timeframe_map(dates, lower_df) if lower_df is not None else None
             
-            sharpe_ratio = (mean_return / std_return) * np.sqrt(252) if std_return > 0 else 0
-        else:
-            sharpe_ratio = 0
+        balance = self.starting_balance
+        initial_balance = balance
+        in_position = False
+        position = {}
+        trades = TradeLog(tz=dates.tz)
+        start = warmup  # Start after indicators have enough data
+        equity = np.empty(max(len(close) - start, 0))
+        cursor = start
         
+        if state is not None:
+            if state['config'] != config:
+                raise ValueError("Checkpoint does not match this backtest's data or settings")
+            cursor = state['cursor']
+            balance = state['balance']
+            in_position = state['in_position']
+            position = state['position']
+            trades = state['trades']
+            equity[:cursor - start] = state['equity']
+        
+        def checkpoint(bar):
+            if checkpoint_file is not None:
+                _write_checkpoint(checkpoint_file, {
+                    'config': config,
+                    'cursor': bar,
+                    'balance': balance,
+                    'in_position': in_position,
+                    'position': position,
+                    'trades': trades,
+                    'equity': equity[:bar - start]
+                })
+            if on_checkpoint is not None:
+                on_checkpoint({
+                    'bar': bar,
+                    'date': dates[bar],
+                    'balance': balance,
+                    'trades': TradeLog.concat([trades]),
+                    'equity_curve': EquityCurve(dates[start:bar], equity[:bar - start].copy())
+                })
+                
+        next_checkpoint = cursor + checkpoint_every if checkpointing else len(close)
+        for i in range(cursor, len(close)):
+            if i == next_checkpoint:
+                checkpoint(i)
+                next_checkpoint += checkpoint_every
+                
+            current_price = close[i]
+            
+            if in_position:
+                side = 1 if position['type'] == 'long' else -1
+                equity[i - start] = balance + side * position['size'] * (current_price - position['entry_price'])
+                
+                exit_price = None
+                if intrabar:
+                    exit_price, result = _intrabar_exit(side, position['stop_loss'], position['take_profit'],
+                                                        open_[i], high[i], low[i], lower, i)
+                elif side * (current_price - position['stop_loss']) <= 0:
+                    exit_price, result = position['stop_loss'], 'stop_loss'
+                elif side * (current_price - position['take_profit']) >= 0:
+                    exit_price, result = position['take_profit'], 'take_profit'
+                
+                if exit_price is not None:
+                    profit = side * position['size'] * (exit_price - position['entry_price'])
+                    commission = position['size'] * exit_price * self.commission_rate
+                    balance += profit - commission
+                    trades.append(position['entry_date'], dates_ns[i], position['entry_price'], exit_price,
+                                  side, position['size'], profit, commission, result)
+                    in_position = False
+            else:
+                equity[i - start] = balance
+            
+            # Look for new entry signals if not in a position
+            if not in_position and direction[i] != 0:
+                position_size = balance * (self.strategy.risk_percentage / 100) / abs(current_price - stop_loss[i])
+                
+                # Check if we have enough balance
+                if position_size * current_price * (1 + self.commission_rate) <= balance:
+                    cost = position_size * current_price
+                    commission = cost * self.commission_rate
+                    # Longs pay for the position, shorts only the commission
+                    balance -= cost + commission if direction[i] > 0 else commission
+                    position = {
+                        'type': 'long' if direction[i] > 0 else 'short',
+                        'entry_price': current_price,
+                        'stop_loss': stop_loss[i],
+                        'take_profit': take_profit[i],
+                        'size': position_size,
+                        'entry_date': dates_ns[i]
+                    }
+                    in_position = True
+        
+        # Close any open position at the end
+        if in_position:
+            final_price = close[-1]
+            side = 1 if position['type'] == 'long' else -1
+            profit = side * position['size'] * (final_price - position['entry_price'])
+            commission = position['size'] * final_price * self.commission_rate
+            balance += profit - commission
+            
+            trades.append(position['entry_date'], dates_ns[-1], position['entry_price'], final_price,
+                          side, position['size'], profit, commission, 'end_of_period')
+                          
+        equity_curve = EquityCurve(dates[start:], equity)
+        metrics = self.calculate_performance_metrics(trades, initial_balance, balance, equity_curve)
+        if checkpoint_file is not None:
+            for path in (checkpoint_file, signals_file):
+                if os.path.exists(path):
+                    os.remove(path)
+                    
         return {
-            'total_trades': total_trades,
-            'winning_trades': win_count,
-            'losing_trades': loss_count,
-            'win_rate': win_rate,
-            'profit_factor': profit_factor,
-            'average_profit': average_profit,
-            'average_loss': average_loss,
-            'max_drawdown': max_drawdown,
-            'sharpe_ratio': sharpe_ratio,
-            'return_percentage': ((final_balance - initial_balance) / initial_balance) * 100
+            'initial_balance': initial_balance,
+            'final_balance': balance,
+            'profit_loss': balance - initial_balance,
+            'profit_loss_percent': ((balance - initial_balance) / initial_balance) * 100,
+            'trades': trades,
+            'metrics': metrics,
+            'equity_curve': equity_curve
         }
     
+    def calculate_performance_metrics(self, trades, initial_balance, final_balance, equity_curve, timeframe=None):
+        """
+        Calculate performance metrics from backtest results.
+        
+        Args:
+            trades (TradeLog or list): Trade records
+            initial_balance (float): Initial account balance
+            final_balance (float): Final account balance
+            equity_curve (EquityCurve or list): Equity values over time
+            timeframe (str, optional): Candle timeframe used to annualize ratios;
+                inferred from the equity curve dates if omitted
+            
+        Returns:
+            dict: Performance metrics
+        """
+        return performance_metrics(trades, initial_balance, final_balance, equity_curve, timeframe)
+    
     def save_backtest_results(self, results, filename):
         """
         Save backtest results to a file.
@@ -365,3 +546,235 @@ class Backtester:
         except Exception as e:
             print(f"Error loading backtest results: {str(e)}")
             return None
+
+
+def _write_checkpoint(path, state):
+    """
+    Write a checkpoint atomically, so an interruption mid-write keeps the previous one.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.tmp"
+    joblib.dump(state, temporary)
+    os.replace(temporary, path)
+
+
+def _frame_times(frame):
+    """
+    Get an OHLCV frame's candle times from its DatetimeIndex or 'timestamp' column.
+    """
+    return pd.DatetimeIndex(frame.index if isinstance(frame.index, pd.DatetimeIndex) else frame['timestamp'])
+
+
+def _lower_timeframe_map(bar_times, lower_df):
+    """
+    Map every bar to the slice of lower-timeframe candles that fall inside it.
+    
+    Args:
+        bar_times (pandas.DatetimeIndex): Open time of each bar
+        lower_df (pandas.DataFrame): Lower-timeframe OHLCV data
+        
+    Returns:
+        dict: 'start' and 'end' index arrays into the lower candles, plus their
+            'high' and 'low' arrays
+    """
+    lower_times = _frame_times(lower_df).asi8
+    bar_start = bar_times.asi8
+    # A bar ends where the next one opens; the last one is assumed to last as long as a typical bar
+    bar_length = np.median(np.diff(bar_start)) if len(bar_start) > 1 else 0
+    bar_end = np.append(bar_start[1:], bar_start[-1] + bar_length)
+    return {
+        'start': np.searchsorted(lower_times, bar_start, side='left'),
+        'end': np.searchsorted(lower_times, bar_end, side='left'),
+        'high': lower_df['high'].to_numpy(dtype=float),
+        'low': lower_df['low'].to_numpy(dtype=float)
+    }
+
+
+def _intrabar_exit(side, stop, target, bar_open, bar_high, bar_low, lower=None, bar=None):
+    """
+    Resolve a stop/target exit inside one bar from its open, high and low.
+    
+    Args:
+        side (int): 1 for long, -1 for short
+        stop (float): Stop loss price
+        target (float): Take profit price
+        bar_open (float): Bar open
+        bar_high (float): Bar high
+        bar_low (float): Bar low
+        lower (dict, optional): Lower-timeframe map from _lower_timeframe_map
+        bar (int, optional): Index of the bar in that map
+        
+    Returns:
+        tuple: (exit price, 'stop_loss' or 'take_profit'), or (None, None) if
+            neither level was touched
+    """
+    # Gapping through a level fills at the open
+    if side * (bar_open - stop) <= 0:
+        return bar_open, 'stop_loss'
+    if side * (bar_open - target) >= 0:
+        return bar_open, 'take_profit'
+        
+    adverse, favourable = (bar_low, bar_high) if side > 0 else (bar_high, bar_low)
+    stop_hit = side * (adverse - stop) <= 0
+    target_hit = side * (favourable - target) >= 0
+    if stop_hit and target_hit and lower is not None and lower['end'][bar] > lower['start'][bar]:
+        # The first lower-timeframe candle to touch a level decides
+        candles = slice(lower['start'][bar], lower['end'][bar])
+        lower_high, lower_low = lower['high'][candles], lower['low'][candles]
+        lower_adverse, lower_favourable = (lower_low, lower_high) if side > 0 else (lower_high, lower_low)
+        stop_touch = np.flatnonzero(side * (lower_adverse - stop) <= 0)
+        target_touch = np.flatnonzero(side * (lower_favourable - target) >= 0)
+        first_stop = stop_touch[0] if len(stop_touch) else len(lower_high)
+        first_target = target_touch[0] if len(target_touch) else len(lower_high)
+        stop_hit = first_stop <= first_target
+        
+    # Without finer data (or within one lower candle) assume the stop came first
+    if stop_hit:
+        return stop, 'stop_loss'
+    if target_hit:
+        return target, 'take_profit'
+    return None, None
+
+
+class PortfolioBacktester(Backtester):
+    """
+    Backtester for one strategy traded across many symbols from a shared account.
+    
+    Symbols are aligned on the union of their timestamps and every bar is processed
+    for all symbols at once: exits and valuation are array operations over the
+    symbol axis, and new entries are capped by the strategy's max_open_trades and
+    by the open notional the shared balance can cover.
+    """
+    
+    def run_backtest(self, frames, liquidity_levels=None, warmup=50):
+        """
+        Run a portfolio backtest.
+        
+        Args:
+            frames (dict): Symbol -> DataFrame with OHLCV data
+            liquidity_levels (dict, optional): Symbol -> list of liquidity levels
+            warmup (int): Leading bars of each symbol that only feed its indicators
+            
+        Returns:
+            dict: Backtest results and performance metrics; trades carry a 'symbol'
+        """
+        frames = {symbol: df for symbol, df in frames.items() if not df.empty}
+        if not frames:
+            return {'error': 'No data provided for backtesting'}
+            
+        liquidity_levels = liquidity_levels or {}
+        symbols = list(frames)
+        
+        # Signals per symbol, then everything on a common timeline (bars x symbols)
+        analyses, signals, timestamps = [], [], []
+        for symbol in symbols:
+            analysis_df = self.strategy.calculate_indicators(frames[symbol].copy())
+            symbol_signals = self.strategy.precompute_signals(analysis_df, liquidity_levels.get(symbol, []))
+            symbol_signals['direction'][:warmup] = 0
+            analyses.append(analysis_df)
+            signals.append(symbol_signals)
+            timestamps.append(pd.DatetimeIndex(
+                analysis_df.index if isinstance(analysis_df.index, pd.DatetimeIndex) else analysis_df['timestamp']))
+        timeline = timestamps[0]
+        for symbol_timestamps in timestamps[1:]:
+            timeline = timeline.union(symbol_timestamps)
+            
+        n_bars, n_symbols = len(timeline), len(symbols)
+        close = np.full((n_bars, n_symbols), np.nan)
+        direction = np.zeros((n_bars, n_symbols), dtype=int)
+        stop_loss = np.full((n_bars, n_symbols), np.nan)
+        take_profit = np.full((n_bars, n_symbols), np.nan)
+        for j, (analysis_df, symbol_signals, symbol_timestamps) in enumerate(zip(analyses, signals, timestamps)):
+            rows = timeline.get_indexer(symbol_timestamps)
+            close[rows, j] = analysis_df['close'].to_numpy(dtype=float)
+            direction[rows, j] = symbol_signals['direction']
+            stop_loss[rows, j] = symbol_signals['stop_loss']
+            take_profit[rows, j] = symbol_signals['take_profit']
+        has_bar = ~np.isnan(close)
+        # Open positions are valued at the symbol's last known close
+        mark = pd.DataFrame(close).ffill().to_numpy()
+        start = min(timeline.get_loc(symbol_timestamps[min(warmup, len(symbol_timestamps) - 1)])
+                    for symbol_timestamps in timestamps)
+                    
+        balance = self.starting_balance
+        initial_balance = balance
+        risk = self.strategy.risk_percentage / 100
+        max_open_trades = self.strategy.max_open_trades
+        side = np.zeros(n_symbols)
+        size = np.zeros(n_symbols)
+        entry_price = np.zeros(n_symbols)
+        position_stop = np.zeros(n_symbols)
+        position_target = np.zeros(n_symbols)
+        entry_bar = np.zeros(n_symbols, dtype=int)
+        timeline_ns = timeline.asi8
+        trades = TradeLog(symbols=symbols, tz=timeline.tz)
+        equity = np.empty(n_bars - start)
+        
+        def close_positions(closing, exit_price, bar, results):
+            profit = side[closing] * size[closing] * (exit_price - entry_price[closing])
+            commission = size[closing] * exit_price * self.commission_rate
+            for k, j in enumerate(np.flatnonzero(closing)):
+                trades.append(timeline_ns[entry_bar[j]], timeline_ns[bar], entry_price[j], exit_price[k],
+                              side[j], size[j], profit[k], commission[k], results[k], j)
+            side[closing] = 0
+            return (profit - commission).sum()
+            
+        for i in range(start, n_bars):
+            is_open = side != 0
+            equity[i - start] = balance + np.sum(side * size * (mark[i] - entry_price), where=is_open)
+            
+            if is_open.any():
+                price = close[i]
+                stopped = is_open & has_bar[i] & (side * (price - position_stop) <= 0)
+                target = is_open & has_bar[i] & ~stopped & (side * (price - position_target) >= 0)
+                closing = stopped | target
+                if closing.any():
+                    exit_price = np.where(stopped, position_stop, position_target)[closing]
+                    results = np.where(stopped[closing], 'stop_loss', 'take_profit')
+                    balance += close_positions(closing, exit_price, i, results)
+                    is_open = side != 0
+                    
+            # New entries, in symbol order, while trade slots and capital allow
+            candidates = np.flatnonzero(~is_open & (direction[i] != 0))
+            slots = max_open_trades - int(is_open.sum())
+            if len(candidates) and slots > 0:
+                open_notional = np.sum(size * entry_price, where=is_open)
+                for j in candidates:
+                    price = close[i, j]
+                    position_size = balance * risk / abs(price - stop_loss[i, j])
+                    notional = position_size * price
+                    if open_notional + notional * (1 + self.commission_rate) > balance:
+                        continue
+                    balance -= notional * self.commission_rate
+                    open_notional += notional
+                    side[j] = direction[i, j]
+                    size[j] = position_size
+                    entry_price[j] = price
+                    position_stop[j] = stop_loss[i, j]
+                    position_target[j] = take_profit[i, j]
+                    entry_bar[j] = i
+                    slots -= 1
+                    if slots == 0:
+                        break
+                        
+        # Close any open positions at the end
+        closing = side != 0
+        if closing.any():
+            balance += close_positions(closing, mark[-1][closing], n_bars - 1,
+                                       ['end_of_period'] * int(closing.sum()))
+                                       
+        trades.sort(('exit_date', 'entry_date'))
+        equity_curve = EquityCurve(timeline[start:], equity)
+        metrics = self.calculate_performance_metrics(trades, initial_balance, balance, equity_curve)
+        
+        return {
+            'initial_balance': initial_balance,
+            'final_balance': balance,
+            'profit_loss': balance - initial_balance,
+            'profit_loss_percent': ((balance - initial_balance) / initial_balance) * 100,
+            'trades': trades,
+            'metrics': metrics,
+            'equity_curve': equity_curve
+        }
@@ -0,0 +1,291 @@
+"""In-memory ring buffers of recent candles per symbol and timeframe."""
+import threading
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class CandleBuffer:
+    """
+    Fixed-capacity ring buffer of the most recent candles for one symbol and timeframe.
+    
+    Timestamps (int64 milliseconds) and OHLCV values (float64) live in
+    preallocated column arrays. Every candle is written twice, at its slot and
+    one capacity further on, so any window of recent candles is a contiguous
+    slice and ``column``/``arrays`` hand out NumPy views without copying.
+    The still-forming last candle is replaced in place; a newer timestamp closes
+    it. DataFrames are built only when asked for, and reused until the buffer
+    changes.
+    
+    Views are read-only and live: they see later updates, and once the buffer
+    is full, appending overwrites the oldest candle they cover. Copy them (or
+    use ``to_frame``) to keep a snapshot. Thread-safe.
+    """
+    
+    def __init__(self, capacity=500):
+        """
+        Initialize an empty buffer.
+        
+        Args:
+            capacity (int): Number of candles kept
+        """
+        self.capacity = capacity
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((len(OHLCV_COLUMNS), 2 * capacity), dtype=np.float64)
+        # Slot the next candle goes to, and number of candles held
+        self._end = 0
+        self._length = 0
+        self._version = 0
+        self._frames = {}
+        self._lock = threading.RLock()
+    
+    @property
+    def version(self):
+        """
+        Counter that changes whenever the buffered candles do.
+        """
+        return self._version
+    
+    @property
+    def last_timestamp(self):
+        """
+        Timestamp in ms of the most recent candle, or None if empty.
+        """
+        with self._lock:
+            return int(self._timestamps[self._end - 1 + self.capacity]) if self._length else None
+    
+    def update(self, candle):
+        """
+        Apply one candle update.
+        
+        Args:
+            candle (list): [timestamp_ms, open, high, low, close, volume]
+            
+        Returns:
+            list: The candle this update closed, or None
+        """
+        timestamp = int(candle[0])
+        with self._lock:
+            last = self.last_timestamp
+            if last is not None and timestamp < last:
+                # Late update for an older candle (e.g. a snapshot after reconnecting)
+                self._merge(np.array([timestamp]), np.array(candle[1:6], dtype=float).reshape(-1, 1))
+                self._changed()
+                return None
+            closed = None
+            if last is None or timestamp > last:
+                closed = self._row(self._end - 1 + self.capacity) if self._length else None
+                self._end = (self._end + 1) % self.capacity
+                self._length = min(self._length + 1, self.capacity)
+            self._write(self._end - 1, timestamp, candle[1:6])
+            self._changed()
+            return closed
+    
+    def merge(self, candles):
+        """
+        Merge fetched candles (e.g. a REST window) into the buffer.
+        
+        Candles newer than the buffered ones are appended in place and fetched
+        values replace buffered ones with the same timestamp, so re-fetching an
+        overlapping window only writes what changed. Leaves the version (and
+        any DataFrame built) alone if nothing did.
+        
+        Args:
+            candles (list or numpy.ndarray): Rows of [timestamp_ms, open, high, low, close, volume]
+        """
+        candles = np.asarray(candles, dtype=float).reshape(-1, 6)
+        if not len(candles):
+            return
+        timestamps = candles[:, 0].astype(np.int64)
+        values = candles[:, 1:].T
+        with self._lock:
+            if not np.all(timestamps[1:] > timestamps[:-1]):
+                order = np.argsort(timestamps, kind='stable')
+                timestamps, values = timestamps[order], values[:, order]
+            # Incoming candles that overlap the buffered tail
+            overlap = int(np.searchsorted(timestamps, self.last_timestamp, side='right')) if self._length else 0
+            window = self._window(overlap)
+            if overlap > self._length or not np.array_equal(self._timestamps[window], timestamps[:overlap]):
+                self._merge(timestamps, values)
+            elif overlap == len(timestamps) and np.array_equal(self._values[:, window], values):
+                return
+            else:
+                slots = (self._end - overlap + np.arange(overlap)) % self.capacity
+                for offset in (0, self.capacity):
+                    self._values[:, slots + offset] = values[:, :overlap]
+                self._extend(timestamps[overlap:], values[:, overlap:])
+            self._changed()
+    
+    def _extend(self, timestamps, values):
+        """
+        Append sorted candles newer than the last buffered one.
+        """
+        timestamps, values = timestamps[-self.capacity:], values[:, -self.capacity:]
+        slots = (self._end + np.arange(len(timestamps))) % self.capacity
+        for offset in (0, self.capacity):
+            self._timestamps[slots + offset] = timestamps
+            self._values[:, slots + offset] = values
+        self._end = (self._end + len(timestamps)) % self.capacity
+        self._length = min(self._length + len(timestamps), self.capacity)
+    
+    def _merge(self, timestamps, values):
+        """
+        Rebuild the buffer from the union of buffered and incoming candles.
+        """
+        window = slice(self._end - self._length + self.capacity, self._end + self.capacity)
+        all_timestamps = np.concatenate([timestamps, self._timestamps[window]])
+        all_values = np.concatenate([values, self._values[:, window]], axis=1)
+        # np.unique keeps the first occurrence, i.e. the incoming candle
+        unique_timestamps, first = np.unique(all_timestamps, return_index=True)
+        self._end = 0
+        self._length = 0
+        self._extend(unique_timestamps, all_values[:, first])
+    
+    def _write(self, slot, timestamp, values):
+        slot %= self.capacity
+        for offset in (0, self.capacity):
+            self._timestamps[slot + offset] = timestamp
+            self._values[:, slot + offset] = values
+    
+    def _row(self, index):
+        return [int(self._timestamps[index])] + self._values[:, index].tolist()
+    
+    def _changed(self):
+        self._version += 1
+        self._frames.clear()
+    
+    def _window(self, limit):
+        """
+        Slice of the mirrored arrays holding the most recent ``limit`` candles.
+        """
+        n = self._length if limit is None else min(limit, self._length)
+        return slice(self._end - n + self.capacity, self._end + self.capacity)
+    
+    def timestamps(self, limit=None):
+        """
+        Get candle timestamps in ms as a read-only view, oldest first.
+        
+        Args:
+            limit (int, optional): Return only the most recent ``limit`` candles
+        """
+        with self._lock:
+            return _read_only(self._timestamps[self._window(limit)])
+    
+    def column(self, name, limit=None):
+        """
+        Get one column ('timestamp' in ms, 'open', 'high', 'low', 'close' or 'volume') as a read-only view.
+        
+        Args:
+            name (str): Column name
+            limit (int, optional): Return only the most recent ``limit`` candles
+        """
+        if name == 'timestamp':
+            return self.timestamps(limit)
+        with self._lock:
+            return _read_only(self._values[OHLCV_COLUMNS.index(name), self._window(limit)])
+    
+    def arrays(self, limit=None):
+        """
+        Get every column as read-only views, consistent with each other.
+        
+        Args:
+            limit (int, optional): Return only the most recent ``limit`` candles
+            
+        Returns:
+            dict: 'timestamp' (int64 ms) and OHLCV (float64) arrays
+        """
+        with self._lock:
+            window = self._window(limit)
+            arrays = {'timestamp': _read_only(self._timestamps[window])}
+            arrays.update((name, _read_only(self._values[i, window])) for i, name in enumerate(OHLCV_COLUMNS))
+            return arrays
+    
+    def rows(self, limit=None):
+        """
+        Get the buffered candles as rows of [timestamp_ms, open, high, low, close, volume], oldest first.
+        """
+        with self._lock:
+            window = self._window(limit)
+            return [self._row(i) for i in range(window.start, window.stop)]
+    
+    def to_frame(self, limit=None):
+        """
+        Get the buffered candles as a DataFrame shaped like BitgetClient.fetch_ohlcv output.
+        
+        The frame is built on first request and returned again until the buffer
+        changes, so callers that modify it should copy it first (as
+        TradingStrategy.calculate_indicators does).
+        
+        Args:
+            limit (int, optional): Return only the most recent ``limit`` candles
+            
+        Returns:
+            pandas.DataFrame: DataFrame containing OHLCV data
+        """
+        with self._lock:
+            window = self._window(limit)
+            df = self._frames.get(window.stop - window.start)
+            if df is None:
+                df = pd.DataFrame({
+                    'timestamp': (self._timestamps[window] * 1_000_000).view('datetime64[ns]'),
+                    **{name: self._values[i, window].copy() for i, name in enumerate(OHLCV_COLUMNS)}
+                })
+                self._frames[window.stop - window.start] = df
+            return df
+    
+    def __len__(self):
+        return self._length
+
+
+class CandleCache:
+    """
+    CandleBuffers keyed by (symbol, timeframe), created on first use. Thread-safe.
+    """
+    
+    def __init__(self, capacity=500):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            capacity (int): Candles kept per symbol and timeframe
+        """
+        self.capacity = capacity
+        self._buffers = {}
+        self._lock = threading.Lock()
+    
+    def buffer(self, symbol, timeframe):
+        """
+        Get the buffer for a symbol and timeframe, creating it if needed.
+        """
+        with self._lock:
+            buffer = self._buffers.get((symbol, timeframe))
+            if buffer is None:
+                buffer = self._buffers[(symbol, timeframe)] = CandleBuffer(self.capacity)
+            return buffer
+    
+    def get(self, symbol, timeframe):
+        """
+        Get the buffer for a symbol and timeframe, or None if there is none.
+        """
+        return self._buffers.get((symbol, timeframe))
+    
+    def clear(self):
+        """
+        Drop every buffer.
+        """
+        with self._lock:
+            self._buffers.clear()
+    
+    def __contains__(self, key):
+        return key in self._buffers
+    
+    def __len__(self):
+        return len(self._buffers)
+
+
+def _read_only(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
@@ -0,0 +1,114 @@
+"""Persistent on-disk store for OHLCV candles."""
+import os
+import sqlite3
+import threading
+
+
+class CandleStore:
+    """
+    SQLite-backed OHLCV store keyed by symbol and timeframe.
+    
+    Candles are stored exactly as ccxt returns them ([timestamp_ms, open, high,
+    low, close, volume]); writing a candle that already exists replaces it, so
+    re-syncing the still-forming last candle and overlapping pages is safe.
+    """
+    
+    def __init__(self, path='candles.sqlite'):
+        """
+        Open (or create) the candle store.
+        
+        Args:
+            path (str): SQLite database file
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS candles ('
+            'symbol TEXT NOT NULL, timeframe TEXT NOT NULL, timestamp INTEGER NOT NULL, '
+            'open REAL, high REAL, low REAL, close REAL, volume REAL, '
+            'PRIMARY KEY (symbol, timeframe, timestamp)) WITHOUT ROWID'
+        )
+        self._conn.commit()
+    
+    def write(self, symbol, timeframe, candles):
+        """
+        Insert or replace candles.
+        
+        Args:
+            symbol (str): Trading pair symbol
+            timeframe (str): Candle timeframe
+            candles (list): Rows of [timestamp_ms, open, high, low, close, volume]
+            
+        Returns:
+            int: Number of candles written
+        """
+        rows = [(symbol, timeframe, int(c[0]), c[1], c[2], c[3], c[4], c[5]) for c in candles]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+    
+    def read(self, symbol, timeframe, since=None, until=None, limit=None):
+        """
+        Read stored candles in timestamp order.
+        
+        Args:
+            symbol (str): Trading pair symbol
+            timeframe (str): Candle timeframe
+            since (int, optional): Earliest timestamp in ms (inclusive)
+            until (int, optional): Latest timestamp in ms (inclusive)
+            limit (int, optional): Return only the most recent ``limit`` candles
+            
+        Returns:
+            list: Rows of [timestamp_ms, open, high, low, close, volume]
+        """
+        query = 'SELECT timestamp, open, high, low, close, volume FROM candles WHERE symbol = ? AND timeframe = ?'
+        params = [symbol, timeframe]
+        if since is not None:
+            query += ' AND timestamp >= ?'
+            params.append(int(since))
+        if until is not None:
+            query += ' AND timestamp <= ?'
+            params.append(int(until))
+        if limit is not None:
+            query = f'SELECT * FROM ({query} ORDER BY timestamp DESC LIMIT ?)'
+            params.append(int(limit))
+        query += ' ORDER BY timestamp'
+        
+        with self._lock:
+            return [list(row) for row in self._conn.execute(query, params)]
+    
+    def first_timestamp(self, symbol, timeframe):
+        """
+        Get the timestamp of the oldest stored candle, or None if there are none.
+        """
+        return self._bound('MIN', symbol, timeframe)
+    
+    def last_timestamp(self, symbol, timeframe):
+        """
+        Get the timestamp of the newest stored candle, or None if there are none.
+        """
+        return self._bound('MAX', symbol, timeframe)
+    
+    def _bound(self, func, symbol, timeframe):
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT {func}(timestamp) FROM candles WHERE symbol = ? AND timeframe = ?',
+                (symbol, timeframe)
+            ).fetchone()
+        return row[0]
+    
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,382 @@
+"""Incremental technical indicators for live candle streams."""
+import copy
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+NAN = float('nan')
+
+
+class _EwmMean:
+    """
+    Exponentially weighted mean updated one value at a time.
+    
+    Follows the recurrence pandas uses for ``Series.ewm(...).mean()`` (with
+    ``ignore_na=False``) so results match the batch computation.
+    """
+    def __init__(self, com, adjust, min_periods=0):
+        alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+    
+    def update(self, value):
+        is_observation = value == value
+        self.nobs += is_observation
+        if self.weighted == self.weighted:
+            self.old_wt *= self.old_wt_factor
+            if is_observation:
+                if self.weighted != value:
+                    self.weighted = self.old_wt * self.weighted + self.new_wt * value
+                    self.weighted /= (self.old_wt + self.new_wt)
+                self.old_wt = self.old_wt + self.new_wt if self.adjust else 1.0
+        elif is_observation:
+            self.weighted = value
+        return self.weighted if self.nobs >= self.min_periods else NAN
+
+
+class _Ema:
+    """
+    EMA seeded with the SMA of the first ``length`` values, as pandas_ta.ema.
+    """
+    def __init__(self, length):
+        self.length = length
+        self.seed = []
+        self.ewm = _EwmMean(com=(length - 1) / 2, adjust=False)
+    
+    def update(self, value):
+        if self.seed is not None:
+            self.seed.append(value)
+            if len(self.seed) < self.length:
+                return NAN
+            value = np.array(self.seed).sum() / self.length
+            self.seed = None
+        return self.ewm.update(value)
+
+
+class _Rma:
+    """
+    Wilder's moving average, as pandas_ta.rma.
+    """
+    def __init__(self, length):
+        alpha = 1.0 / length
+        self.ewm = _EwmMean(com=(1.0 - alpha) / alpha, adjust=True, min_periods=length)
+    
+    def update(self, value):
+        return self.ewm.update(value)
+
+
+class _RollingMean:
+    """
+    Fixed-window mean with the compensated add/remove updates of pandas rolling().mean().
+    """
+    def __init__(self, length):
+        self.length = length
+        self.window = deque()
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = None
+    
+    def update(self, value):
+        self.window.append(value)
+        if len(self.window) > self.length:
+            old = self.window.popleft()
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.compensation_remove
+                t = self.sum_x + y
+                self.compensation_remove = t - self.sum_x - y
+                self.sum_x = t
+                self.neg_ct -= math.copysign(1.0, old) < 0
+        if self.prev_value is None:
+            self.prev_value = value
+        if value == value:
+            self.nobs += 1
+            y = value - self.compensation_add
+            t = self.sum_x + y
+            self.compensation_add = t - self.sum_x - y
+            self.sum_x = t
+            self.neg_ct += math.copysign(1.0, value) < 0
+            if value == self.prev_value:
+                self.num_consecutive_same_value += 1
+            else:
+                self.num_consecutive_same_value = 1
+            self.prev_value = value
+            
+        if self.nobs < self.length or self.nobs == 0:
+            return NAN
+        result = self.sum_x / self.nobs
+        if self.num_consecutive_same_value >= self.nobs:
+            result = self.prev_value
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+
+class _RollingVar:
+    """
+    Fixed-window variance with the Welford add/remove updates of pandas rolling().var().
+    """
+    def __init__(self, length, ddof=0):
+        self.length = length
+        self.ddof = ddof
+        self.window = deque()
+        self.nobs = 0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = None
+    
+    def update(self, value):
+        self.window.append(value)
+        if len(self.window) > self.length:
+            old = self.window.popleft()
+            if old == old:
+                self.nobs -= 1
+                if self.nobs:
+                    prev_mean = self.mean_x - self.compensation_remove
+                    y = old - self.compensation_remove
+                    t = y - self.mean_x
+                    self.compensation_remove = t + self.mean_x - y
+                    self.mean_x -= t / self.nobs
+                    self.ssqdm_x -= (old - prev_mean) * (old - self.mean_x)
+                else:
+                    self.mean_x = 0.0
+                    self.ssqdm_x = 0.0
+        if self.prev_value is None:
+            self.prev_value = value
+        if value == value:
+            if value == self.prev_value:
+                self.num_consecutive_same_value += 1
+            else:
+                self.num_consecutive_same_value = 1
+            self.prev_value = value
+            self.nobs += 1
+            prev_mean = self.mean_x - self.compensation_add
+            y = value - self.compensation_add
+            t = y - self.mean_x
+            self.compensation_add = t + self.mean_x - y
+            self.mean_x += t / self.nobs
+            self.ssqdm_x += (value - prev_mean) * (value - self.mean_x)
+            
+        if self.nobs < self.length or self.nobs <= self.ddof:
+            return NAN
+        if self.nobs == 1 or self.num_consecutive_same_value >= self.nobs:
+            return 0.0
+        return max(self.ssqdm_x / (self.nobs - self.ddof), 0.0)
+
+
+def _non_zero_range(high, low):
+    """
+    Difference of two values, nudged away from zero as pandas_ta does.
+    """
+    diff = high - low
+    return diff + np.finfo(float).eps if diff == 0 else diff
+
+
+class IncrementalIndicators:
+    """
+    Stateful indicator engine that updates on each new candle instead of recomputing.
+    
+    Produces the same columns as TradingStrategy.calculate_indicators (EMA 20/50/100,
+    RSI, Bollinger Bands, MACD, ATR, volume SMA, support/resistance) with O(1) work per
+    candle, so live signal latency does not grow with history length. Feed it the
+    DataFrames returned by BitgetClient.fetch_ohlcv: candles already seen are skipped
+    and a repeated timestamp replaces the still-forming last candle.
+    
+    Support/resistance pivots need ``sr_window`` candles on each side, so a pivot
+    is filled in ``sr_window`` candles after it forms, exactly as a batch
+    recomputation would show it.
+    """
+    BASE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    INDICATOR_COLUMNS = [
+        'ema20', 'ema50', 'ema100', 'rsi',
+        'BBL_20_2.0', 'BBM_20_2.0', 'BBU_20_2.0', 'BBB_20_2.0', 'BBP_20_2.0',
+        'MACD_12_26_9', 'MACDh_12_26_9', 'MACDs_12_26_9',
+        'atr', 'volume_sma', 'support', 'resistance'
+    ]
+    
+    def __init__(self, history=None, max_rows=500, sr_window=10):
+        """
+        Initialize the engine, optionally seeding it from historical candles.
+        
+        Args:
+            history (pandas.DataFrame, optional): OHLCV data to seed the indicators
+            max_rows (int): Number of most recent rows kept for ``frame``
+            sr_window (int): Window size for support/resistance pivots
+        """
+        self.sr_window = sr_window
+        self.rows = deque(maxlen=max(max_rows, 2 * sr_window + 1))
+        self._state = {
+            'ema20': _Ema(20),
+            'ema50': _Ema(50),
+            'ema100': _Ema(100),
+            'rsi_gain': _Rma(14),
+            'rsi_loss': _Rma(14),
+            'bb_mid': _RollingMean(20),
+            'bb_var': _RollingVar(20, ddof=0),
+            'macd_fast': _Ema(12),
+            'macd_slow': _Ema(26),
+            'macd_signal': _Ema(9),
+            'atr': _Rma(14),
+            'volume_sma': _RollingMean(20),
+            'prev_close': NAN,
+            'lows': deque(maxlen=2 * sr_window + 1),
+            'highs': deque(maxlen=2 * sr_window + 1),
+            'last_timestamp': None
+        }
+        self._snapshot = None
+        
+        if history is not None and not history.empty:
+            self.update(history)
+    
+    @property
+    def columns(self):
+        return self.BASE_COLUMNS + self.INDICATOR_COLUMNS
+    
+    def update(self, candles):
+        """
+        Feed new candles into the engine.
+        
+        Args:
+            candles (pandas.DataFrame): OHLCV data, e.g. from BitgetClient.fetch_ohlcv
+            
+        Returns:
+            dict: Column name to value for the most recent candle
+        """
+        if candles.empty:
+            return self.latest()
+            
+        timestamps = candles['timestamp'] if 'timestamp' in candles.columns else candles.index
+        ohlcv = zip(timestamps, candles['open'].to_numpy(dtype=float), candles['high'].to_numpy(dtype=float),
+                    candles['low'].to_numpy(dtype=float), candles['close'].to_numpy(dtype=float),
+                    candles['volume'].to_numpy(dtype=float))
+        last = len(candles) - 1
+        
+        for n, (timestamp, open_, high, low, close, volume) in enumerate(ohlcv):
+            last_timestamp = self._state['last_timestamp']
+            if last_timestamp is not None:
+                if timestamp < last_timestamp:
+                    continue
+                if timestamp == last_timestamp:
+                    # Revised version of the still-forming candle: roll it back first
+                    if self._snapshot is None:
+                        continue
+                    self._restore()
+                    
+            # Keep a snapshot before the newest candle so it can be revised later
+            if n == last:
+                self._take_snapshot()
+            self._process(timestamp, open_, high, low, close, volume)
+            
+        return self.latest()
+    
+    def latest(self):
+        """
+        Get the indicator values for the most recent candle.
+        
+        Returns:
+            dict: Column name to value for the last candle, empty if no candles yet
+        """
+        if not self.rows:
+            return {}
+        return dict(zip(self.columns, self.rows[-1]))
+    
+    @property
+    def frame(self):
+        """
+        The most recent rows as a DataFrame with calculate_indicators' column names.
+        """
+        return pd.DataFrame(list(self.rows), columns=self.columns)
+    
+    def _process(self, timestamp, open_, high, low, close, volume):
+        state = self._state
+        
+        change = close - state['prev_close']
+        gain = max(change, 0.0) if change == change else NAN
+        loss = min(change, 0.0) if change == change else NAN
+        avg_gain = state['rsi_gain'].update(gain)
+        avg_loss = state['rsi_loss'].update(loss)
+        rsi = 100 * avg_gain / (avg_gain + abs(avg_loss)) if avg_gain + abs(avg_loss) != 0 else NAN
+        
+        mid = state['bb_mid'].update(close)
+        deviations = 2.0 * math.sqrt(state['bb_var'].update(close))
+        lower = mid - deviations
+        upper = mid + deviations
+        band_range = _non_zero_range(upper, lower)
+        
+        fast = state['macd_fast'].update(close)
+        slow = state['macd_slow'].update(close)
+        macd = fast - slow
+        signal = state['macd_signal'].update(macd) if macd == macd else NAN
+        
+        prev_close = state['prev_close']
+        if prev_close == prev_close:
+            true_range = max(abs(_non_zero_range(high, low)), abs(high - prev_close), abs(prev_close - low))
+        else:
+            true_range = NAN
+            
+        row = [
+            timestamp, open_, high, low, close, volume,
+            state['ema20'].update(close),
+            state['ema50'].update(close),
+            state['ema100'].update(close),
+            rsi,
+            lower, mid, upper,
+            100 * band_range / mid,
+            _non_zero_range(close, lower) / band_range,
+            macd, macd - signal, signal,
+            state['atr'].update(true_range),
+            state['volume_sma'].update(volume),
+            NAN, NAN
+        ]
+        state['prev_close'] = close
+        state['last_timestamp'] = timestamp
+        
+        evicted = self.rows[0] if len(self.rows) == self.rows.maxlen else None
+        self.rows.append(row)
+        if self._snapshot is not None and self._snapshot['pending']:
+            self._snapshot['evicted'] = evicted
+            self._snapshot['pending'] = False
+            
+        # The candle sr_window back now has sr_window candles on both sides
+        state['lows'].append(low)
+        state['highs'].append(high)
+        if len(state['lows']) == state['lows'].maxlen:
+            pivot = self.rows[-1 - self.sr_window]
+            lows, highs = state['lows'], state['highs']
+            if not any(np.isnan(lows)) and lows[self.sr_window] == min(lows):
+                pivot[-2] = lows[self.sr_window]
+            if not any(np.isnan(highs)) and highs[self.sr_window] == max(highs):
+                pivot[-1] = highs[self.sr_window]
+    
+    def _take_snapshot(self):
+        self._snapshot = {
+            'state': copy.deepcopy(self._state),
+            'evicted': None,
+            'pending': True
+        }
+    
+    def _restore(self):
+        snapshot = self._snapshot
+        self.rows.pop()
+        if snapshot['evicted'] is not None:
+            self.rows.appendleft(snapshot['evicted'])
+        if self.sr_window and len(self.rows) >= self.sr_window:
+            # Undo the pivot confirmed by the candle being replaced
+            self.rows[len(self.rows) - self.sr_window][-2:] = [NAN, NAN]
+        self._state = copy.deepcopy(snapshot['state'])
@@ -0,0 +1,114 @@
+"""Persistent TTL cache for exchange metadata shared between processes."""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+
+class MetadataCache:
+    """
+    SQLite-backed cache of slow-changing exchange metadata (markets, precision).
+    
+    Entries expire after a caller-chosen TTL. Refreshing an expired entry
+    holds the database write lock while fetching, so when several processes
+    find it expired at once, one fetches and the others wait and read its
+    result: each entry is fetched at most once per TTL across processes.
+    """
+    
+    def __init__(self, path='exchange_metadata.sqlite', lock_timeout=60.0):
+        """
+        Open (or create) the cache.
+        
+        Args:
+            path (str): SQLite database file
+            lock_timeout (float): Seconds to wait for another process's refresh
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            
+        self._lock = threading.Lock()
+        # Transactions are managed explicitly so a refresh can take the write lock up front
+        self._conn = sqlite3.connect(path, timeout=lock_timeout, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, fetched_at REAL NOT NULL, value BLOB)'
+        )
+    
+    def get(self, key, fetch, ttl, refresh=False):
+        """
+        Get a cached value, fetching and storing it if missing or older than ``ttl``.
+        
+        If the fetch fails while an expired value is cached, the expired value
+        is returned instead.
+        
+        Args:
+            key (str): Entry name, e.g. 'bitget:markets'
+            fetch (callable): Called without arguments to fetch a fresh value
+            ttl (float): Maximum age in seconds
+            refresh (bool): Fetch even if the cached value is fresh
+            
+        Returns:
+            tuple: (value, time it was fetched as a Unix timestamp)
+        """
+        with self._lock:
+            fetched_at = self._fetched_at(key)
+            if fetched_at is not None and not refresh and time.time() - fetched_at < ttl:
+                return self._value(key), fetched_at
+                
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Another process may have refreshed it while we waited for the lock
+                current = self._fetched_at(key)
+                refreshed = current is not None and (fetched_at is None or current > fetched_at)
+                if current is not None and time.time() - current < ttl and (not refresh or refreshed):
+                    value = self._value(key)
+                    self._conn.execute('COMMIT')
+                    return value, current
+                    
+                try:
+                    value = fetch()
+                except Exception as e:
+                    if current is None:
+                        raise
+                    print(f"Error refreshing {key}, using cached value: {str(e)}")
+                    value = self._value(key)
+                    self._conn.execute('COMMIT')
+                    return value, current
+                    
+                fetched_at = time.time()
+                self._conn.execute('INSERT OR REPLACE INTO metadata VALUES (?, ?, ?)',
+                                   (key, fetched_at, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+                self._conn.execute('COMMIT')
+                return value, fetched_at
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute('ROLLBACK')
+                raise
+    
+    def _fetched_at(self, key):
+        row = self._conn.execute('SELECT fetched_at FROM metadata WHERE key = ?', (key,)).fetchone()
+        return row[0] if row is not None else None
+    
+    def _value(self, key):
+        row = self._conn.execute('SELECT value FROM metadata WHERE key = ?', (key,)).fetchone()
+        return pickle.loads(row[0])
+    
+    def invalidate(self, key=None):
+        """
+        Drop one entry, or every entry if no key is given.
+        """
+        with self._lock:
+            if key is None:
+                self._conn.execute('DELETE FROM metadata')
+            else:
+                self._conn.execute('DELETE FROM metadata WHERE key = ?', (key,))
+    
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,406 @@
+"""Vectorized performance metrics shared by the backtester and the performance tracker."""
+import numpy as np
+
+from utils.records import column
+
+SECONDS_PER_YEAR = 365 * 24 * 3600  # Crypto markets trade every day of the year
+TIMEFRAME_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'M': 2592000, 'y': 31536000}
+
+
+def periods_per_year(timeframe=None, dates=None):
+    """
+    Get the number of return periods in a year, used to annualize ratios.
+    
+    Args:
+        timeframe (str, optional): Candle timeframe (e.g., '15m', '1h', '1d')
+        dates (array-like, optional): Dates of the equity points; when no timeframe
+            is given, their median spacing is used as the period
+            
+    Returns:
+        float: Periods per year (365 daily periods if neither tells the spacing)
+    """
+    if timeframe is not None:
+        if timeframe[-1] not in TIMEFRAME_UNITS:
+            raise ValueError(f"Unknown timeframe: {timeframe}")
+        return SECONDS_PER_YEAR / (int(timeframe[:-1] or 1) * TIMEFRAME_UNITS[timeframe[-1]])
+    if dates is not None and len(dates) > 1:
+        spacing = np.median(np.diff(np.asarray(dates, dtype=np.int64)))
+        if spacing > 0:
+            return SECONDS_PER_YEAR * 1e9 / spacing
+    return 365.0
+
+
+def span_periods_per_year(start, end, points):
+    """
+    Get periods per year for irregular points, from their average spacing.
+    
+    Args:
+        start (int): Earliest point time in nanoseconds
+        end (int): Latest point time in nanoseconds
+        points (int): Number of points
+        
+    Returns:
+        float: Periods per year (365 if the points do not span any time)
+    """
+    if points < 2 or end <= start:
+        return 365.0
+    return SECONDS_PER_YEAR * 1e9 * (points - 1) / (end - start)
+
+
+def period_returns(equity):
+    """
+    Get the simple return between consecutive equity points.
+    
+    Periods that start from zero equity have a return of 0.
+    """
+    equity = np.asarray(equity, dtype=float)
+    previous = equity[:-1]
+    change = np.diff(equity)
+    return np.divide(change, previous, out=np.zeros_like(change), where=previous != 0)
+
+
+def drawdowns(equity):
+    """
+    Get the drawdown from the running peak at every equity point, as a fraction of the peak.
+    """
+    equity = np.asarray(equity, dtype=float)
+    peak = np.maximum.accumulate(equity)
+    return np.divide(peak - equity, peak, out=np.zeros_like(equity), where=peak > 0)
+
+
+def max_drawdown(equity):
+    """
+    Get the largest peak-to-trough decline as a fraction of the peak.
+    """
+    return float(drawdowns(equity).max()) if len(equity) else 0.0
+
+
+def sharpe_ratio(returns, periods=365.0):
+    """
+    Get the annualized Sharpe ratio of period returns (risk-free rate of 0).
+    
+    Args:
+        returns (numpy.ndarray): Period returns
+        periods (float): Periods per year
+        
+    Returns:
+        float: Sharpe ratio, 0 if the returns do not vary
+    """
+    if len(returns) == 0:
+        return 0.0
+    std = np.std(returns)
+    return float(np.mean(returns) / std * np.sqrt(periods)) if std > 0 else 0.0
+
+
+def sortino_ratio(returns, periods=365.0):
+    """
+    Get the annualized Sortino ratio, which only penalizes downside deviation.
+    
+    Args:
+        returns (numpy.ndarray): Period returns
+        periods (float): Periods per year
+        
+    Returns:
+        float: Sortino ratio, 0 without losing periods
+    """
+    if len(returns) == 0:
+        return 0.0
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    return float(np.mean(returns) / downside * np.sqrt(periods)) if downside > 0 else 0.0
+
+
+def annualized_return(equity, periods=365.0):
+    """
+    Get the compound annual growth rate between the first and last equity points.
+    """
+    if len(equity) < 2 or equity[0] <= 0:
+        return 0.0
+    growth = max(equity[-1], 0.0) / equity[0]
+    return float(growth ** (periods / (len(equity) - 1)) - 1)
+
+
+def calmar_ratio(equity, periods=365.0):
+    """
+    Get the annualized return divided by the maximum drawdown (0 without a drawdown).
+    """
+    drawdown = max_drawdown(equity)
+    return annualized_return(equity, periods) / drawdown if drawdown > 0 else 0.0
+
+
+def exposure(entry_dates, exit_dates, start, end):
+    """
+    Get the share of time at least one trade was open.
+    
+    Overlapping trades count once, so the result stays within 0-1 for portfolios.
+    
+    Args:
+        entry_dates (numpy.ndarray): Trade entry times in nanoseconds
+        exit_dates (numpy.ndarray): Trade exit times in nanoseconds
+        start (int): Start of the measured period in nanoseconds
+        end (int): End of the measured period in nanoseconds
+        
+    Returns:
+        float: Fraction of the period spent in the market
+    """
+    if len(entry_dates) == 0 or end <= start:
+        return 0.0
+    return time_in_market(np.clip(entry_dates, start, end), np.clip(exit_dates, start, end)) / (end - start)
+
+
+def time_in_market(entry_dates, exit_dates):
+    """
+    Get the total time covered by at least one trade, in the units of the dates.
+    """
+    if len(entry_dates) == 0:
+        return 0
+    order = np.argsort(entry_dates, kind='stable')
+    entries = entry_dates[order]
+    exits = exit_dates[order]
+    # Each trade only adds the time after every earlier-starting trade has closed
+    covered = np.concatenate([[entries[0]], np.maximum.accumulate(exits)[:-1]])
+    return int(np.sum(np.maximum(exits - np.maximum(entries, covered), 0)))
+
+
+def trade_statistics(profits):
+    """
+    Summarize trade outcomes.
+    
+    Args:
+        profits (numpy.ndarray): Profit of each trade
+        
+    Returns:
+        dict: Trade counts, win rate, profit factor, gross profit and loss, and the
+            average winning and losing trade (the latter negative)
+    """
+    profits = np.asarray(profits, dtype=float)
+    wins = profits > 0
+    win_count = int(wins.sum())
+    loss_count = len(profits) - win_count
+    gross_profit = float(profits[wins].sum())
+    gross_loss = float(profits[~wins].sum())
+    return {
+        'total_trades': len(profits),
+        'winning_trades': win_count,
+        'losing_trades': loss_count,
+        'win_rate': win_count / len(profits) if len(profits) else 0,
+        'profit_factor': abs(gross_profit / gross_loss) if gross_loss != 0 else float('inf'),
+        'gross_profit': gross_profit,
+        'gross_loss': gross_loss,
+        'average_profit': gross_profit / win_count if win_count else 0,
+        'average_loss': gross_loss / loss_count if loss_count else 0
+    }
+
+
+def equity_statistics(equity_curve, timeframe=None, periods=None):
+    """
+    Risk metrics of an equity curve.
+    
+    Args:
+        equity_curve (EquityCurve or list): Equity points with 'date' and 'equity'
+        timeframe (str, optional): Spacing of the points, inferred from the dates if omitted
+        periods (float, optional): Periods per year, overriding the timeframe
+        
+    Returns:
+        dict: Max drawdown and annualized Sharpe, Sortino and Calmar ratios
+    """
+    equity = column(equity_curve, 'equity')
+    if periods is None:
+        periods = periods_per_year(timeframe, column(equity_curve, 'date') if timeframe is None else None)
+    returns = period_returns(equity)
+    return {
+        'max_drawdown': max_drawdown(equity),
+        'sharpe_ratio': sharpe_ratio(returns, periods),
+        'sortino_ratio': sortino_ratio(returns, periods),
+        'calmar_ratio': calmar_ratio(equity, periods)
+    }
+
+
+def performance_metrics(trades, initial_balance, final_balance, equity_curve, timeframe=None):
+    """
+    Calculate the standard performance metrics of a run.
+    
+    Args:
+        trades (TradeLog or list): Trade records
+        initial_balance (float): Initial account balance
+        final_balance (float): Final account balance
+        equity_curve (EquityCurve or list): Equity values over time
+        timeframe (str, optional): Spacing of the equity points, inferred if omitted
+        
+    Returns:
+        dict: Performance metrics
+    """
+    metrics = trade_statistics(column(trades, 'profit'))
+    del metrics['gross_profit'], metrics['gross_loss']
+    if not len(trades):
+        metrics['profit_factor'] = 0
+    metrics.update(equity_statistics(equity_curve, timeframe))
+    
+    dates = column(equity_curve, 'date')
+    metrics['exposure'] = exposure(column(trades, 'entry_date'), column(trades, 'exit_date'),
+                                   dates[0], dates[-1]) if len(dates) and len(trades) else 0.0
+    metrics['return_percentage'] = ((final_balance - initial_balance) / initial_balance) * 100
+    return metrics
+
+
+class RunningMetrics:
+    """
+    Running accumulators that keep trade_statistics, equity_statistics and
+    exposure current in constant time per trade or equity point.
+    
+    Return moments use Welford's update, drawdown a running peak, and exposure
+    the union of trade intervals, extended in O(1) while trades arrive in entry
+    order (a trade entered before an earlier one triggers one full recompute).
+    Equity points are annualized by their average spacing.
+    """
+    
+    def __init__(self):
+        self.trades = 0
+        self.wins = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.holding_time = 0
+        self.entries = []
+        self.exits = []
+        self.last_entry = None
+        self.covered = 0
+        self.covered_until = None
+        self.points = 0
+        self.first_equity = None
+        self.last_equity = None
+        self.peak = float('-inf')
+        self.max_drawdown = 0.0
+        self.first_date = None
+        self.last_date = None
+        self.equity_start = None
+        self.equity_end = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.downside = 0.0
+    
+    def add_trade(self, profit, entry_date, exit_date):
+        """
+        Add a closed trade.
+        
+        Args:
+            profit (float): Gross profit
+            entry_date (int): Entry time in nanoseconds
+            exit_date (int): Exit time in nanoseconds
+        """
+        self.trades += 1
+        if profit > 0:
+            self.wins += 1
+            self.gross_profit += profit
+        else:
+            self.gross_loss += profit
+        self.holding_time += exit_date - entry_date
+        
+        self.entries.append(entry_date)
+        self.exits.append(exit_date)
+        if self.last_entry is not None and entry_date < self.last_entry:
+            self.covered = time_in_market(np.array(self.entries), np.array(self.exits))
+        else:
+            start = entry_date if self.covered_until is None else max(entry_date, self.covered_until)
+            self.covered += max(exit_date - start, 0)
+        self.last_entry = entry_date if self.last_entry is None else max(self.last_entry, entry_date)
+        self.covered_until = exit_date if self.covered_until is None else max(self.covered_until, exit_date)
+        self._extend_span(entry_date, exit_date)
+    
+    def add_equity(self, equity, date):
+        """
+        Add an equity point.
+        
+        Args:
+            equity (float): Account equity
+            date (int): Time of the point in nanoseconds
+        """
+        if self.points:
+            previous = self.last_equity
+            value = (equity - previous) / previous if previous != 0 else 0.0
+            # Welford's update of the mean and sum of squared deviations
+            count = self.points
+            delta = value - self.mean
+            self.mean += delta / count
+            self.m2 += delta * (value - self.mean)
+            self.downside += min(value, 0.0) ** 2
+        else:
+            self.first_equity = equity
+            self.equity_start = self.equity_end = date
+        self.points += 1
+        self.last_equity = equity
+        self.equity_start = min(self.equity_start, date)
+        self.equity_end = max(self.equity_end, date)
+        
+        self.peak = max(self.peak, equity)
+        if self.peak > 0:
+            self.max_drawdown = max(self.max_drawdown, (self.peak - equity) / self.peak)
+        self._extend_span(date, date)
+    
+    def _extend_span(self, start, end):
+        self.first_date = start if self.first_date is None else min(self.first_date, start)
+        self.last_date = end if self.last_date is None else max(self.last_date, end)
+    
+    def trade_statistics(self):
+        """
+        Get the same values as trade_statistics() over the trades added so far.
+        """
+        losses = self.trades - self.wins
+        return {
+            'total_trades': self.trades,
+            'winning_trades': self.wins,
+            'losing_trades': losses,
+            'win_rate': self.wins / self.trades if self.trades else 0,
+            'profit_factor': abs(self.gross_profit / self.gross_loss) if self.gross_loss != 0 else float('inf'),
+            'gross_profit': self.gross_profit,
+            'gross_loss': self.gross_loss,
+            'average_profit': self.gross_profit / self.wins if self.wins else 0,
+            'average_loss': self.gross_loss / losses if losses else 0
+        }
+    
+    def periods_per_year(self):
+        """
+        Get span_periods_per_year() of the equity points added so far.
+        """
+        if not self.points:
+            return 365.0
+        return span_periods_per_year(self.equity_start, self.equity_end, self.points)
+    
+    def equity_statistics(self, periods=None):
+        """
+        Get the same values as equity_statistics() over the equity points added so far.
+        
+        Args:
+            periods (float, optional): Periods per year (default: from the average spacing)
+        """
+        periods = self.periods_per_year() if periods is None else periods
+        returns = self.points - 1
+        sharpe = sortino = 0.0
+        if returns > 0:
+            std = np.sqrt(self.m2 / returns)
+            downside = np.sqrt(self.downside / returns)
+            sharpe = float(self.mean / std * np.sqrt(periods)) if std > 0 else 0.0
+            sortino = float(self.mean / downside * np.sqrt(periods)) if downside > 0 else 0.0
+            
+        annual = 0.0
+        if self.points > 1 and self.first_equity > 0:
+            annual = float((max(self.last_equity, 0.0) / self.first_equity) ** (periods / returns) - 1)
+        return {
+            'max_drawdown': self.max_drawdown,
+            'sharpe_ratio': sharpe,
+            'sortino_ratio': sortino,
+            'calmar_ratio': annual / self.max_drawdown if self.max_drawdown > 0 else 0.0
+        }
+    
+    def exposure(self):
+        """
+        Get the share of the span from the first to the last trade or equity date
+        spent in the market.
+        """
+        if not self.trades or self.last_date <= self.first_date:
+            return 0.0
+        return self.covered / (self.last_date - self.first_date)
+    
+    def average_holding_time(self):
+        """
+        Get the average time trades were held, in nanoseconds.
+        """
+        return self.holding_time / self.trades if self.trades else 0.0
@@ -0,0 +1,113 @@
+"""Monte Carlo resampling of backtest trades."""
+import numpy as np
+import pandas as pd
+
+from utils.records import column
+
+
+class MonteCarloSimulator:
+    """
+    Resample a backtest's trades to estimate the spread of possible outcomes.
+    
+    Each trade is reduced to its net return on the balance before it, so the
+    resampled paths compound like the backtester's percentage-of-balance sizing.
+    Paths are simulated together as (paths x trades) matrices, in chunks of at
+    most ``max_cells`` values so memory stays bounded however many trades
+    there are.
+    """
+    
+    def __init__(self, trades, initial_balance):
+        """
+        Initialize the simulator from backtest trades.
+        
+        Args:
+            trades (list): Trade records with 'profit' and 'commission', in the
+                order they were closed (e.g. run_backtest(...)['trades'])
+            initial_balance (float): Account balance before the first trade
+        """
+        self.initial_balance = initial_balance
+        self.returns = trade_returns(trades, initial_balance)
+    
+    def simulate(self, paths=10000, method='bootstrap', ruin_drawdown=0.5, seed=None, max_cells=4_000_000):
+        """
+        Simulate resampled trade sequences.
+        
+        Args:
+            paths (int): Number of simulated trade sequences
+            method (str): 'bootstrap' draws trades with replacement; 'permute' shuffles
+                the original trades, keeping the final balance and varying the path
+            ruin_drawdown (float): Drawdown from the starting balance that counts as ruin
+            seed (int, optional): Random seed
+            max_cells (int): Maximum number of path/trade values simulated at once
+            
+        Returns:
+            dict: 'final_balance' and 'max_drawdown' arrays with one value per path,
+                'risk_of_ruin' (share of paths that hit ruin_drawdown) and 'summary',
+                a DataFrame of percentiles
+        """
+        if method not in ('bootstrap', 'permute'):
+            raise ValueError(f"Unknown resampling method: {method}")
+        if len(self.returns) == 0:
+            return {'error': 'No trades to resample'}
+            
+        rng = np.random.default_rng(seed)
+        n = len(self.returns)
+        growth = 1 + self.returns
+        final_balance = np.empty(paths)
+        max_drawdown = np.empty(paths)
+        ruined = np.empty(paths, dtype=bool)
+        chunk_size = max(1, max_cells // n)
+        
+        for start in range(0, paths, chunk_size):
+            size = min(chunk_size, paths - start)
+            if method == 'bootstrap':
+                idx = rng.integers(0, n, size=(size, n))
+            else:
+                idx = rng.permuted(np.broadcast_to(np.arange(n), (size, n)), axis=1)
+                
+            # Work in place so at most two (size x n) arrays are alive at once
+            equity = growth[idx]
+            del idx
+            np.cumprod(equity, axis=1, out=equity)
+            chunk = slice(start, start + size)
+            final_balance[chunk] = equity[:, -1] * self.initial_balance
+            ruined[chunk] = equity.min(axis=1) <= 1 - ruin_drawdown
+            # Peaks include the starting balance (1.0 in units of it)
+            ratio = np.maximum.accumulate(equity, axis=1)
+            np.maximum(ratio, 1.0, out=ratio)
+            np.divide(equity, ratio, out=ratio)
+            max_drawdown[chunk] = 1 - ratio.min(axis=1)
+            del equity, ratio
+            
+        summary = pd.DataFrame({
+            'final_balance': final_balance,
+            'return_percentage': (final_balance / self.initial_balance - 1) * 100,
+            'max_drawdown': max_drawdown
+        }).quantile([0.05, 0.25, 0.5, 0.75, 0.95])
+        summary.index.name = 'percentile'
+        
+        return {
+            'paths': paths,
+            'final_balance': final_balance,
+            'max_drawdown': max_drawdown,
+            'risk_of_ruin': ruined.mean(),
+            'summary': summary
+        }
+
+
+def trade_returns(trades, initial_balance):
+    """
+    Convert trades to net returns on the balance each one was taken with.
+    
+    Args:
+        trades (TradeLog or list): Trade records with 'profit' and 'commission'
+        initial_balance (float): Account balance before the first trade
+        
+    Returns:
+        numpy.ndarray: One return per trade
+    """
+    net = column(trades, 'profit') - column(trades, 'commission')
+    if len(net) == 0:
+        return net
+    balance_before = initial_balance + np.concatenate([[0.0], np.cumsum(net)[:-1]])
+    return net / balance_before
@@ -0,0 +1,353 @@
+"""Parallel parameter search over the Backtester."""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.backtester import Backtester, _write_checkpoint
+from utils.records import EquityCurve, TradeLog
+from utils.strategy import TradingStrategy
+
+# Grid keys accepted by grid_search, all TradingStrategy constructor arguments
+STRATEGY_PARAMS = ('risk_percentage', 'sr_window', 'breakout_threshold', 'reward_multiple', 'max_signal_age')
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+# Match the Backtester's default 2% sizing when risk_percentage is not searched
+DEFAULT_PARAMS = {'risk_percentage': 2.0}
+
+# Per-process state set up once by _init_worker
+_worker = {}
+
+
+class ParameterOptimizer:
+    """
+    Grid search over strategy parameters, backtesting each combination in parallel.
+    
+    The OHLCV data is copied once into shared memory that every worker process
+    maps at start-up, so tasks only carry their parameter dict. Workers cache
+    indicator frames per S/R window, since only that parameter changes them.
+    """
+    
+    def __init__(self, df, liquidity_levels=None, starting_balance=10000, commission_rate=0.001):
+        """
+        Initialize the optimizer with the data every backtest runs on.
+        
+        Args:
+            df (pandas.DataFrame): DataFrame with OHLCV data
+            liquidity_levels (list, optional): List of liquidity levels
+            starting_balance (float): Initial account balance
+            commission_rate (float): Trading commission rate
+        """
+        self.df = df
+        self.liquidity_levels = liquidity_levels or []
+        self.starting_balance = starting_balance
+        self.commission_rate = commission_rate
+    
+    def grid_search(self, param_grid, rank_by='return_percentage', ascending=False, max_workers=None,
+                    checkpoint_file=None):
+        """
+        Backtest every combination in the parameter grid.
+        
+        Args:
+            param_grid (dict): Parameter name -> list of values, using the names in
+                STRATEGY_PARAMS (e.g. {'sr_window': [5, 10], 'reward_multiple': [1.5, 2]})
+            rank_by (str): Result column to rank by
+            ascending (bool): Rank smaller values first (e.g. for 'max_drawdown')
+            max_workers (int, optional): Worker processes (default: CPU count);
+                0 runs every backtest in the calling process
+            checkpoint_file (str, optional): File recording every finished backtest, so
+                a restarted search over the same data only runs the remaining ones;
+                removed once the search completes
+                
+        Returns:
+            pandas.DataFrame: One row per combination with its parameters, performance
+                metrics and final balance, ranked with a 1-based 'rank' column
+        """
+        tasks = [(params, 0, 50, None, False) for params in _combinations(param_grid)]
+        rows = self._run_checkpointed(_backtest_window, tasks, max_workers, checkpoint_file)
+        return rank_results(pd.DataFrame(rows), rank_by, ascending)
+    
+    def walk_forward(self, param_grid, in_sample, out_of_sample, rank_by='return_percentage',
+                     ascending=False, max_workers=None, warmup=50, checkpoint_file=None):
+        """
+        Walk-forward optimization over rolling in-sample/out-of-sample folds.
+        
+        Each fold grid-searches ``in_sample`` bars and trades the best parameters on
+        the ``out_of_sample`` bars that follow; folds roll forward by ``out_of_sample``
+        bars, so the out-of-sample periods tile the history. Workers compute indicators
+        once per S/R window over the whole history and slice them per fold (signals
+        only use pivots confirmed by the bar being traded, so this has no look-ahead),
+        so each extra fold only adds backtests over its own bars. The in-sample
+        searches of all folds run as one parallel batch, then the out-of-sample runs.
+        
+        Args:
+            param_grid (dict): Parameter name -> list of values, as for grid_search
+            in_sample (int): Bars each fold optimizes on
+            out_of_sample (int): Bars each fold trades the chosen parameters on
+            rank_by (str): Result column that picks the in-sample winner
+            ascending (bool): Prefer smaller values of rank_by
+            max_workers (int, optional): Worker processes (default: CPU count);
+                0 runs every backtest in the calling process
+            warmup (int): Bars of history fed to the indicators before each window
+            checkpoint_file (str, optional): As for grid_search, covering both batches
+            
+        Returns:
+            dict: Stitched out-of-sample results in the shape run_backtest returns
+                (balances, 'trades', 'metrics', 'equity_curve'), plus 'folds', a
+                DataFrame with each fold's windows, chosen parameters and scores
+        """
+        n = len(self.df)
+        folds = [(start, start + in_sample, min(start + in_sample + out_of_sample, n))
+                 for start in range(warmup, n - in_sample, out_of_sample)]
+        if not folds:
+            return {'error': 'Not enough data for one walk-forward fold'}
+            
+        combinations = _combinations(param_grid)
+        tasks = [(params, start - warmup, start, end, False)
+                 for start, end, _ in folds for params in combinations]
+        in_sample_rows = self._run_checkpointed(_backtest_window, tasks, max_workers, checkpoint_file, done=False)
+        
+        best_params, best_scores = [], []
+        for k in range(len(folds)):
+            fold_results = pd.DataFrame(in_sample_rows[k * len(combinations):(k + 1) * len(combinations)])
+            fold_results['combination'] = np.arange(len(combinations))
+            winner = rank_results(fold_results, rank_by, ascending).iloc[0]
+            best_params.append(combinations[int(winner['combination'])])
+            best_scores.append(winner[rank_by])
+        tasks = [(params, start - warmup, start, end, True)
+                 for params, (_, start, end) in zip(best_params, folds)]
+        out_of_sample_results = self._run_checkpointed(_backtest_window, tasks, max_workers, checkpoint_file)
+        
+        # Sizing is proportional to the balance, so a fold run from the starting balance
+        # scales to the balance the previous fold left
+        balance = self.starting_balance
+        scales, fold_rows = [], []
+        dates = self.df['timestamp'] if 'timestamp' in self.df.columns else self.df.index
+        for k, ((params, _, start, end, _), result) in enumerate(zip(tasks, out_of_sample_results)):
+            scale = balance / self.starting_balance
+            scales.append(scale)
+            fold_rows.append({
+                'fold': k + 1,
+                'in_sample_start': dates[folds[k][0]],
+                'out_of_sample_start': dates[start],
+                'out_of_sample_end': dates[end - 1],
+                **params,
+                f'in_sample_{rank_by}': best_scores[k],
+                'out_of_sample_return': result['profit_loss_percent'],
+                'out_of_sample_trades': len(result['trades'])
+            })
+            balance = result['final_balance'] * scale
+            
+        trades = TradeLog.concat(result['trades'] for result in out_of_sample_results)
+        trade_scales = np.repeat(scales, [len(result['trades']) for result in out_of_sample_results])
+        for key in ('size', 'profit', 'commission'):
+            trades.records[key] *= trade_scales
+        curves = [result['equity_curve'] for result in out_of_sample_results]
+        equity_curve = EquityCurve(curves[0].dates.append([curve.dates for curve in curves[1:]]),
+                                   np.concatenate([curve.values * scale for curve, scale in zip(curves, scales)]))
+                                   
+        backtester = Backtester(self.starting_balance, self.commission_rate)
+        return {
+            'initial_balance': self.starting_balance,
+            'final_balance': balance,
+            'profit_loss': balance - self.starting_balance,
+            'profit_loss_percent': ((balance - self.starting_balance) / self.starting_balance) * 100,
+            'trades': trades,
+            'metrics': backtester.calculate_performance_metrics(trades, self.starting_balance, balance, equity_curve),
+            'equity_curve': equity_curve,
+            'folds': pd.DataFrame(fold_rows)
+        }
+    
+    def _run(self, func, tasks, max_workers=None, on_result=None):
+        """
+        Map ``func`` over tasks in worker processes that share this optimizer's data.
+        
+        ``on_result(task, result)`` is called as each result arrives, in task order.
+        """
+        max_workers = os.cpu_count() if max_workers is None else max_workers
+        shm, spec = _share_ohlcv(self.df)
+        initargs = (spec, self.liquidity_levels, self.starting_balance, self.commission_rate)
+        results = []
+        try:
+            if max_workers == 0:
+                _init_worker(*initargs)
+                try:
+                    for task in tasks:
+                        results.append(func(task))
+                        if on_result is not None:
+                            on_result(task, results[-1])
+                finally:
+                    _release_worker()
+                return results
+                
+            with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=initargs) as executor:
+                for task, result in zip(tasks, executor.map(func, tasks)):
+                    results.append(result)
+                    if on_result is not None:
+                        on_result(task, result)
+            return results
+        finally:
+            shm.close()
+            shm.unlink()
+    
+    def _run_checkpointed(self, func, tasks, max_workers=None, checkpoint_file=None, done=True):
+        """
+        Like _run, but record each result in ``checkpoint_file`` and skip the tasks an
+        earlier, interrupted call already finished.
+        
+        Args:
+            done (bool): Remove the checkpoint afterwards (False while later batches
+                of the same search still need it)
+        """
+        if checkpoint_file is None:
+            return self._run(func, tasks, max_workers)
+            
+        data_key = joblib.hash((self.df[OHLCV_COLUMNS].to_numpy(), self.liquidity_levels,
+                                self.starting_balance, self.commission_rate))
+        finished = {}
+        if os.path.exists(checkpoint_file):
+            checkpoint = joblib.load(checkpoint_file)
+            if checkpoint['data'] != data_key:
+                raise ValueError("Checkpoint does not match this optimizer's data or settings")
+            finished = checkpoint['results']
+        
+        def record(task, result):
+            finished[joblib.hash(task)] = result
+            _write_checkpoint(checkpoint_file, {'data': data_key, 'results': finished})
+            
+        pending = [task for task in tasks if joblib.hash(task) not in finished]
+        self._run(func, pending, max_workers, record)
+        results = [finished[joblib.hash(task)] for task in tasks]
+        if done and os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+        return results
+
+
+def rank_results(results, rank_by='return_percentage', ascending=False):
+    """
+    Sort backtest results by one metric and add a 1-based 'rank' column.
+    
+    Args:
+        results (pandas.DataFrame): One row per backtest
+        rank_by (str): Column to rank by
+        ascending (bool): Rank smaller values first
+        
+    Returns:
+        pandas.DataFrame: Ranked results
+    """
+    if results.empty:
+        return results
+    ranked = results.sort_values(rank_by, ascending=ascending, na_position='last', kind='stable')
+    ranked = ranked.reset_index(drop=True)
+    ranked.insert(0, 'rank', np.arange(1, len(ranked) + 1))
+    return ranked
+
+
+def _combinations(param_grid):
+    """
+    Expand a parameter grid into a list of parameter dicts.
+    """
+    unknown = set(param_grid) - set(STRATEGY_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+        
+    names = list(param_grid)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+    # Group combinations sharing an S/R window so workers reuse cached indicators
+    combinations.sort(key=lambda params: params.get('sr_window', 10))
+    return combinations
+
+
+def _share_ohlcv(df):
+    """
+    Copy OHLCV data into a shared memory block.
+    
+    Returns:
+        tuple: (SharedMemory, spec dict that _attach_ohlcv rebuilds the frame from)
+    """
+    n = len(df)
+    timestamps = df['timestamp'] if 'timestamp' in df.columns else df.index
+    shm = shared_memory.SharedMemory(create=True, size=max(n * 8 * (1 + len(OHLCV_COLUMNS)), 1))
+    np.ndarray(n, dtype=np.int64, buffer=shm.buf)[:] = pd.DatetimeIndex(timestamps).asi8
+    np.ndarray((len(OHLCV_COLUMNS), n), dtype=np.float64, buffer=shm.buf, offset=n * 8)[:] = \
+        df[OHLCV_COLUMNS].to_numpy(dtype=np.float64).T
+    return shm, {'name': shm.name, 'rows': n}
+
+
+def _attach_ohlcv(spec):
+    """
+    Map a shared OHLCV block and rebuild the DataFrame from it.
+    
+    Returns:
+        tuple: (SharedMemory, pandas.DataFrame)
+    """
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    n = spec['rows']
+    timestamps = np.ndarray(n, dtype=np.int64, buffer=shm.buf)
+    values = np.ndarray((len(OHLCV_COLUMNS), n), dtype=np.float64, buffer=shm.buf, offset=n * 8)
+    df = pd.DataFrame({'timestamp': pd.to_datetime(timestamps)})
+    for column, column_values in zip(OHLCV_COLUMNS, values):
+        df[column] = column_values
+    return shm, df
+
+
+def _init_worker(spec, liquidity_levels, starting_balance, commission_rate):
+    """
+    Attach a worker process to the shared data.
+    """
+    shm, df = _attach_ohlcv(spec)
+    _worker.update({
+        'shm': shm,
+        'df': df,
+        'liquidity_levels': liquidity_levels,
+        'starting_balance': starting_balance,
+        'commission_rate': commission_rate,
+        'indicators': {}
+    })
+
+
+def _release_worker():
+    """
+    Drop the worker state and detach from the shared block.
+    """
+    shm = _worker.pop('shm', None)
+    _worker.clear()
+    if shm is not None:
+        shm.close()
+
+
+def _analysis_frame(strategy):
+    """
+    Get the worker's indicator frame for the strategy's S/R window, computing it once.
+    """
+    cache = _worker['indicators']
+    if strategy.sr_window not in cache:
+        cache[strategy.sr_window] = strategy.calculate_indicators(_worker['df'])
+    return cache[strategy.sr_window]
+
+
+def _backtest_window(task):
+    """
+    Backtest one parameter combination over a window of bars in a worker.
+    
+    Args:
+        task (tuple): (params, first bar fed to the indicators, first traded bar,
+            end bar (exclusive, None for the last), return the full result)
+            
+    Returns:
+        dict: The full run_backtest result, or the parameters, the performance
+            metrics and the final balance
+    """
+    params, context_start, start, end, full_result = task
+    strategy = TradingStrategy(**{**DEFAULT_PARAMS, **params})
+    backtester = Backtester(_worker['starting_balance'], _worker['commission_rate'], strategy)
+    window = slice(context_start, end)
+    result = backtester.run_backtest(_worker['df'].iloc[window], _worker['liquidity_levels'],
+                                     analysis_df=_analysis_frame(strategy).iloc[window],
+                                     warmup=start - context_start)
+    if full_result:
+        return result
+    return {**params, **result['metrics'], 'final_balance': result['final_balance']}
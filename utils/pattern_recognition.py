@@ -8,188 +8,96 @@ class PatternRecognition:
     """
     
     @staticmethod
-    def identify_candlestick_patterns(df):
+    def identify_candlestick_patterns(df, as_frame=False):
         """
         Identify candlestick patterns in OHLCV data.
         
+        Every pattern is evaluated as a boolean mask over the whole series, so
+        the cost is a handful of array operations regardless of history length.
+        
         Args:
             df (pandas.DataFrame): DataFrame with OHLCV data
+            as_frame (bool): Return a DataFrame with one row per pattern instead
+                of a list of dicts
             
         Returns:
-            list: Identified candlestick patterns
+            list: Identified candlestick patterns, ordered by candle
         """
+        columns = ['type', 'candle_idx', 'timestamp', 'price', 'strength']
         if df.empty:
-            return []
+            return pd.DataFrame(columns=columns) if as_frame else []
         
-        patterns = []
-        
-        # Make a copy of the dataframe to avoid modifying the original
-        ohlc = df.copy()
+        open_ = df['open'].to_numpy(dtype=float)
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        close = df['close'].to_numpy(dtype=float)
         
         # Calculate average body size
-        ohlc['body_size'] = abs(ohlc['close'] - ohlc['open'])
-        avg_body = ohlc['body_size'].mean()
-        avg_range = (ohlc['high'] - ohlc['low']).mean()
+        body_size = np.abs(close - open_)
+        avg_body = body_size.mean()
+        avg_range = (high - low).mean()
         
-        # Loop through the data to find patterns (starting from the 3rd candle)
-        for i in range(3, len(ohlc)):
-            idx = ohlc.index[i]
-            
-            # Get current and previous candles
-            curr = ohlc.iloc[i]
-            prev1 = ohlc.iloc[i-1]
-            prev2 = ohlc.iloc[i-2]
-            prev3 = ohlc.iloc[i-3]
-            
-            timestamp = curr['timestamp'] if 'timestamp' in curr.index else idx
-            
-            # Doji Pattern (small body)
-            if curr['body_size'] < 0.1 * avg_range:
-                patterns.append({
-                    'type': 'doji',
-                    'candle_idx': i,
-                    'timestamp': timestamp,
-                    'price': curr['close'],
-                    'strength': 1
-                })
-            
-            # Hammer Pattern (bullish)
-            if (curr['close'] > curr['open'] and  # Bullish candle
-                curr['body_size'] > 0.1 * avg_range and  # Significant body
-                (curr['low'] < curr['open'] - 2 * curr['body_size']) and  # Long lower wick
-                (curr['high'] - max(curr['close'], curr['open']) < 0.3 * curr['body_size']):  # Short/no upper wick
-                patterns.append({
-                    'type': 'hammer_bullish',
-                    'candle_idx': i,
-                    'timestamp': timestamp,
-                    'price': curr['close'],
-                    'strength': 2
-                })
-            
-            # Inverted Hammer Pattern (bullish)
-            if (curr['close'] > curr['open'] and  # Bullish candle
-                curr['body_size'] > 0.1 * avg_range and  # Significant body
-                (curr['high'] > curr['close'] + 2 * curr['body_size']) and  # Long upper wick
-                (min(curr['close'], curr['open']) - curr['low'] < 0.3 * curr['body_size']):  # Short/no lower wick
-                patterns.append({
-                    'type': 'inverted_hammer_bullish',
-                    'candle_idx': i,
-                    'timestamp': timestamp,
-                    'price': curr['close'],
-                    'strength': 2
-                })
-            
-            # Shooting Star Pattern (bearish)
-            if (curr['close'] < curr['open'] and  # Bearish candle
-                curr['body_size'] > 0.1 * avg_range and  # Significant body
-                (curr['high'] > curr['open'] + 2 * curr['body_size']) and  # Long upper wick
-                (min(curr['close'], curr['open']) - curr['low'] < 0.3 * curr['body_size']):  # Short/no lower wick
-                patterns.append({
-                    'type': 'shooting_star',
-                    'candle_idx': i,
-                    'timestamp': timestamp,
-                    'price': curr['close'],
-                    'strength': 3
-                })
-            
-            # Hanging Man Pattern (bearish)
-            if (curr['close'] < curr['open'] and  # Bearish candle
-                curr['body_size'] > 0.1 * avg_range and  # Significant body
-                (curr['low'] < curr['close'] - 2 * curr['body_size']) and  # Long lower wick
-                (curr['high'] - max(curr['close'], curr['open']) < 0.3 * curr['body_size']):  # Short/no upper wick
-                patterns.append({
-                    'type': 'hanging_man',
-                    'candle_idx': i,
-                    'timestamp': timestamp,
-                    'price': curr['close'],
-                    'strength': 3
-                })
-            
-            # Engulfing Bullish
-            if (prev1['close'] < prev1['open'] and  # Previous is bearish
-                curr['close'] > curr['open'] and  # Current is bullish
-                curr['open'] < prev1['close'] and  # Open below previous close
-                curr['close'] > prev1['open']):  # Close above previous open
-                patterns.append({
-                    'type': 'engulfing_bullish',
-                    'candle_idx': i,
-                    'timestamp': timestamp,
-                    'price': curr['close'],
-                    'strength': 4
-                })
-            
-            # Engulfing Bearish
-            if (prev1['close'] > prev1['open'] and  # Previous is bullish
-                curr['close'] < curr['open'] and  # Current is bearish
-                curr['open'] > prev1['close'] and  # Open above previous close
-                curr['close'] < prev1['open']):  # Close below previous open
-                patterns.append({
-                    'type': 'engulfing_bearish',
-                    'candle_idx': i,
-                    'timestamp': timestamp,
-                    'price': curr['close'],
-                    'strength': 4
-                })
-            
-            # Morning Star (bullish)
-            if (prev2['close'] < prev2['open'] and  # First candle is bearish
-                abs(prev1['close'] - prev1['open']) < 0.3 * avg_body and  # Second candle is small (doji-like)
-                curr['close'] > curr['open'] and  # Third candle is bullish
-                curr['close'] > (prev2['open'] + prev2['close']) / 2):  # Close above midpoint of first candle
-                patterns.append({
-                    'type': 'morning_star',
-                    'candle_idx': i,
-                    'timestamp': timestamp,
-                    'price': curr['close'],
-                    'strength': 5
-                })
-            
-            # Evening Star (bearish)
-            if (prev2['close'] > prev2['open'] and  # First candle is bullish
-                abs(prev1['close'] - prev1['open']) < 0.3 * avg_body and  # Second candle is small (doji-like)
-                curr['close'] < curr['open'] and  # Third candle is bearish
-                curr['close'] < (prev2['open'] + prev2['close']) / 2):  # Close below midpoint of first candle
-                patterns.append({
-                    'type': 'evening_star',
-                    'candle_idx': i,
-                    'timestamp': timestamp,
-                    'price': curr['close'],
-                    'strength': 5
-                })
-            
-            # Three White Soldiers (bullish)
-            if (prev2['close'] > prev2['open'] and  # First candle is bullish
-                prev1['close'] > prev1['open'] and  # Second candle is bullish
-                curr['close'] > curr['open'] and  # Third candle is bullish
-                prev1['close'] > prev2['close'] and  # Each close is higher than previous
-                curr['close'] > prev1['close'] and
-                prev1['open'] > prev2['open'] and  # Each open is higher than previous
-                curr['open'] > prev1['open']):
-                patterns.append({
-                    'type': 'three_white_soldiers',
-                    'candle_idx': i,
-                    'timestamp': timestamp,
-                    'price': curr['close'],
-                    'strength': 5
-                })
-            
-            # Three Black Crows (bearish)
-            if (prev2['close'] < prev2['open'] and  # First candle is bearish
-                prev1['close'] < prev1['open'] and  # Second candle is bearish
-                curr['close'] < curr['open'] and  # Third candle is bearish
-                prev1['close'] < prev2['close'] and  # Each close is lower than previous
-                curr['close'] < prev1['close'] and
-                prev1['open'] < prev2['open'] and  # Each open is lower than previous
-                curr['open'] < prev1['open']):
-                patterns.append({
-                    'type': 'three_black_crows',
-                    'candle_idx': i,
-                    'timestamp': timestamp,
-                    'price': curr['close'],
-                    'strength': 5
-                })
+        # Previous candles as shifted arrays (prev1 = one candle back, prev2 = two back)
+        prev1_open, prev1_close = _shift(open_, 1), _shift(close, 1)
+        prev2_open, prev2_close = _shift(open_, 2), _shift(close, 2)
         
-        return patterns
+        bullish = close > open_
+        bearish = close < open_
+        significant = body_size > 0.1 * avg_range
+        upper_wick = high - np.maximum(close, open_)
+        lower_wick = np.minimum(close, open_) - low
+        
+        # (type, strength, mask) in the order patterns are reported for a candle
+        pattern_masks = [
+            ('doji', 1, body_size < 0.1 * avg_range),
+            ('hammer_bullish', 2,
+             bullish & significant & (low < open_ - 2 * body_size) & (upper_wick < 0.3 * body_size)),
+            ('inverted_hammer_bullish', 2,
+             bullish & significant & (high > close + 2 * body_size) & (lower_wick < 0.3 * body_size)),
+            ('shooting_star', 3,
+             bearish & significant & (high > open_ + 2 * body_size) & (lower_wick < 0.3 * body_size)),
+            ('hanging_man', 3,
+             bearish & significant & (low < close - 2 * body_size) & (upper_wick < 0.3 * body_size)),
+            ('engulfing_bullish', 4,
+             (prev1_close < prev1_open) & bullish & (open_ < prev1_close) & (close > prev1_open)),
+            ('engulfing_bearish', 4,
+             (prev1_close > prev1_open) & bearish & (open_ > prev1_close) & (close < prev1_open)),
+            ('morning_star', 5,
+             (prev2_close < prev2_open) & (np.abs(prev1_close - prev1_open) < 0.3 * avg_body) &
+             bullish & (close > (prev2_open + prev2_close) / 2)),
+            ('evening_star', 5,
+             (prev2_close > prev2_open) & (np.abs(prev1_close - prev1_open) < 0.3 * avg_body) &
+             bearish & (close < (prev2_open + prev2_close) / 2)),
+            ('three_white_soldiers', 5,
+             (prev2_close > prev2_open) & (prev1_close > prev1_open) & bullish &
+             (prev1_close > prev2_close) & (close > prev1_close) &
+             (prev1_open > prev2_open) & (open_ > prev1_open)),
+            ('three_black_crows', 5,
+             (prev2_close < prev2_open) & (prev1_close < prev1_open) & bearish &
+             (prev1_close < prev2_close) & (close < prev1_close) &
+             (prev1_open < prev2_open) & (open_ < prev1_open)),
+        ]
+        
+        # Candles x patterns matrix; patterns start from the 4th candle
+        hits = np.column_stack([mask for _, _, mask in pattern_masks])
+        hits[:3] = False
+        candle_idx, pattern_id = np.nonzero(hits)
+        
+        types = np.array([name for name, _, _ in pattern_masks], dtype=object)
+        strengths = np.array([strength for _, strength, _ in pattern_masks])
+        timestamps = df['timestamp'].to_numpy() if 'timestamp' in df.columns else df.index.to_numpy()
+        
+        result = pd.DataFrame({
+            'type': types[pattern_id],
+            'candle_idx': candle_idx,
+            'timestamp': timestamps[candle_idx],
+            'price': close[candle_idx],
+            'strength': strengths[pattern_id]
+        }, columns=columns)
+        
+        if as_frame:
+            return result
+        return result.to_dict('records')
     
     @staticmethod
     def identify_break_retest_patterns(df):
@@ -205,116 +113,78 @@ class PatternRecognition:
         if df.empty:
             return []
         
-        # Make a copy and ensure we have all required columns
-        ohlc = df.copy()
+        return PatternRecognition.identify_break_retest_patterns_batch({'df': df})['df']
+    
+    @staticmethod
+    def identify_break_retest_patterns_batch(frames):
+        """
+        Identify break and retest patterns for many symbols in a single pass.
+        
+        Pivot levels from every DataFrame are stacked into one array and searched
+        together: for each level, the first close beyond it by 0.5% within candles
+        3-19 after the pivot is the breakout, and the first candle within the next
+        14 that touches the level and closes on the breakout side is the retest.
         
-        if 'support' not in ohlc.columns or 'resistance' not in ohlc.columns:
-            # Calculate pivot points for support/resistance
-            ohlc['pivot_high'] = np.nan
-            ohlc['pivot_low'] = np.nan
+        Args:
+            frames (dict): Mapping of symbol to DataFrame with OHLCV and
+                potentially indicator data
             
-            # Simple pivot point calculation (for demonstration - a more sophisticated algorithm would be better)
-            window = 5
-            for i in range(window, len(ohlc) - window):
-                # Check if current candle's high is highest in the window
-                if ohlc['high'].iloc[i] == ohlc['high'].iloc[i-window:i+window+1].max():
-                    ohlc.loc[ohlc.index[i], 'pivot_high'] = ohlc['high'].iloc[i]
-                
-                # Check if current candle's low is lowest in the window
-                if ohlc['low'].iloc[i] == ohlc['low'].iloc[i-window:i+window+1].min():
-                    ohlc.loc[ohlc.index[i], 'pivot_low'] = ohlc['low'].iloc[i]
+        Returns:
+            dict: Mapping of symbol to its list of break and retest patterns
+        """
+        symbols = [symbol for symbol, df in frames.items() if not df.empty]
+        results = {symbol: [] for symbol in frames}
+        if not symbols:
+            return results
         
-        # Initialize lists for supports, resistances and patterns
-        supports = []
-        resistances = []
-        patterns = []
+        # Concatenate all symbols; each pivot's search stops at its own symbol's end
+        close = np.concatenate([frames[s]['close'].to_numpy(dtype=float) for s in symbols])
+        high = np.concatenate([frames[s]['high'].to_numpy(dtype=float) for s in symbols])
+        low = np.concatenate([frames[s]['low'].to_numpy(dtype=float) for s in symbols])
+        lengths = np.array([len(frames[s]) for s in symbols])
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
         
-        # If we have support/resistance columns, use them
-        if 'support' in ohlc.columns:
-            supports = ohlc[~ohlc['support'].isna()][['timestamp' if 'timestamp' in ohlc.columns else ohlc.index.name, 'support']].values.tolist()
-        elif 'pivot_low' in ohlc.columns:
-            supports = ohlc[~ohlc['pivot_low'].isna()][['timestamp' if 'timestamp' in ohlc.columns else ohlc.index.name, 'pivot_low']].values.tolist()
-        
-        if 'resistance' in ohlc.columns:
-            resistances = ohlc[~ohlc['resistance'].isna()][['timestamp' if 'timestamp' in ohlc.columns else ohlc.index.name, 'resistance']].values.tolist()
-        elif 'pivot_high' in ohlc.columns:
-            resistances = ohlc[~ohlc['pivot_high'].isna()][['timestamp' if 'timestamp' in ohlc.columns else ohlc.index.name, 'pivot_high']].values.tolist()
-        
-        # Build dictionary of index positions for timestamps
-        timestamp_to_idx = {}
-        for i, idx in enumerate(ohlc.index):
-            if 'timestamp' in ohlc.columns:
-                timestamp_to_idx[ohlc['timestamp'].iloc[i]] = i
-            else:
-                timestamp_to_idx[idx] = i
+        scans = {}
+        for kind in ('resistance', 'support'):
+            owner, level_idx, level = [], [], []
+            for n, symbol in enumerate(symbols):
+                positions, values = _pivot_levels(frames[symbol], kind)
+                owner.append(np.full(len(positions), n))
+                level_idx.append(positions + starts[n])
+                level.append(values)
+            owner = np.concatenate(owner)
+            level_idx = np.concatenate(level_idx)
+            level = np.concatenate(level)
+            end = starts[owner] + lengths[owner]
+            found, breakout, retest = _scan_break_retest(
+                close, high, low, level_idx, level, end, bullish=(kind == 'resistance'))
+            scans[kind] = (owner[found], level[found], breakout[found], retest[found])
         
-        # Find break and retest of resistance
-        for resistance in resistances:
-            timestamp, level = resistance
-            
-            # Skip if timestamp is not in our dictionary (shouldn't happen but just to be safe)
-            if timestamp not in timestamp_to_idx:
-                continue
+        for n, symbol in enumerate(symbols):
+            ohlc = frames[symbol]
+            timestamps = ohlc['timestamp'].array if isinstance(ohlc.index, pd.RangeIndex) else ohlc.index
                 
-            level_idx = timestamp_to_idx[timestamp]
-            
-            # Look for a break of the resistance (at least 3 candles after pivot)
-            for i in range(level_idx + 3, min(level_idx + 20, len(ohlc))):
-                if ohlc['close'].iloc[i] > level * 1.005:  # 0.5% breakout
-                    breakout_idx = i
-                    
-                    # Look for retest of the broken resistance
-                    for j in range(breakout_idx + 1, min(breakout_idx + 15, len(ohlc))):
-                        if ohlc['low'].iloc[j] <= level <= ohlc['high'].iloc[j]:
-                            if ohlc['close'].iloc[j] > level:  # Bullish retest
-                                retest_timestamp = ohlc.index[j] if not isinstance(ohlc.index, pd.RangeIndex) else ohlc['timestamp'].iloc[j]
-                                patterns.append({
-                                    'type': 'resistance_break_retest',
-                                    'subtype': 'bullish',
-                                    'level': level,
-                                    'breakout_idx': breakout_idx,
-                                    'retest_idx': j,
-                                    'timestamp': retest_timestamp,
-                                    'price': ohlc['close'].iloc[j],
-                                    'strength': 4
-                                })
-                                break
-                    break
-        
-        # Find break and retest of support
-        for support in supports:
-            timestamp, level = support
-            
-            # Skip if timestamp is not in our dictionary
-            if timestamp not in timestamp_to_idx:
-                continue
-                
-            level_idx = timestamp_to_idx[timestamp]
-            
-            # Look for a break of the support (at least 3 candles after pivot)
-            for i in range(level_idx + 3, min(level_idx + 20, len(ohlc))):
-                if ohlc['close'].iloc[i] < level * 0.995:  # 0.5% breakdown
-                    breakdown_idx = i
-                    
-                    # Look for retest of the broken support
-                    for j in range(breakdown_idx + 1, min(breakdown_idx + 15, len(ohlc))):
-                        if ohlc['low'].iloc[j] <= level <= ohlc['high'].iloc[j]:
-                            if ohlc['close'].iloc[j] < level:  # Bearish retest
-                                retest_timestamp = ohlc.index[j] if not isinstance(ohlc.index, pd.RangeIndex) else ohlc['timestamp'].iloc[j]
-                                patterns.append({
-                                    'type': 'support_break_retest',
-                                    'subtype': 'bearish',
-                                    'level': level,
-                                    'breakdown_idx': breakdown_idx,
-                                    'retest_idx': j,
-                                    'timestamp': retest_timestamp,
-                                    'price': ohlc['close'].iloc[j],
-                                    'strength': 4
-                                })
-                                break
-                    break
+            # Resistance patterns come first, then support, each in pivot order
+            patterns = []
+            for kind, subtype, break_key in (('resistance', 'bullish', 'breakout_idx'),
+                                             ('support', 'bearish', 'breakdown_idx')):
+                owner, level, breakout, retest = scans[kind]
+                mine = owner == n
+                for lvl, brk, ret in zip(level[mine].tolist(), (breakout[mine] - starts[n]).tolist(),
+                                         (retest[mine] - starts[n]).tolist()):
+                    patterns.append({
+                        'type': f'{kind}_break_retest',
+                        'subtype': subtype,
+                        'level': lvl,
+                        break_key: brk,
+                        'retest_idx': ret,
+                        'timestamp': timestamps[ret],
+                        'price': close[starts[n] + ret].item(),
+                        'strength': 4
+                    })
+            results[symbol] = patterns
         
-        return patterns
+        return results
     
     @staticmethod
     def identify_liquidity_sweeps(df, high_volume_levels):
@@ -331,49 +201,73 @@ class PatternRecognition:
         if df.empty or not high_volume_levels:
             return []
         
-        ohlc = df.copy()
+        close = df['close'].to_numpy(dtype=float)
+        candle_idx, level_idx, bullish = PatternRecognition.match_liquidity_sweeps(
+            df['low'].to_numpy(dtype=float),
+            df['high'].to_numpy(dtype=float),
+            close,
+            [level['price'] for level in high_volume_levels],
+            start=3
+        )
+        timestamps = df['timestamp'].array if 'timestamp' in df.columns else df.index
+        
         patterns = []
+        for i, k, is_bullish in zip(candle_idx.tolist(), level_idx.tolist(), bullish.tolist()):
+            level = high_volume_levels[k]
+            patterns.append({
+                'type': 'liquidity_sweep',
+                'subtype': 'bullish' if is_bullish else 'bearish',
+                'level': level['price'],
+                'candle_idx': i,
+                'timestamp': timestamps[i],
+                'price': close[i].item(),
+                'strength': 3 + level.get('strength', 0) / 2  # Base strength + bonus from level strength
+            })
         
-        # Loop through the candles
-        for i in range(3, len(ohlc)):
-            candle = ohlc.iloc[i]
-            prev_candle = ohlc.iloc[i-1]
-            
-            timestamp = candle['timestamp'] if 'timestamp' in candle.index else ohlc.index[i]
+        return patterns
+    
+    @staticmethod
+    def match_liquidity_sweeps(low, high, close, level_prices, start=1, max_cells=4_000_000):
+        """
+        Match every candle against every liquidity level with broadcast masks.
+        
+        A bullish sweep wicks below a level the previous low was above and closes
+        back above it; a bearish sweep is the mirror image. The candles x levels
+        comparison runs in one pass when it fits in ``max_cells`` and in candle
+        chunks of that size otherwise, so memory stays bounded for long histories
+        and many levels.
+        
+        Args:
+            low (numpy.ndarray): Candle lows
+            high (numpy.ndarray): Candle highs
+            close (numpy.ndarray): Candle closes
+            level_prices (list): Liquidity level prices
+            start (int): First candle position to check
+            max_cells (int): Maximum number of candle/level pairs compared at once
             
-            # Check each liquidity level
-            for level in high_volume_levels:
-                level_price = level['price']
-                
-                # Bullish sweep: price dips below support (liquidity grab) and closes back above
-                if (prev_candle['low'] > level_price and  # Previous candle was above the level
-                    candle['low'] < level_price and  # Current candle wicked below the level
-                    candle['close'] > level_price):  # But closed back above
-                    patterns.append({
-                        'type': 'liquidity_sweep',
-                        'subtype': 'bullish',
-                        'level': level_price,
-                        'candle_idx': i,
-                        'timestamp': timestamp,
-                        'price': candle['close'],
-                        'strength': 3 + level.get('strength', 0) / 2  # Base strength + bonus from level strength
-                    })
-                
-                # Bearish sweep: price spikes above resistance (liquidity grab) and closes back below
-                elif (prev_candle['high'] < level_price and  # Previous candle was below the level
-                      candle['high'] > level_price and  # Current candle wicked above the level
-                      candle['close'] < level_price):  # But closed back below
-                    patterns.append({
-                        'type': 'liquidity_sweep',
-                        'subtype': 'bearish',
-                        'level': level_price,
-                        'candle_idx': i,
-                        'timestamp': timestamp,
-                        'price': candle['close'],
-                        'strength': 3 + level.get('strength', 0) / 2  # Base strength + bonus from level strength
-                    })
+        Returns:
+            tuple: (candle positions, level positions, bullish flags) of every
+                sweep, ordered by candle and then by level
+        """
+        levels = np.asarray(level_prices, dtype=float)
+        prev_low = _shift(low, 1)
+        prev_high = _shift(high, 1)
         
-        return patterns
+        rows = max(1, max_cells // max(len(levels), 1))
+        candle_parts, level_parts, bullish_parts = [], [], []
+        for begin in range(max(start, 0), len(close), rows):
+            chunk = slice(begin, min(begin + rows, len(close)))
+            lo, hi, cl = low[chunk, None], high[chunk, None], close[chunk, None]
+            bullish = (prev_low[chunk, None] > levels) & (lo < levels) & (cl > levels)
+            bearish = ~bullish & (prev_high[chunk, None] < levels) & (hi > levels) & (cl < levels)
+            candles, matched = np.nonzero(bullish | bearish)
+            candle_parts.append(candles + begin)
+            level_parts.append(matched)
+            bullish_parts.append(bullish[candles, matched])
+            
+        if not candle_parts:
+            return np.array([], dtype=int), np.array([], dtype=int), np.array([], dtype=bool)
+        return np.concatenate(candle_parts), np.concatenate(level_parts), np.concatenate(bullish_parts)
     
     @staticmethod
     def calculate_pattern_probability(patterns, historical_patterns=None):
@@ -420,3 +314,66 @@ class PatternRecognition:
                 pattern['probability'] = min(0.3 + (pattern['strength'] / 10), 0.7)
         
         return patterns
+
+
+def _shift(values, periods):
+    """
+    Shift a NumPy array forward by ``periods`` positions, padding with NaN.
+    """
+    result = np.full(len(values), np.nan)
+    if periods < len(values):
+        result[periods:] = values[:len(values) - periods]
+    return result
+
+
+def _pivot_levels(df, kind, window=5):
+    """
+    Return positions and prices of the support or resistance levels in a DataFrame.
+    
+    Uses the 'support'/'resistance' column when present, otherwise simple pivots
+    where the low/high is the extreme of the surrounding 2*window+1 candles.
+    """
+    column, price = ('resistance', 'high') if kind == 'resistance' else ('support', 'low')
+    if column in df.columns:
+        values = df[column].to_numpy(dtype=float)
+    else:
+        prices = df[price]
+        rolling = prices.rolling(2 * window + 1, center=True, min_periods=1)
+        extreme = rolling.max() if kind == 'resistance' else rolling.min()
+        inner = np.zeros(len(df), dtype=bool)
+        inner[window:len(df) - window] = True
+        values = np.where(inner & (prices == extreme).to_numpy(), prices.to_numpy(dtype=float), np.nan)
+        
+    positions = np.flatnonzero(~np.isnan(values))
+    return positions, values[positions]
+
+
+def _scan_break_retest(close, high, low, level_idx, level, end, bullish):
+    """
+    Find the first breakout and first retest after each pivot level with array searches.
+    
+    Returns:
+        tuple: (found mask, breakout positions, retest positions), one entry per level
+    """
+    rows = np.arange(len(level_idx))
+    last = len(close) - 1
+    threshold = level * 1.005 if bullish else level * 0.995
+    
+    # Breakout: candles 3..19 after the pivot
+    candidates = level_idx[:, None] + np.arange(3, 20)
+    in_range = candidates < end[:, None]
+    closes = close[np.minimum(candidates, last)]
+    broke = in_range & ((closes > threshold[:, None]) if bullish else (closes < threshold[:, None]))
+    breakout = candidates[rows, broke.argmax(axis=1)]
+    
+    # Retest: candles 1..14 after the breakout that touch the level and close beyond it
+    candidates = breakout[:, None] + np.arange(1, 15)
+    in_range = candidates < end[:, None]
+    clipped = np.minimum(candidates, last)
+    levels = level[:, None]
+    touched = in_range & (low[clipped] <= levels) & (levels <= high[clipped])
+    touched &= (close[clipped] > levels) if bullish else (close[clipped] < levels)
+    retest = candidates[rows, touched.argmax(axis=1)]
+    
+    found = broke.any(axis=1) & touched.any(axis=1)
+    return found, breakout, retest
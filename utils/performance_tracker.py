@@ -5,19 +5,34 @@ import joblib
 import os
 import json
 
+from utils.metrics import (RunningMetrics, equity_statistics, exposure, span_periods_per_year,
+                           trade_statistics)
+from utils.records import column
+from utils.trade_journal import TradeJournal
+
 class PerformanceTracker:
     """
     Tracks and analyzes trading bot performance over time.
     """
     
-    def __init__(self, data_file='performance_data.joblib'):
+    def __init__(self, data_file='performance_data.sqlite', verify_metrics=False):
         """
         Initialize the performance tracker.
         
         Args:
-            data_file (str): File to store performance data
+            data_file (str): Trade journal file; a '.joblib' snapshot from earlier
+                versions (given here, or next to the journal) is imported into an
+                empty journal next to it ('.sqlite')
+            verify_metrics (bool): Recompute the metrics from the full history after
+                every recorded trade and raise if the running values differ (for tests)
         """
         self.data_file = data_file
+        self.verify_metrics = verify_metrics
+        self._running = RunningMetrics()
+        base = os.path.splitext(data_file)[0]
+        journal_file = base + '.sqlite' if data_file.endswith('.joblib') else data_file
+        self._legacy_file = data_file if data_file.endswith('.joblib') else base + '.joblib'
+        self.journal = TradeJournal(journal_file)
         self.trades = []
         self.equity_curve = []
         self.initial_balance = 0
@@ -35,40 +50,62 @@ class PerformanceTracker:
             bool: True if data was loaded successfully, False otherwise
         """
         try:
-            if os.path.exists(self.data_file):
-                data = joblib.load(self.data_file)
-                self.trades = data.get('trades', [])
-                self.equity_curve = data.get('equity_curve', [])
-                self.initial_balance = data.get('initial_balance', 0)
-                self.current_balance = data.get('current_balance', 0)
-                self.metrics = data.get('metrics', {})
-                return True
-            return False
+            if self.journal.is_empty() and os.path.exists(self._legacy_file):
+                data = joblib.load(self._legacy_file)
+                self.journal.replace(data.get('trades', []), data.get('equity_curve', []), {
+                    key: data.get(key, default)
+                    for key, default in (('initial_balance', 0), ('current_balance', 0), ('metrics', {}))
+                })
+            if self.journal.is_empty():
+                return False
+                
+            self.trades, self.equity_curve, state = self.journal.load()
+            self.initial_balance = state.get('initial_balance', 0)
+            self.current_balance = state.get('current_balance', 0)
+            self.metrics = state.get('metrics', {})
+            self._rebuild_running()
+            return True
         except Exception as e:
             print(f"Error loading performance data: {str(e)}")
             return False
     
     def save_data(self):
         """
-        Save performance data to file.
+        Rewrite the journal with the full in-memory performance data.
+        
+        Recording trades appends to the journal, so this is only needed after
+        changing the data directly. The rewritten journal is compacted, which
+        also shrinks its write-ahead log back to nothing.
         
         Returns:
             bool: True if data was saved successfully, False otherwise
         """
         try:
-            data = {
-                'trades': self.trades,
-                'equity_curve': self.equity_curve,
-                'initial_balance': self.initial_balance,
-                'current_balance': self.current_balance,
-                'metrics': self.metrics
-            }
-            joblib.dump(data, self.data_file)
+            self.journal.replace(self.trades, self.equity_curve, self._state())
+            self.journal.compact()
             return True
         except Exception as e:
             print(f"Error saving performance data: {str(e)}")
             return False
     
+    def _append(self, trade, equity_point):
+        """
+        Append a trade and/or equity point to the journal with the current state.
+        """
+        try:
+            self.journal.append(trade, equity_point, self._state())
+            return True
+        except Exception as e:
+            print(f"Error saving performance data: {str(e)}")
+            return False
+    
+    def _state(self):
+        return {
+            'initial_balance': self.initial_balance,
+            'current_balance': self.current_balance,
+            'metrics': self.metrics
+        }
+    
     def initialize_tracker(self, initial_balance):
         """
         Initialize tracker with starting balance.
@@ -83,7 +120,8 @@ class PerformanceTracker:
                 'date': datetime.now(),
                 'equity': initial_balance
             })
-            self.save_data()
+            self._add_equity(self.equity_curve[-1])
+            self._append(None, self.equity_curve[-1])
     
     def record_trade(self, trade_data):
         """
@@ -112,20 +150,36 @@ class PerformanceTracker:
             'equity': self.current_balance
         })
         
-        # Update metrics
-        self.update_metrics()
+        # Update metrics from the running totals
+        self._add_trade(trade_data)
+        self._add_equity(self.equity_curve[-1])
+        running = self._running
+        self.metrics = self._metrics(running.trade_statistics(), running.equity_statistics(), running.exposure(),
+                                     running.average_holding_time())
+        if self.verify_metrics:
+            self._verify_metrics()
         
-        # Save data
-        self.save_data()
+        # Append to the journal
+        self._append(trade_data, self.equity_curve[-1])
         
         return True
     
     def update_metrics(self):
         """
-        Update performance metrics based on recorded trades.
+        Recompute performance metrics from the full trade history.
+        
+        Recording trades keeps the metrics current; this is only needed after
+        changing the trades or equity curve directly.
+        """
+        self.metrics = self._full_metrics()
+        self._rebuild_running()
+    
+    def _full_metrics(self):
+        """
+        Calculate the metrics over the whole history with the vectorized functions.
         """
         if not self.trades:
-            self.metrics = {
+            return {
                 'total_trades': 0,
                 'win_rate': 0,
                 'profit_factor': 0,
@@ -133,88 +187,85 @@ class PerformanceTracker:
                 'average_loss': 0,
                 'max_drawdown': 0,
                 'sharpe_ratio': 0,
+                'sortino_ratio': 0,
+                'calmar_ratio': 0,
+                'exposure': 0,
                 'avg_holding_time': 0
             }
-            return
-        
-        # Calculate basic metrics
-        total_trades = len(self.trades)
-        winning_trades = [t for t in self.trades if t['profit'] > 0]
-        losing_trades = [t for t in self.trades if t['profit'] <= 0]
-        
-        win_count = len(winning_trades)
-        loss_count = len(losing_trades)
-        
-        win_rate = win_count / total_trades if total_trades > 0 else 0
-        
-        # Calculate profit metrics
-        total_profit = sum(t['profit'] for t in winning_trades) if winning_trades else 0
-        total_loss = abs(sum(t['profit'] for t in losing_trades)) if losing_trades else 0
-        
-        profit_factor = total_profit / total_loss if total_loss != 0 else float('inf')
-        
-        average_profit = total_profit / win_count if win_count > 0 else 0
-        average_loss = total_loss / loss_count if loss_count > 0 else 0
         
-        # Calculate average holding time
-        holding_times = []
-        for trade in self.trades:
-            entry_date = trade['entry_date']
-            exit_date = trade['exit_date']
-            
-            # Convert to datetime if they're not already
-            if not isinstance(entry_date, datetime):
-                entry_date = pd.to_datetime(entry_date)
-            if not isinstance(exit_date, datetime):
-                exit_date = pd.to_datetime(exit_date)
-            
-            holding_time = (exit_date - entry_date).total_seconds() / 3600  # hours
-            holding_times.append(holding_time)
-        
-        avg_holding_time = sum(holding_times) / len(holding_times) if holding_times else 0
-        
-        # Calculate drawdown
-        if self.equity_curve:
-            equity_values = [e['equity'] for e in self.equity_curve]
-            peak = equity_values[0]
-            max_drawdown = 0
-            
-            for equity in equity_values:
-                if equity > peak:
-                    peak = equity
-                drawdown = (peak - equity) / peak if peak > 0 else 0
-                max_drawdown = max(max_drawdown, drawdown)
-        else:
-            max_drawdown = 0
+        entries = column(self.trades, 'entry_date')
+        exits = column(self.trades, 'exit_date')
+        dates = column(self.equity_curve, 'date')
+        # Equity points come one per trade, so they are annualized by their average spacing
+        periods = span_periods_per_year(dates.min(), dates.max(), len(dates)) if len(dates) else 365.0
+        start = min(entries.min(), dates.min()) if len(dates) else entries.min()
+        end = max(exits.max(), dates.max()) if len(dates) else exits.max()
+        
+        return self._metrics(
+            trade_statistics(column(self.trades, 'profit')),
+            equity_statistics(self.equity_curve, periods=periods),
+            exposure(entries, exits, start, end),
+            float((exits - entries).mean())
+        )
+    
+    def _metrics(self, stats, risk, time_in_market, holding_time):
+        """
+        Assemble the metrics dictionary from trade and equity statistics.
         
-        # Calculate Sharpe ratio (assuming risk-free rate = 0)
-        if len(self.equity_curve) > 1:
-            equity_values = [e['equity'] for e in self.equity_curve]
-            returns = [(equity_values[i] - equity_values[i-1]) / equity_values[i-1] for i in range(1, len(equity_values))]
-            
-            mean_return = np.mean(returns) if returns else 0
-            std_return = np.std(returns) if returns else 0
-            
-            sharpe_ratio = (mean_return / std_return) * np.sqrt(252) if std_return > 0 else 0
-        else:
-            sharpe_ratio = 0
-        
-        # Update metrics dictionary
-        self.metrics = {
-            'total_trades': total_trades,
-            'winning_trades': win_count,
-            'losing_trades': loss_count,
-            'win_rate': win_rate,
-            'profit_factor': profit_factor,
-            'average_profit': average_profit,
-            'average_loss': average_loss,
-            'max_drawdown': max_drawdown,
-            'sharpe_ratio': sharpe_ratio,
-            'total_profit': total_profit - total_loss,
+        Args:
+            stats (dict): trade_statistics() values
+            risk (dict): equity_statistics() values
+            time_in_market (float): Exposure
+            holding_time (float): Average holding time in nanoseconds
+        """
+        return {
+            'total_trades': stats['total_trades'],
+            'winning_trades': stats['winning_trades'],
+            'losing_trades': stats['losing_trades'],
+            'win_rate': stats['win_rate'],
+            'profit_factor': stats['profit_factor'],
+            'average_profit': stats['average_profit'],
+            'average_loss': abs(stats['average_loss']),
+            'max_drawdown': risk['max_drawdown'],
+            'sharpe_ratio': risk['sharpe_ratio'],
+            'sortino_ratio': risk['sortino_ratio'],
+            'calmar_ratio': risk['calmar_ratio'],
+            'exposure': time_in_market,
+            'total_profit': stats['gross_profit'] + stats['gross_loss'],
             'total_profit_percent': ((self.current_balance - self.initial_balance) / self.initial_balance) * 100 if self.initial_balance > 0 else 0,
-            'avg_holding_time': avg_holding_time
+            'avg_holding_time': holding_time / 3.6e12  # hours
         }
     
+    def _verify_metrics(self):
+        """
+        Check the running metrics against a full recompute.
+        
+        Raises:
+            RuntimeError: If any metric differs beyond floating-point rounding
+        """
+        expected = self._full_metrics()
+        diverged = [key for key, value in expected.items()
+                    if not np.isclose(self.metrics[key], value, rtol=1e-9, atol=1e-12)]
+        if diverged:
+            details = ', '.join(f"{key}: {self.metrics[key]} != {expected[key]}" for key in diverged)
+            raise RuntimeError(f"Running metrics differ from a full recompute ({details})")
+    
+    def _add_trade(self, trade):
+        self._running.add_trade(trade['profit'], _nanoseconds(trade['entry_date']), _nanoseconds(trade['exit_date']))
+    
+    def _add_equity(self, point):
+        self._running.add_equity(point['equity'], _nanoseconds(point['date']))
+    
+    def _rebuild_running(self):
+        """
+        Replay the history into fresh running accumulators.
+        """
+        self._running = RunningMetrics()
+        for trade in self.trades:
+            self._add_trade(trade)
+        for point in self.equity_curve:
+            self._add_equity(point)
+    
     def get_recent_trades(self, n=10):
         """
         Get the most recent trades.
@@ -360,3 +411,10 @@ class PerformanceTracker:
         except Exception as e:
             print(f"Error exporting to JSON: {str(e)}")
             return False
+
+
+def _nanoseconds(value):
+    """
+    Convert a date (datetime, Timestamp or string) to nanoseconds since the epoch.
+    """
+    return pd.Timestamp(value).value
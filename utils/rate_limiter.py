@@ -0,0 +1,219 @@
+"""Process-wide token-bucket scheduler for exchange requests."""
+import itertools
+import threading
+import time
+
+# Lower values are served first when requests compete for the same budget
+PRIORITY_ORDERS = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_MARKET_DATA = 2
+
+# Budgets from Bitget's published limits: (tokens per second, burst capacity)
+BITGET_BUCKETS = {
+    'ip': (100, 100),      # 6000 requests/minute per IP across all endpoints
+    'market': (20, 20),    # Market data endpoints, per IP
+    'trade': (10, 10),     # Order placement and cancellation, per account
+    'account': (10, 10),   # Balances and open orders, per account
+}
+
+# Endpoint -> (buckets, weight, priority)
+BITGET_ENDPOINTS = {
+    'create_order': (('ip', 'trade'), 1, PRIORITY_ORDERS),
+    'cancel_order': (('ip', 'trade'), 1, PRIORITY_ORDERS),
+    # Batch placement is limited to 5 requests/second, half the single-order rate
+    'create_orders': (('ip', 'trade'), 2, PRIORITY_ORDERS),
+    'cancel_orders': (('ip', 'trade'), 1, PRIORITY_ORDERS),
+    'fetch_balance': (('ip', 'account'), 1, PRIORITY_ACCOUNT),
+    'fetch_open_orders': (('ip', 'account'), 1, PRIORITY_ACCOUNT),
+    'fetch_ohlcv': (('ip', 'market'), 1, PRIORITY_MARKET_DATA),
+    'fetch_ticker': (('ip', 'market'), 1, PRIORITY_MARKET_DATA),
+    'fetch_time': (('ip', 'market'), 1, PRIORITY_MARKET_DATA),
+    # Loading markets pulls spot, margin and swap market lists
+    'load_markets': (('ip', 'market'), 4, PRIORITY_MARKET_DATA),
+    'default': (('ip',), 1, PRIORITY_MARKET_DATA),
+}
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``rate`` tokens per second up to ``capacity``.
+    """
+    
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Maximum tokens, i.e. the burst budget
+            clock (callable): Monotonic time source in seconds
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._updated = clock()
+    
+    def wait_time(self, weight):
+        """
+        Seconds until ``weight`` tokens are available (0 if they already are).
+        """
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return max(0.0, (weight - self.tokens) / self.rate)
+    
+    def consume(self, weight):
+        """
+        Take ``weight`` tokens; call only after wait_time returned 0.
+        """
+        self.tokens -= weight
+
+
+class RequestScheduler:
+    """
+    Admit requests against shared token buckets in priority order.
+    
+    Each endpoint draws its weight from one or more buckets (e.g. the per-IP
+    budget and its endpoint group). Waiting requests are served by priority,
+    then arrival: every waiting request reserves its weight in each of its
+    buckets, and a request only goes ahead when each of its buckets holds its
+    weight on top of what earlier-ranked requests reserved there. Orders
+    queued behind a flood of market data requests therefore go next, while
+    requests whose buckets have budget to spare keep flowing (market data is
+    not held up by orders waiting on the trade budget). All methods are
+    thread-safe.
+    """
+    
+    def __init__(self, buckets=None, endpoints=None, clock=time.monotonic):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            buckets (dict, optional): Bucket name -> (rate per second, burst capacity)
+            endpoints (dict, optional): Endpoint -> (bucket names, weight, priority);
+                the 'default' entry is used for unlisted endpoints
+            clock (callable): Monotonic time source in seconds
+        """
+        buckets = BITGET_BUCKETS if buckets is None else buckets
+        self.buckets = {name: TokenBucket(rate, capacity, clock) for name, (rate, capacity) in buckets.items()}
+        self.endpoints = dict(BITGET_ENDPOINTS if endpoints is None else endpoints)
+        self._condition = threading.Condition()
+        self._tickets = itertools.count()
+        self._waiting = {}
+        self._stats = {}
+    
+    def acquire(self, endpoint, weight=None, priority=None):
+        """
+        Block until the endpoint's budget allows one more request.
+        
+        Args:
+            endpoint (str): Endpoint name, e.g. 'fetch_ohlcv'
+            weight (float, optional): Override the endpoint's weight
+            priority (int, optional): Override the endpoint's priority
+            
+        Returns:
+            float: Seconds spent waiting
+        """
+        names, default_weight, default_priority = self.endpoints.get(endpoint, self.endpoints['default'])
+        weight = default_weight if weight is None else weight
+        ticket = (default_priority if priority is None else priority, next(self._tickets))
+        buckets = [self.buckets[name] for name in names]
+        
+        start = time.perf_counter()
+        with self._condition:
+            self._waiting[ticket] = (names, weight)
+            try:
+                while True:
+                    reserved = self._reserved(names, ticket)
+                    delay = max(bucket.wait_time(weight + reserved[name]) for name, bucket in zip(names, buckets))
+                    if delay <= 0:
+                        for bucket in buckets:
+                            bucket.consume(weight)
+                        break
+                    # Also woken when an earlier request leaves the queue, releasing its reservation
+                    self._condition.wait(delay)
+            finally:
+                del self._waiting[ticket]
+                self._condition.notify_all()
+                
+            waited = time.perf_counter() - start
+            count, total_wait = self._stats.get(endpoint, (0, 0.0))
+            self._stats[endpoint] = (count + 1, total_wait + waited)
+        return waited
+    
+    def try_acquire(self, endpoint, weight=None):
+        """
+        Take the endpoint's budget only if it is available right now.
+        
+        Never waits and leaves the budget reserved by every queued request
+        alone, so optional extra requests (e.g. hedged duplicates) only use
+        spare budget.
+        
+        Args:
+            endpoint (str): Endpoint name, e.g. 'fetch_ohlcv'
+            weight (float, optional): Override the endpoint's weight
+            
+        Returns:
+            bool: True if the request may go ahead
+        """
+        names, default_weight, _ = self.endpoints.get(endpoint, self.endpoints['default'])
+        weight = default_weight if weight is None else weight
+        buckets = [self.buckets[name] for name in names]
+        
+        with self._condition:
+            reserved = self._reserved(names)
+            if max(bucket.wait_time(weight + reserved[name]) for name, bucket in zip(names, buckets)) > 0:
+                return False
+            for bucket in buckets:
+                bucket.consume(weight)
+            count, total_wait = self._stats.get(endpoint, (0, 0.0))
+            self._stats[endpoint] = (count + 1, total_wait)
+        return True
+    
+    def _reserved(self, names, ticket=None):
+        """
+        Sum the weights waiting requests ranked before ``ticket`` (all, if None) reserve in each bucket.
+        """
+        reserved = dict.fromkeys(names, 0)
+        for other, (other_names, other_weight) in self._waiting.items():
+            if ticket is None or other < ticket:
+                for name in other_names:
+                    if name in reserved:
+                        reserved[name] += other_weight
+        return reserved
+    
+    def call(self, endpoint, func, *args, **kwargs):
+        """
+        Acquire the endpoint's budget, then call ``func(*args, **kwargs)``.
+        """
+        self.acquire(endpoint)
+        return func(*args, **kwargs)
+    
+    def stats(self):
+        """
+        Get per-endpoint request counts and waiting time.
+        
+        Returns:
+            dict: Endpoint -> {'requests', 'total_wait', 'avg_wait'}
+        """
+        with self._condition:
+            return {
+                endpoint: {'requests': count, 'total_wait': total_wait, 'avg_wait': total_wait / count}
+                for endpoint, (count, total_wait) in self._stats.items()
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """
+    Get the process-wide scheduler shared by every BitgetClient, creating it on first use.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
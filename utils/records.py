@@ -0,0 +1,233 @@
+"""Array-backed trade and equity records for backtest results."""
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+TRADE_RESULTS = ('stop_loss', 'take_profit', 'end_of_period')
+DATE_FIELDS = ('entry_date', 'exit_date', 'date')
+
+TRADE_DTYPE = np.dtype([
+    ('entry_date', 'i8'),
+    ('exit_date', 'i8'),
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('side', 'i1'),
+    ('size', 'f8'),
+    ('profit', 'f8'),
+    ('commission', 'f8'),
+    ('result', 'u1'),
+    ('symbol', 'i4'),
+])
+
+
+class TradeLog(Sequence):
+    """
+    Closed trades stored in a preallocated NumPy structured array.
+    
+    Behaves as a read-only sequence of the trade dicts backtests have always
+    returned (``log[i]``, iteration, ``len``), built on access, while
+    ``column(name)`` exposes whole fields as arrays without any conversion.
+    Dates are stored as nanosecond timestamps and the result and symbol as
+    small integer codes.
+    """
+    
+    def __init__(self, capacity=64, symbols=None, tz=None):
+        """
+        Initialize an empty log.
+        
+        Args:
+            capacity (int): Initial number of trades to allocate room for
+            symbols (list, optional): Symbol names; when given, trades carry a 'symbol'
+            tz (str, optional): Timezone of the trade dates
+        """
+        self._records = np.zeros(max(capacity, 1), dtype=TRADE_DTYPE)
+        self._length = 0
+        self.symbols = list(symbols) if symbols is not None else None
+        self.tz = tz
+    
+    def append(self, entry_date, exit_date, entry_price, exit_price, side, size, profit, commission,
+               result, symbol=-1):
+        """
+        Record a closed trade.
+        
+        Args:
+            entry_date (int): Entry time in nanoseconds since the epoch
+            exit_date (int): Exit time in nanoseconds since the epoch
+            entry_price (float): Entry price
+            exit_price (float): Exit price
+            side (int): 1 for long, -1 for short
+            size (float): Position size
+            profit (float): Gross profit
+            commission (float): Exit commission
+            result (str): One of TRADE_RESULTS
+            symbol (int): Index into symbols, if the log has them
+        """
+        if self._length == len(self._records):
+            self._records = np.concatenate([self._records, np.zeros(len(self._records), dtype=TRADE_DTYPE)])
+        self._records[self._length] = (entry_date, exit_date, entry_price, exit_price, side, size,
+                                       profit, commission, TRADE_RESULTS.index(result), symbol)
+        self._length += 1
+    
+    @property
+    def records(self):
+        """
+        Structured array view of the recorded trades.
+        """
+        return self._records[:self._length]
+    
+    @property
+    def nbytes(self):
+        """
+        Bytes allocated for the trade buffer.
+        """
+        return self._records.nbytes
+    
+    def column(self, name):
+        """
+        Get one field of every trade as an array view (dates as int64 nanoseconds).
+        """
+        return self.records[name]
+    
+    def sort(self, keys=('exit_date', 'entry_date')):
+        """
+        Sort the trades in place by one or more fields, most significant first.
+        
+        Ties keep their recorded order.
+        """
+        records = self.records
+        records[:] = records[np.lexsort([records[key] for key in reversed(keys)])]
+    
+    def __len__(self):
+        return self._length
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('trade index out of range')
+        record = self._records[index]
+        trade = {} if self.symbols is None else {'symbol': self.symbols[record['symbol']]}
+        trade.update({
+            'entry_date': _timestamp(record['entry_date'], self.tz),
+            'exit_date': _timestamp(record['exit_date'], self.tz),
+            'entry_price': float(record['entry_price']),
+            'exit_price': float(record['exit_price']),
+            'type': 'long' if record['side'] > 0 else 'short',
+            'size': float(record['size']),
+            'profit': float(record['profit']),
+            'commission': float(record['commission']),
+            'result': TRADE_RESULTS[record['result']]
+        })
+        return trade
+    
+    def __eq__(self, other):
+        if isinstance(other, (TradeLog, list)):
+            return self.to_list() == list(other)
+        return NotImplemented
+    
+    def to_list(self):
+        """
+        Convert to the list-of-dicts shape.
+        """
+        return list(self)
+    
+    def to_frame(self):
+        """
+        Convert to a DataFrame with one row per trade.
+        """
+        return pd.DataFrame(self.to_list())
+    
+    @classmethod
+    def concat(cls, logs):
+        """
+        Join logs that share the same symbols and timezone into one.
+        """
+        logs = list(logs)
+        first = logs[0] if logs else cls()
+        merged = cls(0, first.symbols, first.tz)
+        merged._records = np.concatenate([log.records for log in logs] or [merged._records[:0]])
+        merged._length = len(merged._records)
+        return merged
+
+
+class EquityCurve(Sequence):
+    """
+    Equity per bar stored as a date index and a float array.
+    
+    Behaves as a read-only sequence of ``{'date', 'equity'}`` dicts, built on
+    access; ``dates`` and ``values`` expose the underlying arrays.
+    """
+    
+    def __init__(self, dates, values):
+        """
+        Wrap dates and equity values.
+        
+        Args:
+            dates (pandas.DatetimeIndex): Bar dates
+            values (numpy.ndarray): Equity at each date
+        """
+        self.dates = pd.DatetimeIndex(dates)
+        self.values = np.asarray(values, dtype=float)
+    
+    @property
+    def nbytes(self):
+        """
+        Bytes held by the dates and values.
+        """
+        return self.dates.nbytes + self.values.nbytes
+    
+    def column(self, name):
+        """
+        Get the 'date' (int64 nanoseconds) or 'equity' column as an array.
+        """
+        return self.values if name == 'equity' else self.dates.asi8
+    
+    def __len__(self):
+        return len(self.values)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return {'date': self.dates[index], 'equity': float(self.values[index])}
+    
+    def __eq__(self, other):
+        if isinstance(other, (EquityCurve, list)):
+            return self.to_list() == list(other)
+        return NotImplemented
+    
+    def to_list(self):
+        """
+        Convert to the list-of-dicts shape.
+        """
+        return [{'date': date, 'equity': value} for date, value in zip(self.dates, self.values.tolist())]
+    
+    def to_frame(self):
+        """
+        Convert to a DataFrame with 'date' and 'equity' columns.
+        """
+        return pd.DataFrame({'date': self.dates, 'equity': self.values})
+
+
+def column(records, name):
+    """
+    Get one field of a TradeLog, an EquityCurve or a list of dicts as an array.
+    
+    Dates come back as int64 nanoseconds and every other field as floats.
+    """
+    if hasattr(records, 'column'):
+        return records.column(name)
+    values = [record[name] for record in records]
+    if name in DATE_FIELDS:
+        return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).asi8 if values else np.array([], dtype=np.int64)
+    return np.array(values, dtype=float)
+
+
+def _timestamp(value, tz):
+    """
+    Convert int64 nanoseconds back to a pandas Timestamp.
+    """
+    timestamp = pd.Timestamp(int(value))
+    return timestamp.tz_localize('UTC').tz_convert(tz) if tz is not None else timestamp
@@ -0,0 +1,345 @@
+"""Retries, backoff, hedged reads and circuit breaking for exchange requests."""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import ccxt
+import numpy as np
+
+# Endpoints that are safe to send more than once: reads and cancellations
+IDEMPOTENT_ENDPOINTS = frozenset({
+    'fetch_ohlcv', 'fetch_ticker', 'fetch_time', 'load_markets', 'fetch_balance', 'fetch_open_orders',
+    'cancel_order', 'cancel_orders',
+})
+# Market data reads that may be hedged with a duplicate request
+HEDGED_ENDPOINTS = frozenset({'fetch_ohlcv', 'fetch_ticker', 'fetch_time'})
+
+# Failures worth retrying on idempotent endpoints: timeouts, outages, rate limiting
+TRANSIENT_ERRORS = (ccxt.NetworkError, ConnectionError, TimeoutError)
+# Failures where the exchange refused the request, so even an order can be resent
+REFUSED_ERRORS = (ccxt.RateLimitExceeded, ccxt.DDoSProtection, ccxt.OnMaintenance)
+
+
+class CircuitOpenError(ccxt.ExchangeNotAvailable):
+    """
+    Raised instead of sending a request while its endpoint's circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests to an endpoint that keeps failing.
+    
+    After ``failure_threshold`` consecutive transient failures the circuit
+    opens and requests fail fast for ``reset_timeout`` seconds. Then a single
+    trial request is let through (half-open): success closes the circuit,
+    failure opens it again. Thread-safe.
+    """
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        """
+        Initialize a closed circuit.
+        
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds the circuit stays open before a trial request
+            clock (callable): Monotonic time source in seconds
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = None
+        self._clock = clock
+        self._lock = threading.Lock()
+    
+    def allow(self):
+        """
+        Check whether a request may be sent now.
+        """
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self._clock() - self._opened_at >= self.reset_timeout:
+                # Let one trial request through (another one if a trial never reported back)
+                self.state = 'half_open'
+                self._opened_at = self._clock()
+                return True
+            return False
+    
+    def record_success(self):
+        """
+        Close the circuit after a request got an answer.
+        """
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+    
+    def record_failure(self):
+        """
+        Count a transient failure, opening the circuit at the threshold.
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.opened += 1
+                self.state = 'open'
+                self._opened_at = self._clock()
+
+
+class RequestPolicy:
+    """
+    Send exchange requests with classified retries, hedging and per-endpoint circuit breakers.
+    
+    Transient failures (timeouts, outages, rate limiting) are retried with
+    jittered exponential backoff; anything else (bad symbol, insufficient
+    funds, ...) is raised at once. Orders are only resent when the exchange
+    refused them outright, since a timed-out order may still have been placed.
+    With hedging on, a market data read that has not answered within the
+    endpoint's recent 95th percentile latency gets a duplicate request, and
+    whichever answers first wins; duplicates only use spare rate-limit budget.
+    Thread-safe; ``stats()`` reports per-endpoint metrics.
+    """
+    
+    def __init__(self, max_retries=3, backoff_base=0.25, backoff_cap=8.0, hedge=False, hedge_delay=None,
+                 hedge_quantile=0.95, failure_threshold=5, reset_timeout=30.0, seed=None,
+                 sleep=time.sleep, clock=time.monotonic):
+        """
+        Initialize the policy.
+        
+        Args:
+            max_retries (int): Retries after the first attempt
+            backoff_base (float): Upper bound in seconds of the first retry's random delay;
+                it doubles with every retry
+            backoff_cap (float): Cap on the retry delay bound
+            hedge (bool): Whether to hedge market data reads (HEDGED_ENDPOINTS)
+            hedge_delay (float, optional): Fixed seconds before hedging; by default the
+                ``hedge_quantile`` of the endpoint's recent latencies (1s until known)
+            hedge_quantile (float): Latency quantile that triggers a hedge
+            failure_threshold (int): Consecutive failures that open an endpoint's circuit
+            reset_timeout (float): Seconds an open circuit waits before a trial request
+            seed (int, optional): Random seed for the backoff jitter
+            sleep (callable): Sleep function used between retries
+            clock (callable): Monotonic time source in seconds
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.hedge_quantile = hedge_quantile
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._breakers = {}
+        self._metrics = {}
+        self._executor = None
+    
+    def call(self, endpoint, func, args=(), kwargs=None, scheduler=None):
+        """
+        Call ``func(*args, **kwargs)`` under the policy.
+        
+        Args:
+            endpoint (str): Endpoint name, e.g. 'fetch_ohlcv'
+            func (callable): The exchange method
+            args (tuple): Positional arguments
+            kwargs (dict, optional): Keyword arguments
+            scheduler (RequestScheduler, optional): Rate limiter every attempt waits for
+            
+        Returns:
+            The function's result
+            
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open
+            Exception: The last error, once it is not retryable or retries run out
+        """
+        kwargs = kwargs or {}
+        breaker = self.breaker(endpoint)
+        metrics = self._endpoint_metrics(endpoint)
+        self._count(metrics, 'requests')
+        
+        for attempt in range(self.max_retries + 1):
+            if not breaker.allow():
+                self._count(metrics, 'short_circuited')
+                raise CircuitOpenError(f"Circuit open for {endpoint} after repeated failures")
+            try:
+                if scheduler is not None:
+                    scheduler.acquire(endpoint)
+                if self.hedge and endpoint in HEDGED_ENDPOINTS:
+                    result = self._hedged(endpoint, metrics, func, args, kwargs, scheduler)
+                else:
+                    result = self._timed(metrics, func, args, kwargs)
+            except Exception as e:
+                transient = isinstance(e, TRANSIENT_ERRORS)
+                if transient:
+                    breaker.record_failure()
+                else:
+                    # The exchange answered, so it is reachable
+                    breaker.record_success()
+                if attempt == self.max_retries or not self._retryable(endpoint, e):
+                    self._count(metrics, 'failures')
+                    metrics['last_error'] = f"{type(e).__name__}: {str(e)}"
+                    raise
+                self._count(metrics, 'retries')
+                self._sleep(self._backoff(attempt))
+            else:
+                breaker.record_success()
+                self._count(metrics, 'successes')
+                return result
+    
+    def _retryable(self, endpoint, error):
+        """
+        Classify a failure: retry transient errors on idempotent endpoints, refusals anywhere.
+        """
+        if isinstance(error, CircuitOpenError):
+            return False
+        if endpoint in IDEMPOTENT_ENDPOINTS:
+            return isinstance(error, TRANSIENT_ERRORS)
+        return isinstance(error, REFUSED_ERRORS)
+    
+    def _backoff(self, attempt):
+        """
+        Full-jitter exponential backoff: a uniform delay up to base * 2**attempt, capped.
+        """
+        with self._lock:
+            return self._rng.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+    
+    def _timed(self, metrics, func, args, kwargs):
+        start = self._clock()
+        result = func(*args, **kwargs)
+        with self._lock:
+            metrics['latencies'].append(self._clock() - start)
+        return result
+    
+    def _hedged(self, endpoint, metrics, func, args, kwargs, scheduler):
+        """
+        Send the request, and a duplicate if it is slow; return the first successful answer.
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='hedged-request')
+        primary = self._executor.submit(self._timed, metrics, func, args, kwargs)
+        done, _ = wait([primary], timeout=self._hedge_after(metrics))
+        if done:
+            return primary.result()
+            
+        pending = {primary}
+        error = None
+        # One duplicate for the slow request, and one more if a request fails while the other is pending
+        for _ in range(2):
+            if scheduler is not None and not scheduler.try_acquire(endpoint):
+                self._count(metrics, 'hedges_skipped')
+                break
+            self._count(metrics, 'hedges')
+            pending.add(self._executor.submit(self._timed, metrics, func, args, kwargs))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            result = self._first_success(metrics, primary, done)
+            if result is not None:
+                return result[0]
+            error = error or next(iter(done)).exception()
+            if not pending:
+                raise error
+                
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            result = self._first_success(metrics, primary, done)
+            if result is not None:
+                return result[0]
+            error = error or next(iter(done)).exception()
+        raise error
+    
+    def _first_success(self, metrics, primary, done):
+        """
+        Pick a successful answer among finished requests, as a 1-tuple, or None if all failed.
+        """
+        for future in done:
+            if future.exception() is None:
+                if future is not primary:
+                    self._count(metrics, 'hedge_wins')
+                # The slower requests finish in the background and are ignored
+                return (future.result(),)
+        return None
+    
+    def _hedge_after(self, metrics):
+        """
+        Seconds to wait for an answer before sending a hedge.
+        """
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        with self._lock:
+            latencies = list(metrics['latencies'])
+        if len(latencies) < 20:
+            return 1.0
+        return float(np.quantile(latencies, self.hedge_quantile))
+    
+    def breaker(self, endpoint):
+        """
+        Get the circuit breaker of an endpoint, creating it on first use.
+        """
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout,
+                                                                    self._clock)
+            return breaker
+    
+    def _endpoint_metrics(self, endpoint):
+        with self._lock:
+            metrics = self._metrics.get(endpoint)
+            if metrics is None:
+                metrics = self._metrics[endpoint] = {
+                    'requests': 0, 'successes': 0, 'failures': 0, 'retries': 0, 'hedges': 0,
+                    'hedge_wins': 0, 'hedges_skipped': 0, 'short_circuited': 0, 'last_error': None,
+                    'latencies': deque(maxlen=200)
+                }
+            return metrics
+    
+    def _count(self, metrics, name):
+        with self._lock:
+            metrics[name] += 1
+    
+    def stats(self):
+        """
+        Get per-endpoint request metrics.
+        
+        Returns:
+            dict: Endpoint -> {'requests', 'successes', 'failures', 'retries', 'hedges',
+                'hedge_wins', 'hedges_skipped', 'short_circuited', 'circuit' (state),
+                'circuit_opened' (times), 'last_error', 'p50_latency', 'p95_latency'}
+        """
+        with self._lock:
+            stats = {}
+            for endpoint, metrics in self._metrics.items():
+                latencies = list(metrics['latencies'])
+                breaker = self._breakers[endpoint]
+                stats[endpoint] = {key: value for key, value in metrics.items() if key != 'latencies'}
+                stats[endpoint].update({
+                    'circuit': breaker.state,
+                    'circuit_opened': breaker.opened,
+                    'p50_latency': float(np.quantile(latencies, 0.5)) if latencies else None,
+                    'p95_latency': float(np.quantile(latencies, 0.95)) if latencies else None
+                })
+            return stats
+
+
+_policy = None
+_policy_lock = threading.Lock()
+
+
+def get_request_policy():
+    """
+    Get the process-wide request policy shared by every BitgetClient, creating it on first use.
+    """
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = RequestPolicy()
+        return _policy
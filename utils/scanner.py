@@ -0,0 +1,197 @@
+"""Concurrent market scanner across symbols and timeframes."""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from utils.api_client import BitgetClient
+from utils.pattern_recognition import PatternRecognition
+from utils.strategy import TradingStrategy
+
+SCAN_COLUMNS = [
+    'symbol', 'timeframe', 'signal', 'type', 'price', 'last_price', 'stop_loss',
+    'take_profit', 'risk_reward', 'age_candles', 'drift_atr', 'rsi', 'candle_patterns'
+]
+
+
+class MarketScanner:
+    """
+    Scan many symbols and timeframes for current trade setups.
+    
+    Candles are fetched on a thread pool (the requests are I/O bound and the shared
+    request scheduler paces them), and each market is handed to a process pool for
+    indicator and pattern analysis as soon as its candles arrive.
+    """
+    DEFAULT_SYMBOLS = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'BNB/USDT', 'XRP/USDT', 'WIF/USDT']
+    
+    def __init__(self, client=None, fetch_workers=8, analysis_workers=None, limit=200, look_back=100):
+        """
+        Initialize the scanner.
+        
+        Args:
+            client (BitgetClient, optional): Client used to fetch candles
+            fetch_workers (int): Maximum number of concurrent candle requests
+            analysis_workers (int, optional): Analysis processes (default: CPU count);
+                0 analyzes in the calling process
+            limit (int): Number of candles fetched per market
+            look_back (int): Number of recent candles used for liquidity levels
+        """
+        self.client = client if client is not None else BitgetClient()
+        self.fetch_workers = fetch_workers
+        self.analysis_workers = os.cpu_count() if analysis_workers is None else analysis_workers
+        self.limit = limit
+        self.look_back = look_back
+    
+    def scan(self, symbols=None, timeframes=('1h',)):
+        """
+        Scan every symbol and timeframe combination.
+        
+        Args:
+            symbols (list, optional): Trading pair symbols (default: DEFAULT_SYMBOLS)
+            timeframes (tuple): Timeframes for candlesticks (e.g., '15m', '1h', '4h')
+            
+        Returns:
+            pandas.DataFrame: One row per market, ranked with active setups first
+                (most recent pattern, then closest to its entry price). Throughput is
+                reported in ``result.attrs`` ('markets', 'failed', 'elapsed' and
+                'symbols_per_second').
+        """
+        symbols = list(symbols or self.DEFAULT_SYMBOLS)
+        markets = [(symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+        start = time.perf_counter()
+        
+        rows, failed = [], []
+        analysis_pool = ProcessPoolExecutor(self.analysis_workers) if self.analysis_workers else None
+        try:
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as fetch_pool:
+                fetches = {
+                    fetch_pool.submit(self.client.fetch_ohlcv, symbol, timeframe, self.limit): (symbol, timeframe)
+                    for symbol, timeframe in markets
+                }
+                analyses = {}
+                for future in as_completed(fetches):
+                    symbol, timeframe = fetches[future]
+                    df = future.result()
+                    if df.empty:
+                        failed.append(f"{symbol} {timeframe}")
+                        continue
+                    if analysis_pool is None:
+                        try:
+                            rows.append(analyze_market(symbol, timeframe, df, self.look_back))
+                        except Exception as e:
+                            print(f"Error analyzing {symbol} {timeframe}: {str(e)}")
+                            failed.append(f"{symbol} {timeframe}")
+                    else:
+                        analyses[analysis_pool.submit(analyze_market, symbol, timeframe, df, self.look_back)] = \
+                            (symbol, timeframe)
+                            
+            for future in as_completed(analyses):
+                try:
+                    rows.append(future.result())
+                except Exception as e:
+                    symbol, timeframe = analyses[future]
+                    print(f"Error analyzing {symbol} {timeframe}: {str(e)}")
+                    failed.append(f"{symbol} {timeframe}")
+        finally:
+            if analysis_pool is not None:
+                analysis_pool.shutdown()
+                
+        elapsed = time.perf_counter() - start
+        result = rank_setups(pd.DataFrame(rows, columns=SCAN_COLUMNS))
+        result.attrs.update({
+            'markets': len(markets),
+            'failed': failed,
+            'elapsed': elapsed,
+            'symbols_per_second': len(symbols) / elapsed if elapsed > 0 else float('inf')
+        })
+        return result
+
+
+def analyze_market(symbol, timeframe, df, look_back=100):
+    """
+    Evaluate the current setup for one market.
+    
+    Module-level so it can be pickled into worker processes.
+    
+    Args:
+        symbol (str): Trading pair symbol
+        timeframe (str): Candle timeframe
+        df (pandas.DataFrame): DataFrame with OHLCV data
+        look_back (int): Number of recent candles used for liquidity levels
+        
+    Returns:
+        dict: Scan row with the latest signal (if any) and market context
+    """
+    strategy = TradingStrategy()
+    analysis_df = strategy.calculate_indicators(df)
+    liquidity_levels = BitgetClient.find_liquidity_levels(df.tail(look_back))
+    signal = strategy.generate_trade_signal(analysis_df, liquidity_levels, precomputed=True)
+    
+    last = analysis_df.iloc[-1]
+    patterns = PatternRecognition.identify_candlestick_patterns(df.tail(4), as_frame=True)
+    row = {
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'signal': None,
+        'last_price': last['close'],
+        'rsi': last['rsi'],
+        'candle_patterns': ', '.join(patterns['type'])
+    }
+    if signal is not None:
+        timestamps = analysis_df['timestamp']
+        row.update({
+            'signal': signal['signal'],
+            'type': signal['type'],
+            'price': signal['price'],
+            'stop_loss': signal['stop_loss'],
+            'take_profit': signal['take_profit'],
+            'risk_reward': signal['risk_reward'],
+            'age_candles': int((timestamps > signal['date']).sum()),
+            # How far price has moved away from the entry, in ATRs
+            'drift_atr': abs(last['close'] - signal['price']) / last['atr']
+        })
+    return row
+
+
+def rank_setups(scan):
+    """
+    Order scan rows: active setups first, then newest pattern, then least drift.
+    
+    Args:
+        scan (pandas.DataFrame): Rows returned by analyze_market
+        
+    Returns:
+        pandas.DataFrame: Ranked scan with a 1-based 'rank' column
+    """
+    has_signal = scan['signal'].notna()
+    ranked = scan.assign(_inactive=~has_signal).sort_values(
+        ['_inactive', 'age_candles', 'drift_atr', 'symbol', 'timeframe'], na_position='last'
+    ).drop(columns='_inactive').reset_index(drop=True)
+    ranked.insert(0, 'rank', np.arange(1, len(ranked) + 1))
+    return ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scan markets for break/retest and liquidity sweep setups')
+    parser.add_argument('symbols', nargs='*', help='Trading pair symbols (default: the app\'s symbols)')
+    parser.add_argument('-t', '--timeframes', nargs='+', default=['15m', '1h', '4h'])
+    parser.add_argument('--limit', type=int, default=200, help='Candles fetched per market')
+    parser.add_argument('--workers', type=int, default=None, help='Analysis processes')
+    args = parser.parse_args()
+    
+    scanner = MarketScanner(limit=args.limit, analysis_workers=args.workers)
+    result = scanner.scan(args.symbols or None, args.timeframes)
+    
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(result.to_string(index=False))
+    print(f"\nScanned {result.attrs['markets']} markets in {result.attrs['elapsed']:.2f}s "
+          f"({result.attrs['symbols_per_second']:.1f} symbols/s)")
+    if result.attrs['failed']:
+        print(f"Failed: {', '.join(result.attrs['failed'])}")
+
+
+if __name__ == '__main__':
+    main()
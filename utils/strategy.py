@@ -2,21 +2,32 @@ import pandas as pd
 import numpy as np
 import pandas_ta as ta
 from datetime import datetime
+from utils.pattern_recognition import PatternRecognition
 
 class TradingStrategy:
     """
     Implementation of various trading strategies for cryptocurrency.
     """
-    def __init__(self, risk_percentage=1.0, max_open_trades=3):
+    def __init__(self, risk_percentage=1.0, max_open_trades=3, sr_window=10,
+                 breakout_threshold=0.0, reward_multiple=2.0, max_signal_age=10800):
         """
         Initialize the trading strategy with risk parameters.
         
         Args:
             risk_percentage (float): Percentage of account to risk per trade
             max_open_trades (int): Maximum number of concurrent open trades
+            sr_window (int): Window size for support/resistance pivots
+            breakout_threshold (float): Fraction a close must clear a level by to
+                count as a breakout (e.g. 0.005 for 0.5%)
+            reward_multiple (float): Take profit distance as a multiple of the risk
+            max_signal_age (float): Seconds after which a pattern is too old to trade
         """
         self.risk_percentage = risk_percentage
         self.max_open_trades = max_open_trades
+        self.sr_window = sr_window
+        self.breakout_threshold = breakout_threshold
+        self.reward_multiple = reward_multiple
+        self.max_signal_age = max_signal_age
         
     def calculate_indicators(self, df):
         """
@@ -57,7 +68,7 @@ class TradingStrategy:
         result['volume_sma'] = ta.sma(result['volume'], length=20)
         
         # Calculate support and resistance
-        self._add_support_resistance(result)
+        self._add_support_resistance(result, self.sr_window)
         
         return result
     
@@ -69,21 +80,14 @@ class TradingStrategy:
             df (pandas.DataFrame): DataFrame with OHLCV data
             window (int): Window size for support/resistance calculation
         """
-        # Initialize columns
-        df['support'] = np.nan
-        df['resistance'] = np.nan
-        
-        # Loop through data to find local minima/maxima
-        for i in range(window, len(df) - window):
-            # Check for local low (support)
-            if all(df['low'].iloc[i] <= df['low'].iloc[i-window:i]) and \
-               all(df['low'].iloc[i] <= df['low'].iloc[i+1:i+window+1]):
-                df.loc[df.index[i], 'support'] = df['low'].iloc[i]
-            
-            # Check for local high (resistance)
-            if all(df['high'].iloc[i] >= df['high'].iloc[i-window:i]) and \
-               all(df['high'].iloc[i] >= df['high'].iloc[i+1:i+window+1]):
-                df.loc[df.index[i], 'resistance'] = df['high'].iloc[i]
+        # A pivot is the extreme of the centered window of 2*window+1 candles;
+        # rolling min/max is linear in the number of candles whatever the window
+        span = 2 * window + 1
+        window_low = df['low'].rolling(span, center=True).min()
+        window_high = df['high'].rolling(span, center=True).max()
+        
+        df['support'] = df['low'].where(df['low'] == window_low)
+        df['resistance'] = df['high'].where(df['high'] == window_high)
     
     def identify_break_retest(self, df):
         """
@@ -107,7 +111,7 @@ class TradingStrategy:
                 resistance_level = df['resistance'].iloc[i-5]
                 
                 # Check for breakout above resistance
-                if any(df['close'].iloc[i-4:i-1] > resistance_level):
+                if any(df['close'].iloc[i-4:i-1] > resistance_level * (1 + self.breakout_threshold)):
                     # Check for retest of the broken resistance
                     if df['low'].iloc[i] <= resistance_level <= df['high'].iloc[i]:
                         pattern = {
@@ -125,7 +129,7 @@ class TradingStrategy:
                 support_level = df['support'].iloc[i-5]
                 
                 # Check for breakout below support
-                if any(df['close'].iloc[i-4:i-1] < support_level):
+                if any(df['close'].iloc[i-4:i-1] < support_level * (1 - self.breakout_threshold)):
                     # Check for retest of the broken support
                     if df['low'].iloc[i] <= support_level <= df['high'].iloc[i]:
                         pattern = {
@@ -154,39 +158,30 @@ class TradingStrategy:
         if df.empty or not liquidity_levels:
             return []
         
-        patterns = []
+        close = df['close'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        high = df['high'].to_numpy(dtype=float)
+        atr = df['atr'].to_numpy(dtype=float)
+        dates = df.index if isinstance(df.index, pd.DatetimeIndex) else df['timestamp'].array
         
-        # Loop through the data to find liquidity sweep patterns
-        for i in range(5, len(df)):
-            for level in liquidity_levels:
-                level_price = level['price']
-                
-                # Look for price quickly sweeping through liquidity level and reversing
-                if df['low'].iloc[i] < level_price < df['low'].iloc[i-1] and df['close'].iloc[i] > level_price:
-                    # Bullish sweep (sweep lows and reverse up)
-                    pattern = {
-                        'type': 'liquidity_sweep_bullish',
-                        'level': level_price,
-                        'date': df.index[i] if isinstance(df.index, pd.DatetimeIndex) else df['timestamp'].iloc[i],
-                        'signal': 'buy',
-                        'price': df['close'].iloc[i],
-                        'stop_loss': df['low'].iloc[i] - df['atr'].iloc[i],
-                        'strength': level['strength']
-                    }
-                    patterns.append(pattern)
-                
-                elif df['high'].iloc[i] > level_price > df['high'].iloc[i-1] and df['close'].iloc[i] < level_price:
-                    # Bearish sweep (sweep highs and reverse down)
-                    pattern = {
-                        'type': 'liquidity_sweep_bearish',
-                        'level': level_price,
-                        'date': df.index[i] if isinstance(df.index, pd.DatetimeIndex) else df['timestamp'].iloc[i],
-                        'signal': 'sell',
-                        'price': df['close'].iloc[i],
-                        'stop_loss': df['high'].iloc[i] + df['atr'].iloc[i],
-                        'strength': level['strength']
-                    }
-                    patterns.append(pattern)
+        # Price quickly sweeping through a liquidity level and reversing
+        candle_idx, level_idx, bullish = PatternRecognition.match_liquidity_sweeps(
+            low, high, close, [level['price'] for level in liquidity_levels], start=5)
+            
+        patterns = []
+        for i, k, is_bullish in zip(candle_idx.tolist(), level_idx.tolist(), bullish.tolist()):
+            level = liquidity_levels[k]
+            pattern = {
+                'type': 'liquidity_sweep_bullish' if is_bullish else 'liquidity_sweep_bearish',
+                'level': level['price'],
+                'date': dates[i],
+                'signal': 'buy' if is_bullish else 'sell',
+                'price': close[i],
+                # Stop beyond the sweep's extreme
+                'stop_loss': low[i] - atr[i] if is_bullish else high[i] + atr[i],
+                'strength': level['strength']
+            }
+            patterns.append(pattern)
         
         return patterns
     
@@ -219,7 +214,7 @@ class TradingStrategy:
         
         return position_size
     
-    def generate_trade_signal(self, df, liquidity_levels, current_balance=10000):
+    def generate_trade_signal(self, df, liquidity_levels, current_balance=10000, precomputed=False):
         """
         Generate trading signals based on identified patterns.
         
@@ -227,6 +222,8 @@ class TradingStrategy:
             df (pandas.DataFrame): DataFrame with OHLCV and indicator data
             liquidity_levels (list): List of identified liquidity levels
             current_balance (float): Current account balance
+            precomputed (bool): df already carries the indicator columns (e.g. from
+                IncrementalIndicators.frame), so calculate_indicators is skipped
             
         Returns:
             dict: Trade signal information if a signal is generated, None otherwise
@@ -235,7 +232,7 @@ class TradingStrategy:
             return None
         
         # Calculate indicators
-        analysis_df = self.calculate_indicators(df)
+        analysis_df = df if precomputed else self.calculate_indicators(df)
         
         # Identify patterns
         break_retest_patterns = self.identify_break_retest(analysis_df)
@@ -263,7 +260,7 @@ class TradingStrategy:
             pattern_timestamp = pd.to_datetime(pattern_timestamp)
         
         time_diff = latest_timestamp - pattern_timestamp
-        if time_diff.total_seconds() > 10800:  # More than 3 hours old
+        if time_diff.total_seconds() > self.max_signal_age:  # Default: more than 3 hours old
             return None
         
         # Calculate position size
@@ -288,6 +285,115 @@ class TradingStrategy:
         
         return signal
     
+    def precompute_signals(self, analysis_df, liquidity_levels, lookback=30, window=None):
+        """
+        Evaluate the trade signal for every bar in one vectorized pass.
+        
+        Mirrors calling generate_trade_signal on the trailing ``lookback`` candles
+        at each bar: pivots only count once they are confirmed inside that slice,
+        liquidity levels only once their timestamp has passed, the most recent
+        pattern wins and patterns older than max_signal_age are discarded. Indicators
+        come from the full-series analysis_df, so stops use the warmed-up ATR
+        rather than one re-seeded on every slice.
+        
+        Args:
+            analysis_df (pandas.DataFrame): DataFrame returned by calculate_indicators
+            liquidity_levels (list): List of identified liquidity levels
+            lookback (int): Number of trailing candles each signal is evaluated on
+            window (int, optional): Window size used for the support/resistance
+                pivots, defaults to sr_window
+            
+        Returns:
+            dict: NumPy arrays indexed by bar: 'direction' (1 buy, -1 sell, 0 none),
+                'pattern_idx', 'stop_loss' and 'take_profit'
+        """
+        window = self.sr_window if window is None else window
+        n = len(analysis_df)
+        high = analysis_df['high'].to_numpy(dtype=float)
+        low = analysis_df['low'].to_numpy(dtype=float)
+        close = analysis_df['close'].to_numpy(dtype=float)
+        atr = analysis_df['atr'].to_numpy(dtype=float)
+        timestamps = _timestamps_ns(analysis_df)
+        
+        # Break and retest at candle t: pivot at t-5, breakout on closes t-4..t-2, retest at t
+        resistance = _lag(analysis_df['resistance'].to_numpy(dtype=float), 5)
+        support = _lag(analysis_df['support'].to_numpy(dtype=float), 5)
+        recent_closes = [_lag(close, k) for k in (4, 3, 2)]
+        breakout_up = resistance * (1 + self.breakout_threshold)
+        breakout_down = support * (1 - self.breakout_threshold)
+        resistance_hit = (np.logical_or.reduce([c > breakout_up for c in recent_closes]) &
+                          (low <= resistance) & (resistance <= high))
+        support_hit = (np.logical_or.reduce([c < breakout_down for c in recent_closes]) &
+                       (low <= support) & (support <= high))
+        br_direction = np.where(resistance_hit, 1, np.where(support_hit, -1, 0))
+        br_stop = np.where(resistance_hit, _lag(low, 1) - atr, _lag(high, 1) + atr)
+        
+        # Liquidity sweeps at candle t against every level
+        level_prices = [level['price'] for level in liquidity_levels]
+        sweep_candle, sweep_level, sweep_bullish = PatternRecognition.match_liquidity_sweeps(
+            low, high, close, level_prices)
+        sweep_start = np.full(n, n)
+        if len(sweep_candle):
+            level_times = pd.DatetimeIndex(
+                pd.to_datetime([level['timestamp'] for level in liquidity_levels])).asi8
+            # First bar at which each level is known (legacy keeps timestamp < current date)
+            level_start = np.searchsorted(timestamps, level_times, side='right')
+            np.minimum.at(sweep_start, sweep_candle, level_start[sweep_level])
+            
+        # Walk offsets from the newest candle back; the first hit is the latest pattern.
+        # Break/retest patterns precede sweeps on the same candle, as in generate_trade_signal.
+        bars = np.arange(n)
+        pattern_idx = np.full(n, -1)
+        from_sweep = np.zeros(n, dtype=bool)
+        for offset in range(max(lookback - 5, 0)):
+            candle = bars - offset
+            valid = (candle >= 5) & (pattern_idx < 0)
+            candle = np.maximum(candle, 0)
+            br_found = valid & (br_direction[candle] != 0)
+            if not window - 5 <= offset <= lookback - window - 6:
+                br_found[:] = False
+            sweep_found = valid & ~br_found & (sweep_start[candle] <= bars)
+            pattern_idx[br_found | sweep_found] = candle[br_found | sweep_found]
+            from_sweep |= sweep_found
+            
+        found = pattern_idx >= 0
+        candle = np.maximum(pattern_idx, 0)
+        direction = np.where(found, br_direction[candle], 0)
+        stop_loss = np.where(found, br_stop[candle], np.nan)
+        
+        sweep_bars = np.flatnonzero(from_sweep)
+        if len(sweep_bars):
+            # Sweeps are ordered by candle then level, so each candle owns a contiguous
+            # run; the first level in that run already known at the bar is the pattern
+            candles = pattern_idx[sweep_bars]
+            run_start = np.searchsorted(sweep_candle, candles, side='left')
+            run_length = np.searchsorted(sweep_candle, candles, side='right') - run_start
+            owner = np.repeat(np.arange(len(sweep_bars)), run_length)
+            hit = np.arange(run_length.sum()) - np.repeat(np.cumsum(run_length) - run_length, run_length)
+            hit += run_start[owner]
+            known = level_start[sweep_level[hit]] <= sweep_bars[owner]
+            first = np.minimum.reduceat(np.where(known, hit, len(sweep_candle)),
+                                        np.cumsum(run_length) - run_length)
+            is_bullish = sweep_bullish[first]
+            direction[sweep_bars] = np.where(is_bullish, 1, -1)
+            stop_loss[sweep_bars] = np.where(is_bullish,
+                                             low[candles] - atr[candles],
+                                             high[candles] + atr[candles])
+                                             
+        # Discard patterns older than max_signal_age relative to the bar being evaluated
+        stale = found & (timestamps - timestamps[candle] > self.max_signal_age * 10**9)
+        direction[stale] = 0
+        
+        price = close[candle]
+        take_profit = price + direction * np.abs(price - stop_loss) * self.reward_multiple
+        
+        return {
+            'direction': direction,
+            'pattern_idx': np.where(direction != 0, pattern_idx, -1),
+            'stop_loss': np.where(direction != 0, stop_loss, np.nan),
+            'take_profit': np.where(direction != 0, take_profit, np.nan)
+        }
+    
     def calculate_take_profit(self, pattern):
         """
         Calculate take profit level based on pattern and risk-reward ratio.
@@ -300,9 +406,9 @@ class TradingStrategy:
         """
         risk = abs(pattern['price'] - pattern['stop_loss'])
         if pattern['signal'] == 'buy':
-            return pattern['price'] + (risk * 2)  # 1:2 risk-reward ratio
+            return pattern['price'] + (risk * self.reward_multiple)  # 1:2 risk-reward ratio by default
         else:
-            return pattern['price'] - (risk * 2)  # 1:2 risk-reward ratio
+            return pattern['price'] - (risk * self.reward_multiple)  # 1:2 risk-reward ratio by default
     
     def calculate_risk_reward(self, pattern):
         """
@@ -322,3 +428,21 @@ class TradingStrategy:
             return 0
         
         return reward / risk
+
+
+def _lag(values, periods):
+    """
+    Shift a NumPy array forward by ``periods`` positions, padding with NaN.
+    """
+    result = np.full(len(values), np.nan)
+    if periods < len(values):
+        result[periods:] = values[:len(values) - periods]
+    return result
+
+
+def _timestamps_ns(df):
+    """
+    Return candle timestamps as int64 nanoseconds, from the index or 'timestamp' column.
+    """
+    dates = df.index if isinstance(df.index, pd.DatetimeIndex) else df['timestamp']
+    return pd.DatetimeIndex(pd.to_datetime(dates)).asi8
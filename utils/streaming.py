@@ -0,0 +1,560 @@
+"""WebSocket candle and ticker streaming, with a local replay server for offline runs."""
+import asyncio
+import json
+import threading
+import time
+
+import aiohttp
+import pandas as pd
+from aiohttp import web
+
+from utils.candle_cache import CandleCache
+
+BITGET_WS_URL = 'wss://ws.bitget.com/v2/ws/public'
+# ccxt timeframe -> Bitget candle channel
+CANDLE_CHANNELS = {
+    '1m': 'candle1m', '5m': 'candle5m', '15m': 'candle15m', '30m': 'candle30m',
+    '1h': 'candle1H', '4h': 'candle4H', '6h': 'candle6H', '12h': 'candle12H',
+    '1d': 'candle1D', '1w': 'candle1W',
+}
+# Candle channels from shortest to longest timeframe
+CANDLE_CHANNELS_ORDER = list(CANDLE_CHANNELS.values())
+TICKER_CHANNEL = 'ticker'
+# Bitget drops connections that stay silent for two minutes
+PING_INTERVAL = 30
+
+
+class MarketStream:
+    """
+    Subscribe to exchange WebSocket kline and ticker channels.
+    
+    Each candle subscription keeps a CandleBuffer in the stream's CandleCache
+    up to date (appending and revising candles in place) and each ticker
+    subscription the latest ticker; subscriber callbacks receive every update.
+    The connection runs on a background thread with its own event loop, sends
+    keep-alive pings, and reconnects with exponential backoff, resubscribing
+    everything; messages that cannot be handled are counted as errors and
+    skipped, and ``live`` tells whether the data is current. It speaks
+    Bitget's public v2 protocol, so it works against the exchange and against
+    a ReplayServer alike.
+    """
+    
+    def __init__(self, url=BITGET_WS_URL, capacity=500, inst_type='SPOT', reconnect_delay=1.0,
+                 max_reconnect_delay=30.0, cache=None):
+        """
+        Initialize the stream (call start() to connect).
+        
+        Args:
+            url (str): WebSocket endpoint
+            capacity (int): Candles kept per symbol and timeframe
+                (ignored when ``cache`` is given)
+            inst_type (str): Bitget instrument type ('SPOT', 'USDT-FUTURES', ...)
+            reconnect_delay (float): First delay in seconds before reconnecting
+            max_reconnect_delay (float): Cap on the reconnect delay
+            cache (CandleCache, optional): Cache to keep the candle buffers in,
+                e.g. a BitgetClient's, so REST fetches and the stream share them
+        """
+        self.url = url
+        self.cache = cache if cache is not None else CandleCache(capacity)
+        self.inst_type = inst_type
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._buffers = {}
+        self._tickers = {}
+        self._callbacks = {}
+        self._routes = {}
+        self._lock = threading.Lock()
+        self._updated = threading.Condition(self._lock)
+        self._loop = None
+        self._ws = None
+        self._thread = None
+        self._stopping = None
+        self._stats = {'messages': 0, 'candles': 0, 'tickers': 0, 'reconnects': 0, 'errors': 0}
+    
+    def subscribe_candles(self, symbol, timeframe, callback=None):
+        """
+        Stream candles for a symbol and timeframe.
+        
+        Args:
+            symbol (str): Trading pair symbol
+            timeframe (str): Timeframe for candlesticks (e.g., '1m', '1h')
+            callback (callable, optional): Called with each update event: a dict with
+                'type' ('candle'), 'symbol', 'timeframe', 'candle', 'closed_candle'
+                (the candle this update closed, or None) and 'ts' (push time in ms)
+                
+        Returns:
+            CandleBuffer: The buffer the stream keeps for the subscription
+        """
+        if timeframe not in CANDLE_CHANNELS:
+            raise ValueError(f"Unsupported streaming timeframe: {timeframe}")
+        key = (symbol, timeframe)
+        with self._lock:
+            buffer = self._buffers[key] = self.cache.buffer(symbol, timeframe)
+        self._subscribe(CANDLE_CHANNELS[timeframe], symbol, key, callback)
+        return buffer
+    
+    def subscribe_ticker(self, symbol, callback=None):
+        """
+        Stream ticker updates for a symbol.
+        
+        Args:
+            symbol (str): Trading pair symbol
+            callback (callable, optional): Called with each update event: a dict with
+                'type' ('ticker'), 'symbol', 'ticker' (ccxt-style ticker dict) and 'ts'
+        """
+        self._subscribe(TICKER_CHANNEL, symbol, (symbol, None), callback)
+    
+    def _subscribe(self, channel, symbol, key, callback):
+        arg = {'instType': self.inst_type, 'channel': channel, 'instId': _inst_id(symbol)}
+        with self._lock:
+            new = (channel, arg['instId']) not in self._routes
+            self._routes[(channel, arg['instId'])] = (key, arg)
+            if callback is not None:
+                self._callbacks.setdefault(key, []).append(callback)
+        if new and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._send_subscribe([arg]), self._loop)
+    
+    def buffer(self, symbol, timeframe):
+        """
+        Get the candle buffer of a subscription, or None if not subscribed.
+        """
+        return self._buffers.get((symbol, timeframe))
+    
+    def candles(self, symbol, timeframe, limit=None):
+        """
+        Get streamed candles as a DataFrame (empty if not subscribed).
+        
+        Args:
+            symbol (str): Trading pair symbol
+            timeframe (str): Timeframe for candlesticks
+            limit (int, optional): Return only the most recent ``limit`` candles
+            
+        Returns:
+            pandas.DataFrame: DataFrame containing OHLCV data
+        """
+        buffer = self.buffer(symbol, timeframe)
+        return buffer.to_frame(limit) if buffer is not None else pd.DataFrame()
+    
+    def ticker(self, symbol):
+        """
+        Get the latest streamed ticker for a symbol, or None if none arrived yet.
+        """
+        return self._tickers.get(symbol)
+    
+    def wait_for(self, symbol, timeframe=None, count=1, timeout=10.0):
+        """
+        Block until a subscription has data.
+        
+        Args:
+            symbol (str): Trading pair symbol
+            timeframe (str, optional): Candle timeframe; None waits for a ticker
+            count (int): Candles required in the buffer
+            timeout (float): Seconds to wait
+            
+        Returns:
+            bool: True if the data arrived in time
+        """
+        def ready():
+            if timeframe is None:
+                return symbol in self._tickers
+            buffer = self._buffers.get((symbol, timeframe))
+            return buffer is not None and len(buffer) >= count
+            
+        with self._updated:
+            return self._updated.wait_for(ready, timeout)
+    
+    @property
+    def live(self):
+        """
+        Whether the background thread is running and connected, i.e. buffers and tickers are current.
+        """
+        return self._thread is not None and self._thread.is_alive() and self._ws is not None
+    
+    def stats(self):
+        """
+        Get message counters: 'messages', 'candles', 'tickers', 'reconnects' and 'errors'
+        (connection errors and messages that could not be handled).
+        """
+        with self._lock:
+            return dict(self._stats)
+    
+    def start(self):
+        """
+        Connect on a background thread.
+        
+        Returns:
+            MarketStream: self
+        """
+        if self._thread is not None:
+            return self
+        started = threading.Event()
+        
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._stopping = asyncio.Event()
+            started.set()
+            try:
+                self._loop.run_until_complete(self._run())
+            finally:
+                self._loop.close()
+                
+        self._thread = threading.Thread(target=run, name='market-stream', daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+    
+    def stop(self, timeout=5.0):
+        """
+        Close the connection and stop the background thread.
+        """
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join(timeout)
+        self._thread = None
+        self._loop = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+        
+    async def _run(self):
+        delay = self.reconnect_delay
+        async with aiohttp.ClientSession() as session:
+            while not self._stopping.is_set():
+                try:
+                    async with session.ws_connect(self.url, heartbeat=None) as ws:
+                        self._ws = ws
+                        delay = self.reconnect_delay
+                        with self._lock:
+                            args = [arg for _, arg in self._routes.values()]
+                        await self._send_subscribe(args)
+                        await self._receive(ws)
+                except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                    print(f"Market stream connection error: {str(e)}")
+                    self._count('errors')
+                except Exception as e:
+                    # Never let the stream thread die with buffers that look current
+                    print(f"Unexpected market stream error, reconnecting: {str(e)}")
+                    self._count('errors')
+                finally:
+                    self._ws = None
+                    
+                if self._stopping.is_set():
+                    break
+                self._count('reconnects')
+                # Sleep before reconnecting, unless stop() is called meanwhile
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.max_reconnect_delay)
+                
+    async def _receive(self, ws):
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        try:
+            while True:
+                receive = asyncio.ensure_future(ws.receive())
+                done, _ = await asyncio.wait({receive, stopping}, timeout=PING_INTERVAL,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if stopping in done:
+                    receive.cancel()
+                    await ws.close()
+                    return
+                if not done:
+                    receive.cancel()
+                    await ws.send_str('ping')
+                    continue
+                    
+                message = receive.result()
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    # Closed or errored: let _run reconnect
+                    return
+                if message.data == 'pong':
+                    continue
+                try:
+                    self._handle(json.loads(message.data))
+                except Exception as e:
+                    print(f"Error handling market stream message: {str(e)}")
+                    self._count('errors')
+        finally:
+            stopping.cancel()
+            
+    async def _send_subscribe(self, args):
+        if self._ws is not None and args:
+            await self._ws.send_str(json.dumps({'op': 'subscribe', 'args': args}))
+    
+    def _handle(self, message):
+        """
+        Route one push message to its buffer or ticker and notify subscribers.
+        """
+        self._count('messages')
+        if message.get('event') == 'error':
+            print(f"Market stream error: {message.get('msg')}")
+            self._count('errors')
+            return
+        if 'data' not in message or 'arg' not in message:
+            return
+            
+        arg = message['arg']
+        route = self._routes.get((arg.get('channel'), arg.get('instId')))
+        if route is None:
+            return
+        (symbol, timeframe), _ = route
+        ts = message.get('ts')
+        
+        events = []
+        if timeframe is None:
+            for data in message['data']:
+                ticker = _ticker(symbol, data)
+                self._tickers[symbol] = ticker
+                events.append({'type': 'ticker', 'symbol': symbol, 'ticker': ticker, 'ts': ts})
+            self._count('tickers', len(events))
+        else:
+            buffer = self._buffers[(symbol, timeframe)]
+            for row in sorted(message['data'], key=lambda row: int(row[0])):
+                candle = [int(row[0])] + [float(value) for value in row[1:6]]
+                closed = buffer.update(candle)
+                events.append({'type': 'candle', 'symbol': symbol, 'timeframe': timeframe,
+                               'candle': candle, 'closed_candle': closed, 'ts': ts})
+            self._count('candles', len(events))
+            
+        with self._updated:
+            self._updated.notify_all()
+        for callback in self._callbacks.get((symbol, timeframe), ()):
+            for event in events:
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"Error in market stream subscriber: {str(e)}")
+    
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+
+class ReplayServer:
+    """
+    Local WebSocket server that replays recorded candles over Bitget's public protocol.
+    
+    Clients subscribe exactly as they would on the exchange. Candle channels
+    get a snapshot of the first candles, then every later candle as two
+    updates (its opening tick, then the finished candle), one candle per
+    ``interval`` seconds; ticker channels get a ticker built from each candle
+    of the symbol's shortest recorded timeframe. Use it to run the streaming
+    pipeline offline, e.g. ``MarketStream(server.url)``.
+    """
+    
+    def __init__(self, candles, host='127.0.0.1', port=0, interval=0.0, snapshot=100):
+        """
+        Initialize the server (call start() to listen).
+        
+        Args:
+            candles (dict): (symbol, timeframe) -> DataFrame shaped like fetch_ohlcv
+                output, or rows of [timestamp_ms, open, high, low, close, volume]
+            host (str): Interface to listen on
+            port (int): Port to listen on (0 picks a free one)
+            interval (float): Seconds between replayed candles
+            snapshot (int): Candles sent in the subscription snapshot
+        """
+        self.candles = {(_inst_id(symbol), CANDLE_CHANNELS[timeframe]): _candle_rows(rows)
+                        for (symbol, timeframe), rows in candles.items()}
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.snapshot = snapshot
+        self.url = None
+        self._loop = None
+        self._thread = None
+        self._runner = None
+        self._connections = set()
+    
+    @classmethod
+    def from_store(cls, store, markets, since=None, until=None, **kwargs):
+        """
+        Build a server that replays candles recorded in a CandleStore.
+        
+        Args:
+            store (CandleStore): Candle store to read from
+            markets (list): (symbol, timeframe) pairs to replay
+            since (int, optional): Earliest timestamp in ms
+            until (int, optional): Latest timestamp in ms
+            **kwargs: ReplayServer options
+        """
+        return cls({market: store.read(*market, since=since, until=until) for market in markets}, **kwargs)
+    
+    def start(self):
+        """
+        Start listening on a background thread.
+        
+        Returns:
+            ReplayServer: self, with ``url`` set
+        """
+        started = threading.Event()
+        
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._listen())
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._shutdown())
+            self._loop.close()
+            
+        self._thread = threading.Thread(target=run, name='replay-server', daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+    
+    def stop(self, timeout=5.0):
+        """
+        Stop the server, closing every connection.
+        """
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+        
+    async def _listen(self):
+        app = web.Application()
+        app.router.add_get('/v2/ws/public', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f'ws://{host}:{port}/v2/ws/public'
+        
+    async def _shutdown(self):
+        for ws in list(self._connections):
+            await ws.close()
+        await self._runner.cleanup()
+        
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._connections.add(ws)
+        replays = []
+        try:
+            async for message in ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    break
+                if message.data == 'ping':
+                    await ws.send_str('pong')
+                    continue
+                request_data = json.loads(message.data)
+                if request_data.get('op') != 'subscribe':
+                    continue
+                for arg in request_data.get('args', []):
+                    replay = self._replay(arg)
+                    if replay is None:
+                        await ws.send_str(json.dumps({'event': 'error', 'arg': arg, 'code': 30001,
+                                                      'msg': f"instId:{arg.get('instId')} doesn't exist"}))
+                        continue
+                    await ws.send_str(json.dumps({'event': 'subscribe', 'arg': arg}))
+                    replays.append(asyncio.ensure_future(replay(ws, arg)))
+        finally:
+            self._connections.discard(ws)
+            for replay in replays:
+                replay.cancel()
+        return ws
+    
+    def _replay(self, arg):
+        """
+        Get the coroutine that streams a subscribed channel, or None if nothing is recorded for it.
+        """
+        inst_id, channel = arg.get('instId'), arg.get('channel')
+        if channel == TICKER_CHANNEL:
+            recorded = [(CANDLE_CHANNELS_ORDER.index(c), rows) for (i, c), rows in self.candles.items() if i == inst_id]
+            if not recorded:
+                return None
+            rows = min(recorded, key=lambda item: item[0])[1]
+            return lambda ws, arg: self._replay_tickers(ws, arg, rows)
+        rows = self.candles.get((inst_id, channel))
+        if rows is None:
+            return None
+        return lambda ws, arg: self._replay_candles(ws, arg, rows)
+        
+    async def _replay_candles(self, ws, arg, rows):
+        await ws.send_str(json.dumps({'action': 'snapshot', 'arg': arg, 'ts': _now_ms(),
+                                      'data': [_push_row(row) for row in rows[:self.snapshot]]}))
+        for row in rows[self.snapshot:]:
+            await asyncio.sleep(self.interval)
+            opening = [row[0], row[1], row[1], row[1], row[1], 0.0]
+            for update in (opening, row):
+                await ws.send_str(json.dumps({'action': 'update', 'arg': arg, 'ts': _now_ms(),
+                                              'data': [_push_row(update)]}))
+                                              
+    async def _replay_tickers(self, ws, arg, rows):
+        for row in rows:
+            await ws.send_str(json.dumps({'action': 'snapshot', 'arg': arg, 'ts': _now_ms(), 'data': [{
+                'instId': arg['instId'], 'lastPr': str(row[4]), 'open24h': str(row[1]), 'high24h': str(row[2]),
+                'low24h': str(row[3]), 'bidPr': str(row[4]), 'askPr': str(row[4]), 'baseVolume': str(row[5]),
+                'quoteVolume': str(row[5] * row[4]), 'change24h': str(row[4] / row[1] - 1 if row[1] else 0),
+                'ts': str(row[0])
+            }]}))
+            await asyncio.sleep(self.interval)
+
+
+def _inst_id(symbol):
+    """
+    Convert a ccxt symbol ('BTC/USDT' or 'BTC/USDT:USDT') to a Bitget instId ('BTCUSDT').
+    """
+    return symbol.split(':')[0].replace('/', '')
+
+
+def _candle_rows(candles):
+    """
+    Normalize a fetch_ohlcv DataFrame or OHLCV rows to [timestamp_ms, o, h, l, c, v] lists.
+    """
+    if isinstance(candles, pd.DataFrame):
+        timestamps = pd.DatetimeIndex(candles['timestamp']).asi8 // 10**6
+        values = candles[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float).tolist()
+        return [[int(ts)] + row for ts, row in zip(timestamps, values)]
+    return [[int(c[0])] + [float(v) for v in c[1:6]] for c in candles]
+
+
+def _push_row(candle):
+    """
+    Format a candle the way Bitget pushes it: strings, with quote volume appended.
+    """
+    return [str(candle[0])] + [repr(float(v)) for v in candle[1:6]] + [repr(float(candle[5] * candle[4]))] * 2
+
+
+def _ticker(symbol, data):
+    """
+    Convert a Bitget ticker push to a ccxt-style ticker dict.
+    """
+    def number(key):
+        value = data.get(key)
+        return float(value) if value not in (None, '') else None
+        
+    timestamp = int(data['ts']) if data.get('ts') else None
+    change = number('change24h')
+    return {
+        'symbol': symbol,
+        'timestamp': timestamp,
+        'datetime': pd.Timestamp(timestamp, unit='ms', tz='UTC').isoformat() if timestamp else None,
+        'last': number('lastPr'),
+        'close': number('lastPr'),
+        'bid': number('bidPr'),
+        'ask': number('askPr'),
+        'open': number('open24h'),
+        'high': number('high24h'),
+        'low': number('low24h'),
+        'baseVolume': number('baseVolume'),
+        'quoteVolume': number('quoteVolume'),
+        'percentage': change * 100 if change is not None else None,
+        'info': data
+    }
+
+
+def _now_ms():
+    return int(time.time() * 1000)
@@ -0,0 +1,118 @@
+"""Append-only SQLite journal for recorded trades and equity."""
+import os
+import pickle
+import sqlite3
+import threading
+
+
+class TradeJournal:
+    """
+    Append-only trade and equity log in a SQLite database in WAL mode.
+    
+    Each trade is one row appended together with its equity point and the
+    tracker's small state values (balances, metrics) in a single transaction,
+    so recording costs the same however long the history is, and a crash can
+    only lose the trade being written, never the earlier ones. Records are
+    pickled, so dates and NumPy values come back with their original types.
+    """
+    
+    def __init__(self, path='performance_data.sqlite'):
+        """
+        Open (or create) the journal.
+        
+        Args:
+            path (str): SQLite database file
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS trades (seq INTEGER PRIMARY KEY, record BLOB NOT NULL)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS equity (seq INTEGER PRIMARY KEY, record BLOB NOT NULL)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value BLOB)')
+        self._conn.commit()
+    
+    def append(self, trade=None, equity_point=None, state=None):
+        """
+        Append a trade and/or equity point and update state values atomically.
+        
+        Args:
+            trade (dict, optional): Trade record
+            equity_point (dict, optional): Equity curve point
+            state (dict, optional): State values to set (e.g. 'current_balance')
+        """
+        with self._lock, self._conn:
+            if trade is not None:
+                self._conn.execute('INSERT INTO trades (record) VALUES (?)', (_dumps(trade),))
+            if equity_point is not None:
+                self._conn.execute('INSERT INTO equity (record) VALUES (?)', (_dumps(equity_point),))
+            self._set_state(state or {})
+    
+    def replace(self, trades, equity_curve, state):
+        """
+        Replace the whole journal contents in one transaction.
+        
+        Args:
+            trades (list): Trade records
+            equity_curve (list): Equity curve points
+            state (dict): State values
+        """
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM trades')
+            self._conn.execute('DELETE FROM equity')
+            self._conn.execute('DELETE FROM state')
+            self._conn.executemany('INSERT INTO trades (record) VALUES (?)', ((_dumps(t),) for t in trades))
+            self._conn.executemany('INSERT INTO equity (record) VALUES (?)', ((_dumps(e),) for e in equity_curve))
+            self._set_state(state)
+    
+    def load(self):
+        """
+        Read the journal back in recording order.
+        
+        Returns:
+            tuple: (trades list, equity curve list, state dict)
+        """
+        with self._lock:
+            trades = [pickle.loads(row[0]) for row in self._conn.execute('SELECT record FROM trades ORDER BY seq')]
+            equity_curve = [pickle.loads(row[0]) for row in self._conn.execute('SELECT record FROM equity ORDER BY seq')]
+            state = {key: pickle.loads(value) for key, value in self._conn.execute('SELECT key, value FROM state')}
+        return trades, equity_curve, state
+    
+    def is_empty(self):
+        """
+        Check whether anything has been recorded yet.
+        """
+        with self._lock:
+            return self._conn.execute(
+                'SELECT NOT EXISTS (SELECT 1 FROM trades) AND NOT EXISTS (SELECT 1 FROM equity) '
+                'AND NOT EXISTS (SELECT 1 FROM state)'
+            ).fetchone()[0] == 1
+    
+    def compact(self):
+        """
+        Fold the write-ahead log into the database file and reclaim free pages.
+        """
+        with self._lock:
+            # VACUUM writes the rebuilt pages to the log, so checkpoint after it
+            self._conn.execute('VACUUM')
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    
+    def _set_state(self, state):
+        self._conn.executemany('INSERT OR REPLACE INTO state VALUES (?, ?)',
+                               ((key, _dumps(value)) for key, value in state.items()))
+    
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def _dumps(value):
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)